@@ -0,0 +1,127 @@
+"""Requests/sec of the sync and async route stacks under concurrent load.
+
+    python -m api.benchmarks.db_modes [--concurrency 200] [--requests 4000]
+
+Both stacks are served in-process over ASGI against the same database: a
+throwaway SQLite file by default, or --sync-url/--async-url for a real server
+(e.g. mysql+pymysql://... and mysql+aiomysql://...). Sync routes run in the
+threadpool exactly as under uvicorn, so its size still caps their concurrency.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from ..dependencies import async_database, database
+from ..dependencies.database import Base
+from ..models import model_loader  # noqa: F401  register every model
+from ..models import menu_item as menu_model
+from ..controllers import orders as orders_controller
+from ..routers import index
+from ..schemas import order as order_schema
+
+
+def seed(session_factory, orders: int):
+    with session_factory() as db:
+        db.add_all(menu_model.MenuItem(name=f"Item {i}", price=5.0 + i, category=f"c{i % 5}") for i in range(50))
+        db.commit()
+        tracking = []
+        for i in range(orders):
+            request = order_schema.GuestOrderCreate(
+                guest_name=f"Guest {i}",
+                items=[order_schema.OrderItem(menu_item_id=1 + i % 50, quantity=1)],
+            )
+            tracking.append(orders_controller.create_guest_order(db, request).tracking_number)
+    return tracking
+
+
+def build_app(async_db: bool, session_factory, async_engine):
+    app = FastAPI()
+    index.load_routes(app, async_db=async_db)
+
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with async_database.AsyncSessionLocal(bind=async_engine) as db:
+            yield db
+
+    app.dependency_overrides[database.get_db] = get_db
+    # Read-only routes take get_read_db; without this they'd go to the configured MySQL
+    app.dependency_overrides[database.get_read_db] = get_db
+    app.dependency_overrides[async_database.get_db] = get_async_db
+    return app
+
+
+async def load(app, paths, total: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        queue = iter(range(total))
+        failures = 0
+
+        async def worker():
+            nonlocal failures
+            for n in queue:
+                response = await client.get(paths[n % len(paths)])
+                if not response.is_success:
+                    failures += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    # Only successful responses count toward the rate; errors are reported apart
+    return (total - failures) / elapsed, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m api.benchmarks.db_modes")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--orders", type=int, default=500, help="orders to seed")
+    parser.add_argument("--sync-url")
+    parser.add_argument("--async-url")
+    args = parser.parse_args(argv)
+
+    path = None
+    if not args.sync_url:
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        args.sync_url = f"sqlite:///{path}"
+        args.async_url = f"sqlite+aiosqlite:///{path}"
+
+    # Pools may grow to the full concurrency so neither mode waits on connections:
+    # the comparison is about threadpool vs event loop, not pool sizing.
+    engine = create_engine(args.sync_url, pool_size=20, max_overflow=args.concurrency)
+    async_engine = create_async_engine(args.async_url, pool_size=20, max_overflow=args.concurrency)
+    session_factory = sessionmaker(autoflush=False, bind=engine)
+    try:
+        Base.metadata.create_all(engine)
+        tracking = seed(session_factory, args.orders)
+        paths = ["/orders/?limit=20", "/menu/", "/menu/filter?category=c1"]
+        paths += [f"/orders/track/{number}" for number in tracking[:50]]
+
+        for label, async_db in (("sync", False), ("async", True)):
+            app = build_app(async_db, session_factory, async_engine)
+            rate, failures = asyncio.run(load(app, paths, args.requests, args.concurrency))
+            print(f"{label:>5}: {rate:8.1f} successful req/s  ({args.requests} requests, "
+                  f"concurrency {args.concurrency}, {failures} failed)")
+            if failures:
+                print(f"{label:>5}: {failures} requests failed; the rate above is not comparable")
+    finally:
+        asyncio.run(async_engine.dispose())
+        engine.dispose()
+        if path:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
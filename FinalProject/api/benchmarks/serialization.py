@@ -0,0 +1,137 @@
+"""Time to build a JSON list of orders, regular path vs the fast_json path.
+
+    python -m api.benchmarks.serialization [--orders 10000] [--repeat 5]
+
+The regular path is what GET /orders does by default: load ORM instances
+(details and payment eager-loaded), validate them against the response model
+and encode the result with the stdlib, as FastAPI's JSONResponse does. The
+fast path selects the response columns as dicts and encodes them with orjson.
+Both run against an in-memory SQLite database; the best of --repeat runs is
+reported, split into loading and serialization.
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from ..dependencies import fast_json
+from ..dependencies.database import Base
+from ..models import model_loader  # noqa: F401  register every model
+from ..models import menu_item as menu_model
+from ..models import order as order_model
+from ..models import order_details as order_detail_model
+from ..models import payment as payment_model
+from ..controllers import orders as orders_controller
+from ..schemas import order as order_schema
+
+
+def seed(db, orders: int):
+    db.execute(insert(menu_model.MenuItem), [{"name": f"Item {i}", "price": 4.5 + i} for i in range(20)])
+    start = datetime(2024, 1, 1)
+    db.execute(
+        insert(order_model.Order),
+        [
+            {
+                "id": n,
+                "order_date": start + timedelta(minutes=n),
+                "status": "Paid" if n % 2 else "Pending",
+                "total_price": 12.5,
+                "tracking_number": f"tracking-{n}",
+                "order_type": "takeout",
+                "guest_name": f"Guest {n}",
+                "guest_email": f"guest{n}@example.com",
+                "promotion_discount": 0.0,
+                "discount_amount": 0.0,
+            }
+            for n in range(1, orders + 1)
+        ],
+    )
+    db.execute(
+        insert(order_detail_model.OrderDetail),
+        [
+            {"order_id": n, "menu_item_id": 1 + (n + line) % 20, "quantity": 1, "unit_price": 6.25, "line_total": 6.25}
+            for n in range(1, orders + 1)
+            for line in range(2)
+        ],
+    )
+    db.execute(
+        insert(payment_model.Payment),
+        [
+            {"order_id": n, "payment_type": "Card", "transaction_status": "Success", "amount": 12.5}
+            for n in range(1, orders + 1, 2)
+        ],
+    )
+    db.commit()
+
+
+def regular(db):
+    started = time.perf_counter()
+    orders = (
+        db.query(order_model.Order)
+        .options(*orders_controller.list_options())
+        .order_by(*orders_controller.LIST_ORDERING)
+        .all()
+    )
+    loaded = time.perf_counter()
+    adapter = TypeAdapter(list[order_schema.OrderResponse])
+    content = adapter.dump_python(adapter.validate_python(orders, from_attributes=True), mode="json")
+    body = json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+    return loaded - started, time.perf_counter() - loaded, body
+
+
+def fast(db):
+    started = time.perf_counter()
+    rows = fast_json.as_dicts(
+        db.query(
+            *fast_json.columns(order_model.Order, order_schema.OrderResponse, exclude=("order_details", "payment"))
+        ).order_by(*orders_controller.LIST_ORDERING)
+    )
+    orders_controller.attach_rows(db, rows)
+    loaded = time.perf_counter()
+    body = fast_json.response(rows).body
+    return loaded - started, time.perf_counter() - loaded, body
+
+
+def best(session_factory, run, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        with session_factory() as db:
+            load_s, serialize_s, body = run(db)
+        timings.append((load_s + serialize_s, load_s, serialize_s))
+    return min(timings), body
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m api.benchmarks.serialization")
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    if fast_json.orjson is None:
+        parser.error("orjson is not installed")
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    session_factory = sessionmaker(autoflush=False, bind=engine)
+    Base.metadata.create_all(engine)
+    with session_factory() as db:
+        seed(db, args.orders)
+
+    bodies = {}
+    per = 10000 / args.orders
+    print(f"{args.orders} orders, best of {args.repeat}; milliseconds per 10k orders")
+    print(f"{'path':>8} {'load':>9} {'serialize':>10} {'total':>9} {'bytes':>10}")
+    for label, run in (("regular", regular), ("fast", fast)):
+        (total, load_s, serialize_s), bodies[label] = best(session_factory, run, args.repeat)
+        print(
+            f"{label:>8} {load_s * 1000 * per:9.1f} {serialize_s * 1000 * per:10.1f} "
+            f"{total * 1000 * per:9.1f} {len(bodies[label]):10d}"
+        )
+    same = json.loads(bodies["regular"]) == json.loads(bodies["fast"])
+    print("responses identical" if same else "RESPONSES DIFFER")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
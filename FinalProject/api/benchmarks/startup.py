@@ -0,0 +1,148 @@
+"""Cold-start cost: import time per module and time to first request.
+
+    python -m api.benchmarks.startup [--runs 3] [--profile] [--eager]
+
+Each run is a fresh interpreter that imports api.main and then sends the
+first request to each --path (default /menu/ and /orders/), against a
+throwaway SQLite database migrated beforehand. Runs are judged on their
+median against --import-budget and --request-budget (seconds); the command
+exits with status 1 when a budget is exceeded. --profile adds the slowest
+imports by cumulative time from `python -X importtime`. --eager measures
+with LAZY_ROUTES off, for comparison.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+IMPORT_BUDGET = 3.0
+REQUEST_BUDGET = 1.5
+DEFAULT_PATHS = ("/menu/", "/orders/")
+# The directory holding the api package, where `python -m api...` works
+PROJECT_DIR = Path(__file__).resolve().parents[2]
+
+
+def child(db_url: str, paths):
+    """Measure this (fresh) interpreter; prints one JSON line."""
+    started = time.perf_counter()
+    from ..main import app
+
+    imported = time.perf_counter()
+    loaded_routers = sorted(m for m in sys.modules if m.startswith("api.routers.") and m != "api.routers.index")
+
+    # Not timed: point the app at the benchmark database instead of MySQL
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from ..dependencies import database
+
+    engine = create_engine(db_url, connect_args={"check_same_thread": False})
+
+    def get_db():
+        db = database.SessionLocal(bind=engine)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[database.get_db] = get_db
+    app.dependency_overrides[database.get_read_db] = get_db
+    client = TestClient(app)
+
+    requests = {}
+    for path in paths:
+        sent = time.perf_counter()
+        status = client.get(path).status_code
+        requests[path] = {"seconds": time.perf_counter() - sent, "status": status}
+    print(json.dumps({"import": imported - started, "loaded_routers": loaded_routers, "requests": requests}))
+
+
+def run_child(db_url: str, paths, env=None):
+    command = [sys.executable, "-m", "api.benchmarks.startup", "--child", "--db-url", db_url]
+    for path in paths:
+        command += ["--path", path]
+    result = subprocess.run(command, capture_output=True, text=True, check=True, env=env, cwd=PROJECT_DIR)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def import_profile(limit: int = 25, env=None):
+    """(cumulative_us, self_us, module) for the slowest imports of api.main."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.main"],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=PROJECT_DIR,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():
+            rows.append((int(cumulative_us), int(self_us), module.rstrip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def migrated_database():
+    from sqlalchemy import create_engine
+    from .. import migrations
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}")
+    migrations.upgrade(engine)
+    engine.dispose()
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m api.benchmarks.startup")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--path", action="append", dest="paths")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET)
+    parser.add_argument("--request-budget", type=float, default=REQUEST_BUDGET)
+    parser.add_argument("--profile", action="store_true", help="list the slowest imports")
+    parser.add_argument("--eager", action="store_true", help="import every router at start-up")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--db-url", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    paths = args.paths or list(DEFAULT_PATHS)
+
+    if args.child:
+        child(args.db_url, paths)
+        return
+
+    env = dict(os.environ, LAZY_ROUTES="false" if args.eager else "true")
+    path = migrated_database()
+    try:
+        results = [run_child(f"sqlite:///{path}", paths, env=env) for _ in range(args.runs)]
+    finally:
+        os.remove(path)
+
+    over_budget = False
+    import_s = statistics.median(r["import"] for r in results)
+    print(f"import api.main: {import_s * 1000:7.1f} ms (budget {args.import_budget * 1000:.0f} ms)")
+    print(f"routers imported at start-up: {', '.join(results[0]['loaded_routers']) or 'none'}")
+    over_budget |= import_s > args.import_budget
+    for request_path in paths:
+        seconds = statistics.median(r["requests"][request_path]["seconds"] for r in results)
+        print(f"first GET {request_path}: {seconds * 1000:7.1f} ms (budget {args.request_budget * 1000:.0f} ms)")
+        over_budget |= seconds > args.request_budget
+
+    if args.profile:
+        print(f"\n{'cumulative ms':>13} {'self ms':>8}  module")
+        for cumulative_us, self_us, module in import_profile(env=env):
+            print(f"{cumulative_us / 1000:13.1f} {self_us / 1000:8.1f}  {module}")
+
+    if over_budget:
+        print("over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
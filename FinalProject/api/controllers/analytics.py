@@ -3,16 +3,16 @@ from sqlalchemy import func
 from fastapi import HTTPException, status
 from sqlalchemy.exc import SQLAlchemyError
 from ..models import order as order_model
-from ..models import order_details as order_detail_model
 from ..models import menu_item as menu_item_model
 from ..models import review as review_model
+from ..controllers import orders as orders_controller
+from ..controllers import sales_rollup as sales_rollup_controller
+from ..controllers import item_sales as item_sales_controller
 
 
 def sales_summary(db: Session):
     try:
-        total_revenue = db.query(func.coalesce(func.sum(order_model.Order.total_price), 0)).scalar() or 0
-        total_orders = db.query(func.count(order_model.Order.id)).scalar() or 0
-        return {"total_orders": int(total_orders), "total_revenue": float(total_revenue)}
+        return sales_rollup_controller.summarize(db)
     except SQLAlchemyError as e:
         error = str(e.__dict__.get("orig", e))
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
@@ -20,48 +20,17 @@ def sales_summary(db: Session):
 
 def popular_items(db: Session, limit: int = 10):
     try:
-        rows = (
-            db.query(
-                order_detail_model.OrderDetail.menu_item_id.label("menu_item_id"),
-                menu_item_model.MenuItem.name.label("name"),
-                func.sum(order_detail_model.OrderDetail.quantity).label("total_quantity"),
-                func.sum(order_detail_model.OrderDetail.quantity * menu_item_model.MenuItem.price).label("total_revenue"),
-            )
-            .join(menu_item_model.MenuItem, menu_item_model.MenuItem.id == order_detail_model.OrderDetail.menu_item_id)
-            .group_by(order_detail_model.OrderDetail.menu_item_id, menu_item_model.MenuItem.name)
-            .order_by(func.sum(order_detail_model.OrderDetail.quantity).desc())
-            .limit(limit)
-            .all()
-        )
-        return [
-            {
-                "menu_item_id": r.menu_item_id,
-                "name": r.name,
-                "total_quantity": int(r.total_quantity or 0),
-                "total_revenue": float(r.total_revenue or 0),
-            }
-            for r in rows
-        ]
+        return item_sales_controller.top_items(db, limit=limit)
     except SQLAlchemyError as e:
         error = str(e.__dict__.get("orig", e))
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
 
 def sales_by_date_range(db: Session, start_date: str | None, end_date: str | None):
-    filters = []
-    if start_date:
-        filters.append(func.date(order_model.Order.order_date) >= start_date)
-    if end_date:
-        filters.append(func.date(order_model.Order.order_date) <= end_date)
+    start_day = orders_controller.parse_date(start_date, "start_date") if start_date else None
+    end_day = orders_controller.parse_date(end_date, "end_date") if end_date else None
     try:
-        query = db.query(
-            func.coalesce(func.sum(order_model.Order.total_price), 0).label("revenue"),
-            func.coalesce(func.count(order_model.Order.id), 0).label("order_count"),
-        )
-        if filters:
-            query = query.filter(*filters)
-        row = query.one()
-        return {"total_orders": int(row.order_count or 0), "total_revenue": float(row.revenue or 0)}
+        return sales_rollup_controller.summarize(db, start_day=start_day, end_day=end_day)
     except SQLAlchemyError as e:
         error = str(e.__dict__.get("orig", e))
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
@@ -0,0 +1,11 @@
+"""Async variants of the menu reads, backed by the same per-worker catalog cache."""
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..controllers import menu_items as menu_items_controller
+
+
+async def read_tagged(db: AsyncSession, category: str | None = None):
+    return await db.run_sync(menu_items_controller.read_tagged, category)
+
+
+async def read_one(db: AsyncSession, item_id: int):
+    return await db.run_sync(menu_items_controller.read_one, item_id)
@@ -0,0 +1,124 @@
+"""Async variants of the hot order paths, for use with dependencies.async_database."""
+from fastapi import HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from ..models import order as model
+from ..schemas import order as order_schema
+from ..controllers import orders as orders_controller
+from ..controllers import idempotency as idempotency_controller
+from ..controllers import tracking_cache
+
+
+async def _checkout(db: AsyncSession, scope: str, create, request, idempotency_key: str | None):
+    def run(session):
+        order_obj = idempotency_controller.run(
+            session,
+            scope,
+            idempotency_key,
+            request,
+            lambda: create(session, request),
+            order_schema.OrderResponse,
+            status.HTTP_201_CREATED,
+            # A blocking per-key lock would stall the event loop; the placeholder
+            # row still keeps duplicates from running twice.
+            coalesce=False,
+        )
+        if isinstance(order_obj, Response):
+            return order_obj, None
+        # Serialize while still in the sync context, where lazy loads are allowed
+        response = order_schema.OrderResponse.model_validate(order_obj, from_attributes=True)
+        return response, order_obj.checkout_timings
+
+    return await db.run_sync(run)
+
+
+async def create(db: AsyncSession, request, idempotency_key: str | None = None):
+    """Run the (sync) checkout pipeline on the async connection.
+
+    Returns the serialized order and its stage timings, or a stored
+    response and None when `idempotency_key` was already used.
+    """
+    return await _checkout(db, "orders", orders_controller.create, request, idempotency_key)
+
+
+async def create_guest_order(db: AsyncSession, request, idempotency_key: str | None = None):
+    return await _checkout(db, "orders.guest", orders_controller.create_guest_order, request, idempotency_key)
+
+
+async def read_page(
+    db: AsyncSession,
+    user_id: int | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    cursor: int | None = None,
+    limit: int = 50,
+):
+    """Same keyset pages as orders.read_page."""
+    limit = max(1, min(limit, orders_controller.MAX_PAGE_SIZE))
+    stmt = (
+        select(model.Order)
+        .options(*orders_controller.list_options())
+        .where(*orders_controller.list_filters(user_id, start_date, end_date))
+        .order_by(*orders_controller.LIST_ORDERING)
+    )
+    try:
+        if cursor is not None:
+            found = (await db.execute(orders_controller.cursor_anchor(cursor))).first()
+            stmt = stmt.where(orders_controller.after_cursor(cursor, found))
+        rows = (await db.scalars(stmt.limit(limit + 1))).unique().all()
+    except SQLAlchemyError as e:
+        error = str(e.__dict__.get("orig", e))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def _tracking_query(tracking_number: str):
+    return (
+        select(model.Order)
+        .options(
+            joinedload(model.Order.order_details),
+            joinedload(model.Order.payment),
+        )
+        .where(model.Order.tracking_number == tracking_number)
+    )
+
+
+async def _tracked(db: AsyncSession, tracking_number: str):
+    cached = tracking_cache.get(tracking_number)
+    if cached is not tracking_cache.MISS:
+        return cached
+    loaded_at = tracking_cache.generation()
+    item = (await db.scalars(_tracking_query(tracking_number))).unique().first()
+    rendered = orders_controller.render(item) if item else None
+    tracking_cache.put(tracking_number, rendered, loaded_at)
+    return rendered
+
+
+async def track_by_number(db: AsyncSession, tracking_number: str):
+    try:
+        item = await _tracked(db, tracking_number)
+    except SQLAlchemyError as e:
+        error = str(e.__dict__.get("orig", e))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    if not item:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Tracking number not found!"
+        )
+    return item
+
+
+async def track_by_tracking_and_name(db: AsyncSession, tracking_number: str, name: str | None = None):
+    try:
+        item = await _tracked(db, tracking_number)
+    except SQLAlchemyError as e:
+        error = str(e.__dict__.get("orig", e))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    if not item or not orders_controller.matches_name(item, name):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tracking number (and name, if provided) not found!",
+        )
+    return item
@@ -0,0 +1,17 @@
+from sqlalchemy.orm import Session
+from ..dependencies.upsert import increment
+from ..models import catalog_version as model
+
+MENU = "menu"
+PROMOTIONS = "promotions"
+
+
+def current(db: Session, name: str):
+    """The committed change counter for a catalog (0 until its first change)."""
+    version = db.query(model.CatalogVersion.version).filter(model.CatalogVersion.name == name).scalar()
+    return version or 0
+
+
+def bump(db: Session, name: str):
+    """Advance a catalog's counter inside the caller's transaction."""
+    increment(db, model.CatalogVersion, {"name": name}, {"version": 1})
@@ -0,0 +1,193 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from uuid import uuid4
+from fastapi import HTTPException, status
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from ..models import order as order_model
+from ..models import order_details as order_detail_model
+from ..controllers import promotions as promotion_controller
+from ..controllers import inventory as inventory_controller
+from ..controllers import sales_rollup as sales_rollup_controller
+from ..controllers import item_sales as item_sales_controller
+from ..controllers import menu_catalog
+from ..dependencies import metrics
+
+
+@dataclass
+class CheckoutContext:
+    """State handed from one checkout stage to the next."""
+
+    db: Session
+    request: object
+    order_fields: dict
+    quantities: dict = field(default_factory=dict)
+    menu_items: dict = field(default_factory=dict)
+    promotion: object = None
+    order_details: list = field(default_factory=list)
+    subtotal: float = 0.0
+    total_price: float = 0.0
+    discount_amount: float = 0.0
+    order: object = None
+    timings: dict = field(default_factory=dict)
+
+
+def validate(ctx: CheckoutContext):
+    if not ctx.request.items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Order must contain at least one menu item.",
+        )
+
+    # Merge repeated menu_item_ids so every later stage sees one line per item
+    for item in ctx.request.items:
+        ctx.quantities[item.menu_item_id] = ctx.quantities.get(item.menu_item_id, 0) + item.quantity
+
+    # Names and prices come from the cached catalog; stock is checked by reserve
+    ctx.menu_items = menu_catalog.get_many(ctx.db, ctx.quantities)
+    missing_items = sorted(set(ctx.quantities) - set(ctx.menu_items))
+    if missing_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Menu items not found: {missing_items}",
+        )
+
+    # Validate the promo code before stock is touched
+    if ctx.request.promo_code:
+        ctx.promotion = promotion_controller.get_valid_promotion(ctx.db, ctx.request.promo_code)
+
+
+def reserve(ctx: CheckoutContext):
+    inventory_controller.reserve_stock(ctx.db, ctx.quantities)
+
+
+def price(ctx: CheckoutContext):
+    # One pass builds the detail rows and the subtotal together
+    subtotal = 0.0
+    for menu_item_id, quantity in ctx.quantities.items():
+        menu_item_obj = ctx.menu_items[menu_item_id]
+        unit_price = float(menu_item_obj.price)
+        line_total = unit_price * quantity
+        subtotal += line_total
+        ctx.order_details.append(
+            order_detail_model.OrderDetail(
+                menu_item_id=menu_item_id,
+                quantity=quantity,
+                unit_price=unit_price,
+                line_total=line_total,
+            )
+        )
+    ctx.subtotal = subtotal
+    ctx.total_price = subtotal
+
+
+def discount(ctx: CheckoutContext):
+    if ctx.promotion:
+        rate = (ctx.promotion.discount_percent or 0) / 100
+        ctx.total_price = max(0.0, ctx.subtotal * (1 - rate))
+    ctx.discount_amount = ctx.subtotal - ctx.total_price
+
+
+def persist(ctx: CheckoutContext):
+    promotion = ctx.promotion
+    ctx.order = order_model.Order(
+        status="Pending",
+        total_price=ctx.total_price,
+        tracking_number=str(uuid4()),
+        order_type=ctx.request.order_type or "takeout",
+        order_details=ctx.order_details,
+        promotion_id=promotion.id if promotion else None,
+        promotion_code=promotion.promo_code if promotion else None,
+        promotion_discount=promotion.discount_percent if promotion else 0,
+        discount_amount=ctx.discount_amount,
+        **ctx.order_fields,
+    )
+    try:
+        ctx.db.add(ctx.order)
+        ctx.db.flush()
+        sales_rollup_controller.record(ctx.db, ctx.order)
+        item_sales_controller.record(ctx.db, ctx.order_details)
+        ctx.db.commit()
+        ctx.db.refresh(ctx.order)
+    except SQLAlchemyError as e:
+        ctx.db.rollback()
+        error = str(e.__dict__.get("orig", e))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    metrics.orders_created.inc()
+
+
+def notify(ctx: CheckoutContext):
+    for listener in order_placed_listeners:
+        listener(ctx.db, ctx.order)
+
+
+# Callables run as listener(db, order) once an order has been committed.
+order_placed_listeners = []
+
+DEFAULT_STAGES = (
+    ("validate", validate),
+    ("reserve", reserve),
+    ("price", price),
+    ("discount", discount),
+    ("persist", persist),
+    ("notify", notify),
+)
+
+
+class CheckoutPipeline:
+    """Runs checkout as a sequence of named, individually timed stages."""
+
+    def __init__(self, stages=DEFAULT_STAGES):
+        self.stages = list(stages)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def add_stage(self, name, func, before: str | None = None, after: str | None = None):
+        names = [n for n, _ in self.stages]
+        if before is not None:
+            index = names.index(before)
+        elif after is not None:
+            index = names.index(after) + 1
+        else:
+            index = len(self.stages)
+        self.stages.insert(index, (name, func))
+
+    def run(self, db: Session, request, **order_fields):
+        ctx = CheckoutContext(db=db, request=request, order_fields=order_fields)
+        for name, func in self.stages:
+            started = time.perf_counter()
+            try:
+                func(ctx)
+            finally:
+                self._record(ctx, name, (time.perf_counter() - started) * 1000)
+        ctx.order.checkout_timings = ctx.timings  # transient for Server-Timing
+        return ctx.order
+
+    def _record(self, ctx: CheckoutContext, name: str, elapsed_ms: float):
+        ctx.timings[name] = elapsed_ms
+        with self._lock:
+            stat = self._stats.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stat["count"] += 1
+            stat["total_ms"] += elapsed_ms
+            stat["max_ms"] = max(stat["max_ms"], elapsed_ms)
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: dict(stat, avg_ms=stat["total_ms"] / stat["count"])
+                for name, stat in self._stats.items()
+            }
+
+
+pipeline = CheckoutPipeline()
+
+
+def server_timing_header(timings):
+    """Render stage timings as a Server-Timing header value."""
+    return ", ".join(f"{name};dur={elapsed:.2f}" for name, elapsed in (timings or {}).items())
+
+
+def server_timing(order_obj):
+    """Render an order's stage timings as a Server-Timing header value."""
+    return server_timing_header(getattr(order_obj, "checkout_timings", None))
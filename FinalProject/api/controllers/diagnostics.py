@@ -0,0 +1,33 @@
+from fastapi import HTTPException, status
+from ..dependencies import async_database, database, pool_metrics, profiler
+
+
+def db_pool():
+    """Usage and checkout wait stats of this worker's connection pools."""
+    pools = {"sync": database.engine.pool}
+    for index, replica in enumerate(database.read_router.replicas):
+        pools[f"replica-{index}"] = replica.pool
+    async_engine = async_database.current_engine()
+    if async_engine is not None:
+        pools["async"] = async_engine.sync_engine.pool
+    return {
+        name: pool_metrics.snapshot(pool)
+        for name, pool in pools.items()
+        if isinstance(pool, pool_metrics.InstrumentedQueuePool | pool_metrics.InstrumentedAsyncQueuePool)
+    }
+
+
+def db_replicas():
+    return database.read_router.status()
+
+
+def profiles():
+    """Kept profiles, newest first (shared by every worker using profiler_dir)."""
+    return profiler.store.list()
+
+
+def profile(profile_id: str):
+    folded = profiler.store.folded(profile_id)
+    if folded is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found!")
+    return folded
@@ -0,0 +1,250 @@
+import hashlib
+import json
+import logging
+import threading
+from contextlib import contextmanager, nullcontext, suppress
+from datetime import datetime, timedelta
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import event, or_, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+from ..dependencies.config import conf
+from ..models import idempotency_key as model
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _key_lock(scope: str, key: str):
+    # Duplicates arriving at this worker queue here, so the second one finds
+    # the first one's stored response instead of a placeholder.
+    with _locks_guard:
+        entry = _locks.setdefault((scope, key), [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _locks_guard:
+            entry[1] -= 1
+            if not entry[1]:
+                del _locks[(scope, key)]
+
+
+def request_hash(payload):
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _replay(record):
+    return JSONResponse(
+        status_code=record.status_code,
+        content=json.loads(record.response_body),
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+def _existing(db: Session, scope: str, key: str, digest: str):
+    """The stored response for a live key, or None if the key is free."""
+    record = db.get(model.IdempotencyKey, (scope, key))
+    if record is None:
+        return None
+    if record.expires_at <= datetime.now():
+        db.delete(record)
+        db.commit()
+        return None
+    if record.request_hash != digest:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Idempotency-Key was already used with a different request.",
+        )
+    if record.status_code is None:
+        if record.in_progress_until is not None and record.in_progress_until >= record.expires_at:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key was already applied, but its response was not stored.",
+            )
+        # Claims from before leases existed count from created_at
+        lease_end = record.in_progress_until or record.created_at + timedelta(seconds=conf.idempotency_lease)
+        if lease_end > datetime.now():
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress.",
+            )
+        return None  # the claim's worker died before committing anything
+    return _replay(record)
+
+
+def _claim(db: Session, scope: str, key: str, digest: str):
+    """Insert the in-progress placeholder, or take over one whose lease ran out;
+    False if another request holds the key."""
+    now = datetime.now()
+    lease_end = now + timedelta(seconds=conf.idempotency_lease)
+    db.add(
+        model.IdempotencyKey(
+            scope=scope,
+            key=key,
+            request_hash=digest,
+            created_at=now,
+            expires_at=now + timedelta(seconds=conf.idempotency_ttl),
+            in_progress_until=lease_end,
+        )
+    )
+    try:
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+
+    record = model.IdempotencyKey
+    taken = db.execute(
+        update(record)
+        .where(record.scope == scope, record.key == key, record.request_hash == digest)
+        .where(record.status_code.is_(None), record.expires_at > now)
+        .where(
+            or_(
+                record.in_progress_until <= now,
+                (record.in_progress_until.is_(None))
+                & (record.created_at <= now - timedelta(seconds=conf.idempotency_lease)),
+            )
+        )
+        .values(in_progress_until=lease_end)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return taken.rowcount == 1
+
+
+@contextmanager
+def _pin_on_commit(db: Session, scope: str, key: str):
+    """Extend the claim to the key's expiry in the same transaction as the
+    handler's first commit, so once its work is committed the key can't be
+    taken over (and the work run again) when the lease runs out."""
+    record = model.IdempotencyKey
+    state = {"committed": False}
+
+    def pin(session):
+        if not state["committed"]:
+            session.execute(
+                update(record)
+                .where(record.scope == scope, record.key == key)
+                .values(in_progress_until=record.expires_at)
+                .execution_options(synchronize_session=False)
+            )
+
+    def committed(session):
+        state["committed"] = True
+
+    event.listen(db, "before_commit", pin)
+    event.listen(db, "after_commit", committed)
+    try:
+        yield state
+    finally:
+        event.remove(db, "before_commit", pin)
+        event.remove(db, "after_commit", committed)
+
+
+def _release(db: Session, scope: str, key: str):
+    """Free the key of a request that committed nothing."""
+    try:
+        db.rollback()
+        db.query(model.IdempotencyKey).filter(
+            model.IdempotencyKey.scope == scope, model.IdempotencyKey.key == key
+        ).delete(synchronize_session=False)
+        db.commit()
+    except SQLAlchemyError as e:
+        # Don't hide the handler's exception; the claim's lease runs out instead
+        logger.warning("could not release Idempotency-Key %s/%s: %s", scope, key, e)
+        with suppress(SQLAlchemyError):
+            db.rollback()
+
+
+def _store(db: Session, scope: str, key: str, status_code: int, body):
+    try:
+        db.query(model.IdempotencyKey).filter(
+            model.IdempotencyKey.scope == scope, model.IdempotencyKey.key == key
+        ).update({"status_code": status_code, "response_body": json.dumps(body)}, synchronize_session=False)
+        db.commit()
+    except SQLAlchemyError as e:
+        # The work is committed and the claim pinned, so retries get a 409
+        # rather than run it a second time.
+        logger.warning("could not store the response for Idempotency-Key %s/%s: %s", scope, key, e)
+        with suppress(SQLAlchemyError):
+            db.rollback()
+
+
+def _failure_response(exc: BaseException):
+    if isinstance(exc, HTTPException):
+        return exc.status_code, {"detail": jsonable_encoder(exc.detail)}
+    return status.HTTP_500_INTERNAL_SERVER_ERROR, {
+        "detail": "The request was applied, but producing its response failed."
+    }
+
+
+def run(db: Session, scope: str, key: str | None, payload, handler, response_model, status_code: int, coalesce: bool = True):
+    """Run handler() at most once per (scope, key) and replay its response after.
+
+    Retries with the same key and body get the stored response (with an
+    Idempotent-Replayed header) without running the handler; the same key
+    with a different body is rejected. Requests that fail before committing
+    anything are not stored, so they can be retried; one that fails after
+    committing stores its error, so the retry doesn't apply the work again.
+    Concurrent duplicates wait for the first one in this worker; across
+    workers the placeholder row turns them into 409s until its lease
+    (conf.idempotency_lease) runs out.
+    """
+    if key is None:
+        return handler()
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters.",
+        )
+    digest = request_hash(payload)
+
+    lock = _key_lock(scope, key) if coalesce else nullcontext()
+    with lock:
+        try:
+            stored = _existing(db, scope, key, digest)
+            if stored is not None:
+                return stored
+            if not _claim(db, scope, key, digest):
+                return _existing(db, scope, key, digest)
+        except SQLAlchemyError as e:
+            db.rollback()
+            error = str(e.__dict__.get("orig", e))
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+        with _pin_on_commit(db, scope, key) as handled:
+            try:
+                result = handler()
+            except BaseException as e:
+                if handled["committed"]:
+                    with suppress(SQLAlchemyError):
+                        db.rollback()
+                    _store(db, scope, key, *_failure_response(e))
+                else:
+                    _release(db, scope, key)
+                raise
+
+        body = response_model.model_validate(result, from_attributes=True).model_dump(mode="json")
+        _store(db, scope, key, status_code, body)
+    return result
+
+
+def purge_expired(db: Session):
+    """Delete expired keys; returns how many were removed."""
+    deleted = (
+        db.query(model.IdempotencyKey)
+        .filter(model.IdempotencyKey.expires_at <= datetime.now())
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
@@ -0,0 +1,74 @@
+from fastapi import HTTPException, status
+from sqlalchemy import case, or_, update
+from sqlalchemy.orm import Session
+from ..models import menu_item as menu_model
+from ..dependencies import metrics
+
+
+def reserve_stock(db: Session, quantities: dict[int, int]):
+    """Atomically decrement stock for every line of an order.
+
+    `quantities` maps menu_item_id -> requested quantity (ids must be unique).
+    The decrement is a single conditional UPDATE: a row only changes when it
+    has unlimited stock (NULL) or enough stock left, and the database
+    evaluates that condition under the row lock, so concurrent checkouts can't
+    oversell. If any line is short the whole reservation is rolled back and the
+    short items are reported. The caller commits as part of the order
+    transaction.
+    """
+    if not quantities:
+        return
+
+    item = menu_model.MenuItem
+    requested = case(quantities, value=item.id)
+    stmt = (
+        update(item)
+        .where(item.id.in_(list(quantities)))
+        .where(or_(item.stock.is_(None), item.stock >= requested))
+        .values(stock=item.stock - requested)
+        .execution_options(synchronize_session=False)
+    )
+    for _ in range(2):
+        result = db.execute(stmt)
+        if result.rowcount == len(quantities):
+            return
+        db.rollback()
+        shortages = find_shortages(db, quantities)
+        if shortages:
+            metrics.stock_outs.inc()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Insufficient stock for items: " + ", ".join(
+                    f"{s['name']} (id {s['menu_item_id']}, requested {s['requested']}, available {s['available']})"
+                    for s in shortages
+                ),
+            )
+        # Stock was replenished between the UPDATE and the check; try once more.
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Stock changed during checkout, please retry.",
+    )
+
+
+def find_shortages(db: Session, quantities: dict[int, int]):
+    """Return the lines of `quantities` that the current stock can't cover."""
+    rows = (
+        db.query(menu_model.MenuItem.id, menu_model.MenuItem.name, menu_model.MenuItem.stock)
+        .filter(menu_model.MenuItem.id.in_(list(quantities)))
+        .all()
+    )
+    found = {r.id: r for r in rows}
+    shortages = []
+    for menu_item_id in sorted(quantities):
+        row = found.get(menu_item_id)
+        available = 0 if row is None else row.stock
+        if available is not None and available < quantities[menu_item_id]:
+            shortages.append(
+                {
+                    "menu_item_id": menu_item_id,
+                    "name": row.name if row is not None else None,
+                    "requested": quantities[menu_item_id],
+                    "available": available,
+                }
+            )
+    return shortages
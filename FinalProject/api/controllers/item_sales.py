@@ -0,0 +1,118 @@
+from sqlalchemy import delete, func, insert
+from sqlalchemy.orm import Session
+from ..dependencies.upsert import increment
+from ..models import menu_item as menu_model
+from ..models import menu_item_sales as sales_model
+from ..models import order_details as order_detail_model
+
+
+def _line_total(od):
+    if od.line_total is not None:
+        return float(od.line_total)
+    # Lines saved before prices were recorded and not yet backfilled
+    return float(od.menu_item.price) * od.quantity
+
+
+def record(db: Session, order_details, sign: int = 1):
+    """Add (or with sign=-1, remove) detail lines from the per-item counters."""
+    totals = {}
+    for od in order_details:
+        quantity, revenue = totals.get(od.menu_item_id, (0, 0.0))
+        totals[od.menu_item_id] = (quantity + od.quantity, revenue + _line_total(od))
+    # Fixed id order keeps concurrent checkouts from deadlocking on the rows
+    for menu_item_id in sorted(totals):
+        quantity, revenue = totals[menu_item_id]
+        increment(
+            db,
+            sales_model.MenuItemSales,
+            {"menu_item_id": menu_item_id},
+            {"quantity_sold": sign * quantity, "revenue": sign * revenue},
+        )
+
+
+def top_items(db: Session, limit: int = 10):
+    rows = (
+        db.query(
+            sales_model.MenuItemSales.menu_item_id,
+            menu_model.MenuItem.name,
+            sales_model.MenuItemSales.quantity_sold,
+            sales_model.MenuItemSales.revenue,
+        )
+        .join(menu_model.MenuItem, menu_model.MenuItem.id == sales_model.MenuItemSales.menu_item_id)
+        .filter(sales_model.MenuItemSales.quantity_sold > 0)
+        .order_by(sales_model.MenuItemSales.quantity_sold.desc())
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "menu_item_id": r.menu_item_id,
+            "name": r.name,
+            "total_quantity": int(r.quantity_sold or 0),
+            "total_revenue": float(r.revenue or 0),
+        }
+        for r in rows
+    ]
+
+
+def compute_from_history(db: Session, batch_size: int = 1000):
+    """Recompute {menu_item_id: (quantity, revenue)} from order_details in id batches."""
+    detail = order_detail_model.OrderDetail
+    totals = {}
+    last_id = 0
+    while True:
+        rows = (
+            db.query(
+                detail.id,
+                detail.menu_item_id,
+                detail.quantity,
+                func.coalesce(detail.line_total, detail.quantity * menu_model.MenuItem.price).label("line_total"),
+            )
+            .outerjoin(menu_model.MenuItem, menu_model.MenuItem.id == detail.menu_item_id)
+            .filter(detail.id > last_id)
+            .order_by(detail.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return totals
+        for r in rows:
+            quantity, revenue = totals.get(r.menu_item_id, (0, 0.0))
+            totals[r.menu_item_id] = (quantity + r.quantity, revenue + float(r.line_total or 0))
+        last_id = rows[-1].id
+
+
+def verify(db: Session, batch_size: int = 1000):
+    """Return the items whose stored counters differ from a recomputation."""
+    expected = compute_from_history(db, batch_size=batch_size)
+    stored = {
+        r.menu_item_id: (r.quantity_sold, r.revenue)
+        for r in db.query(sales_model.MenuItemSales).all()
+    }
+    mismatches = []
+    for menu_item_id in sorted(set(expected) | set(stored)):
+        exp_qty, exp_rev = expected.get(menu_item_id, (0, 0.0))
+        got_qty, got_rev = stored.get(menu_item_id, (0, 0.0))
+        if exp_qty != got_qty or round(exp_rev, 2) != round(got_rev, 2):
+            mismatches.append(
+                {
+                    "menu_item_id": menu_item_id,
+                    "expected": {"quantity_sold": exp_qty, "revenue": exp_rev},
+                    "stored": {"quantity_sold": got_qty, "revenue": got_rev},
+                }
+            )
+    return mismatches
+
+
+def rebuild(db: Session, batch_size: int = 1000):
+    """Replace every counter with a recomputation from order history."""
+    totals = compute_from_history(db, batch_size=batch_size)
+    db.execute(delete(sales_model.MenuItemSales))
+    rows = [
+        {"menu_item_id": menu_item_id, "quantity_sold": quantity, "revenue": revenue}
+        for menu_item_id, (quantity, revenue) in sorted(totals.items())
+    ]
+    for start in range(0, len(rows), batch_size):
+        db.execute(insert(sales_model.MenuItemSales), rows[start:start + batch_size])
+    db.commit()
+    return len(rows)
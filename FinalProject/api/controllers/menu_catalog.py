@@ -0,0 +1,166 @@
+import threading
+import time
+import weakref
+from dataclasses import dataclass, replace
+from sqlalchemy.orm import Session
+from ..dependencies.config import conf
+from ..models import menu_item as menu_model
+from ..controllers import catalog_versions
+
+
+@dataclass(frozen=True)
+class CatalogItem:
+    id: int
+    name: str
+    description: str | None
+    price: float
+    category: str | None
+    calories: int | None
+    stock: int | None
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    version: int
+    items: tuple
+    by_id: dict
+    by_category: dict
+
+
+class _EngineCache:
+    def __init__(self):
+        self.snapshot = None
+        self.checked_at = 0.0
+
+
+_lock = threading.Lock()
+# One cache per database engine, so each database (primary, replica, test
+# fixture) is versioned independently.
+_caches = weakref.WeakKeyDictionary()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _load(db: Session, version: int):
+    items = tuple(
+        CatalogItem(
+            id=row.id,
+            name=row.name,
+            description=row.description,
+            price=float(row.price),
+            category=row.category,
+            calories=row.calories,
+            stock=row.stock,
+        )
+        for row in db.query(menu_model.MenuItem).order_by(menu_model.MenuItem.id)
+    )
+    by_category = {}
+    for item in items:
+        by_category.setdefault(item.category, []).append(item)
+    return _Snapshot(
+        version=version,
+        items=items,
+        by_id={item.id: item for item in items},
+        by_category={category: tuple(group) for category, group in by_category.items()},
+    )
+
+
+def _cache_for(db: Session):
+    bind = db.get_bind()
+    with _lock:
+        cache = _caches.get(bind)
+        if cache is None:
+            cache = _caches[bind] = _EngineCache()
+    return cache
+
+
+def snapshot(db: Session):
+    """Return the cached catalog, reloading it if the menu version moved on.
+
+    The version check is one primary-key read; with conf.catalog_version_ttl
+    set, a worker skips even that for the given number of seconds.
+    """
+    cache = _cache_for(db)
+    cached = cache.snapshot
+    now = time.monotonic()
+    if cached is not None and now - cache.checked_at < conf.catalog_version_ttl:
+        with _lock:
+            _stats["hits"] += 1
+        return cached
+
+    # Read the version before the rows so a snapshot is never labelled newer
+    # than its contents.
+    version = catalog_versions.current(db, catalog_versions.MENU)
+    if cached is not None and cached.version == version:
+        with _lock:
+            _stats["hits"] += 1
+            cache.checked_at = now
+        return cached
+
+    loaded = _load(db, version)
+    with _lock:
+        _stats["misses"] += 1
+        cache.snapshot = loaded
+        cache.checked_at = now
+    return loaded
+
+
+def invalidate(db: Session):
+    """Drop this worker's copy; other workers notice through the version."""
+    cache = _cache_for(db)
+    with _lock:
+        cache.snapshot = None
+
+
+def get_many(db: Session, ids):
+    """Catalog entries for the given ids (missing ids are left out)."""
+    by_id = snapshot(db).by_id
+    return {item_id: by_id[item_id] for item_id in ids if item_id in by_id}
+
+
+def _with_live_stock(db: Session, items):
+    # Stock moves with every checkout, so it is read fresh rather than cached.
+    ids = [item.id for item in items if item.stock is not None]
+    if not ids:
+        return list(items)
+    stock = dict(
+        db.query(menu_model.MenuItem.id, menu_model.MenuItem.stock)
+        .filter(menu_model.MenuItem.id.in_(ids))
+        .all()
+    )
+    return [replace(item, stock=stock.get(item.id)) if item.id in stock else item for item in items]
+
+
+def read_all(db: Session):
+    return _with_live_stock(db, snapshot(db).items)
+
+
+def read_category(db: Session, category: str):
+    return _with_live_stock(db, snapshot(db).by_category.get(category, ()))
+
+
+def listing(db: Session, category: str | None = None):
+    """Items (all, or one category) plus the catalog version they came from."""
+    snap = snapshot(db)
+    items = snap.by_category.get(category, ()) if category else snap.items
+    return snap.version, _with_live_stock(db, items)
+
+
+def read_one(db: Session, item_id: int):
+    item = snapshot(db).by_id.get(item_id)
+    if item is None:
+        return None
+    return _with_live_stock(db, [item])[0]
+
+
+def stats():
+    with _lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+        snapshots = [cache.snapshot for cache in _caches.values() if cache.snapshot is not None]
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / lookups if lookups else 0.0,
+        "versions": [snap.version for snap in snapshots],
+        "items": sum(len(snap.items) for snap in snapshots),
+    }
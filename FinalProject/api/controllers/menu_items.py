@@ -2,6 +2,9 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException, status, Response
 from sqlalchemy.exc import SQLAlchemyError
 from ..models import menu_item as model
+from ..dependencies import http_cache
+from ..controllers import catalog_versions
+from ..controllers import menu_catalog
 
 
 def create(db: Session, request):
@@ -15,18 +18,20 @@ def create(db: Session, request):
     )
     try:
         db.add(new_item)
+        catalog_versions.bump(db, catalog_versions.MENU)
         db.commit()
         db.refresh(new_item)
     except SQLAlchemyError as e:
         db.rollback()
         error = str(e.__dict__.get("orig", e))
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    menu_catalog.invalidate(db)
     return new_item
 
 
 def read_all(db: Session):
     try:
-        return db.query(model.MenuItem).all()
+        return menu_catalog.read_all(db)
     except SQLAlchemyError as e:
         error = str(e.__dict__.get("orig", e))
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
@@ -34,18 +39,32 @@ def read_all(db: Session):
 
 def read_filtered(db: Session, category: str | None = None):
     try:
-        query = db.query(model.MenuItem)
         if category:
-            query = query.filter(model.MenuItem.category == category)
-        return query.all()
+            return menu_catalog.read_category(db, category)
+        return menu_catalog.read_all(db)
     except SQLAlchemyError as e:
         error = str(e.__dict__.get("orig", e))
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
 
+def read_tagged(db: Session, category: str | None = None):
+    """Menu items with an ETag for exactly that content.
+
+    The tag combines the catalog version with the live stock levels, so it
+    changes on menu edits and on sales of limited-stock items alike.
+    """
+    try:
+        version, items = menu_catalog.listing(db, category)
+    except SQLAlchemyError as e:
+        error = str(e.__dict__.get("orig", e))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    stock = [(item.id, item.stock) for item in items if item.stock is not None]
+    return http_cache.etag("menu", version, category or "", stock), items
+
+
 def read_one(db: Session, item_id: int):
     try:
-        item = db.query(model.MenuItem).filter(model.MenuItem.id == item_id).first()
+        item = menu_catalog.read_one(db, item_id)
         if not item:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!"
@@ -65,7 +84,9 @@ def update(db: Session, item_id: int, request):
             )
         update_data = request.model_dump(exclude_unset=True)
         item_q.update(update_data, synchronize_session=False)
+        catalog_versions.bump(db, catalog_versions.MENU)
         db.commit()
+        menu_catalog.invalidate(db)
         return item_q.first()
     except SQLAlchemyError as e:
         db.rollback()
@@ -81,7 +102,9 @@ def delete(db: Session, item_id: int):
                 status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!"
             )
         item_q.delete(synchronize_session=False)
+        catalog_versions.bump(db, catalog_versions.MENU)
         db.commit()
+        menu_catalog.invalidate(db)
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     except SQLAlchemyError as e:
         db.rollback()
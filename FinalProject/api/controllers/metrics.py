@@ -0,0 +1,41 @@
+"""Prometheus text exposition of this worker's metrics for GET /metrics."""
+from ..dependencies import metrics
+from ..controllers import diagnostics, menu_catalog, tracking_cache
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (snapshot key, metric name, type, help, scale)
+POOL_METRICS = (
+    ("checked_out", "db_pool_checked_out", "gauge", "Connections currently checked out", 1),
+    ("capacity", "db_pool_capacity", "gauge", "pool_size + max_overflow", 1),
+    ("overflow", "db_pool_overflow", "gauge", "Connections open beyond pool_size", 1),
+    ("peak_checked_out", "db_pool_peak_checked_out", "gauge", "Most connections checked out at once", 1),
+    ("checkouts", "db_pool_checkouts_total", "counter", "Successful connection checkouts", 1),
+    ("timeouts", "db_pool_timeouts_total", "counter", "Checkouts that timed out waiting for a connection", 1),
+    ("max_wait_ms", "db_pool_checkout_wait_seconds_max", "gauge", "Longest wait for a connection", 0.001),
+)
+
+
+def _cache_lines():
+    caches = {"menu": menu_catalog.stats(), "tracking": tracking_cache.stats()}
+    hits = [("", {"cache": name}, s["hits"] + s.get("negative_hits", 0)) for name, s in caches.items()]
+    misses = [("", {"cache": name}, s["misses"]) for name, s in caches.items()]
+    ratios = [("", {"cache": name}, s["hit_ratio"]) for name, s in caches.items()]
+    return (
+        metrics.exposition("cache_hits_total", "counter", "Cache lookups answered from memory", hits)
+        + metrics.exposition("cache_misses_total", "counter", "Cache lookups that went to the database", misses)
+        + metrics.exposition("cache_hit_ratio", "gauge", "hits / lookups since the worker started", ratios)
+    )
+
+
+def _pool_lines():
+    pools = diagnostics.db_pool()
+    lines = []
+    for key, name, kind, help_text, scale in POOL_METRICS:
+        samples = [("", {"pool": pool}, snapshot[key] * scale) for pool, snapshot in pools.items()]
+        lines += metrics.exposition(name, kind, help_text, samples)
+    return lines
+
+
+def render():
+    return "\n".join(metrics.render_registry() + _pool_lines() + _cache_lines()) + "\n"
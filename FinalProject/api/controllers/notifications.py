@@ -1,6 +1,10 @@
+from datetime import datetime
 from fastapi import HTTPException, status
+from sqlalchemy import insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
+from ..dependencies import channels
+from ..dependencies import fast_json
 from ..models import notification as notification_model
 from ..models import order as order_model
 from ..schemas import notification as notification_schema
@@ -29,13 +33,80 @@ def create(db: Session, order_id: int | None, message: str, channel: str = "mock
     return new_item
 
 
-def send_test(db: Session, message: str = "Test notification", order_id: int | None = None):
-    return create(db, order_id=order_id, message=message)
+def enqueue(db: Session, order_id: int | None, message: str, channel: str = "mock"):
+    """Add a pending notification to the caller's transaction (the outbox).
+
+    Nothing is committed here: the row is written together with the change
+    it reports, and the dispatcher delivers it afterwards.
+    """
+    if channel not in channels.CHANNELS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown notification channel: {channel}",
+        )
+    notif = notification_model.Notification(
+        order_id=order_id,
+        message=message,
+        channel=channel,
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.now(),
+    )
+    db.add(notif)
+    return notif
+
+
+def enqueue_many(db: Session, notices):
+    """Queue (order_id, message) pairs on every configured channel in one INSERT."""
+    now = datetime.now()
+    rows = [
+        {
+            "order_id": order_id,
+            "message": message,
+            "channel": channel,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+        }
+        for order_id, message in notices
+        for channel in channels.configured_channels()
+    ]
+    if rows:
+        db.execute(insert(notification_model.Notification), rows)
+    return len(rows)
+
+
+def status_message(order_id: int, new_status: str):
+    return f"Order {order_id} status updated to {new_status}"
+
+
+def send_test(db: Session, message: str = "Test notification", order_id: int | None = None, channel: str = "mock"):
+    """Queue a test message on one channel; the dispatcher delivers it."""
+    if order_id is not None:
+        order_exists = db.query(order_model.Order.id).filter(order_model.Order.id == order_id).first()
+        if not order_exists:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found for notification.")
+    notif = enqueue(db, order_id=order_id, message=message, channel=channel)
+    try:
+        db.commit()
+        db.refresh(notif)
+    except SQLAlchemyError as e:
+        db.rollback()
+        error = str(e.__dict__.get("orig", e))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    return notif
 
 
 def log_status_notification(db: Session, order_id: int, new_status: str):
-    message = f"Order {order_id} status updated to {new_status}"
-    return create(db, order_id=order_id, message=message)
+    """Queue the status-change notice on every configured channel.
+
+    Call before committing the status change.
+    """
+    message = status_message(order_id, new_status)
+    return [
+        enqueue(db, order_id=order_id, message=message, channel=channel)
+        for channel in channels.configured_channels()
+    ]
 
 
 def read_all(db: Session):
@@ -46,6 +117,18 @@ def read_all(db: Session):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
 
+def read_all_rows(db: Session):
+    """read_all for the fast JSON path: the response fields as plain dicts."""
+    try:
+        query = db.query(
+            *fast_json.columns(notification_model.Notification, notification_schema.NotificationResponse)
+        )
+        return fast_json.as_dicts(query)
+    except SQLAlchemyError as e:
+        error = str(e.__dict__.get("orig", e))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+
 def read_one(db: Session, item_id: int):
     try:
         notif = (
@@ -1,23 +1,40 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status, Response
 from sqlalchemy.exc import SQLAlchemyError
 from ..models import order_details as model
+from ..models import menu_item as menu_model
+from ..controllers import item_sales as item_sales_controller
+from ..controllers import tracking_cache
+
+
+def _menu_price(db: Session, menu_item_id: int):
+    price = db.query(menu_model.MenuItem.price).filter(menu_model.MenuItem.id == menu_item_id).scalar()
+    if price is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Menu item not found!")
+    return float(price)
 
 
 def create(db: Session, request):
+    unit_price = _menu_price(db, request.menu_item_id)
     new_item = model.OrderDetail(
         order_id=request.order_id,
         menu_item_id=request.menu_item_id,
         quantity=request.quantity,
+        unit_price=unit_price,
+        line_total=unit_price * request.quantity,
     )
 
     try:
         db.add(new_item)
+        db.flush()
+        item_sales_controller.record(db, [new_item])
         db.commit()
         db.refresh(new_item)
     except SQLAlchemyError as e:
         error = str(e.__dict__["orig"])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    tracking_cache.invalidate_orders(new_item.order_id)
 
     return new_item
 
@@ -44,26 +61,71 @@ def read_one(db: Session, item_id):
 
 def update(db: Session, item_id, request):
     try:
-        item = db.query(model.OrderDetail).filter(model.OrderDetail.id == item_id)
-        if not item.first():
+        item = db.query(model.OrderDetail).filter(model.OrderDetail.id == item_id).first()
+        if not item:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
         update_data = request.dict(exclude_unset=True)
-        item.update(update_data, synchronize_session=False)
+        previous_order_id = item.order_id
+        item_sales_controller.record(db, [item], sign=-1)
+        if update_data.get("menu_item_id") not in (None, item.menu_item_id):
+            item.unit_price = _menu_price(db, update_data["menu_item_id"])
+        for field, value in update_data.items():
+            setattr(item, field, value)
+        if item.unit_price is not None:
+            item.line_total = item.unit_price * item.quantity
+        item_sales_controller.record(db, [item])
         db.commit()
     except SQLAlchemyError as e:
         error = str(e.__dict__["orig"])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-    return item.first()
+    tracking_cache.invalidate_orders(previous_order_id, item.order_id)
+    return item
 
 
 def delete(db: Session, item_id):
     try:
-        item = db.query(model.OrderDetail).filter(model.OrderDetail.id == item_id)
-        if not item.first():
+        item = db.query(model.OrderDetail).filter(model.OrderDetail.id == item_id).first()
+        if not item:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
-        item.delete(synchronize_session=False)
+        item_sales_controller.record(db, [item], sign=-1)
+        order_id = item.order_id
+        db.delete(item)
         db.commit()
     except SQLAlchemyError as e:
         error = str(e.__dict__["orig"])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    tracking_cache.invalidate_orders(order_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+def backfill_prices(db: Session, batch_size: int = 1000):
+    """Fill unit_price/line_total on lines saved before prices were recorded.
+
+    Legacy lines are priced at the current menu price (the best record
+    left), one committed batch at a time so the table is never locked long.
+    """
+    menu_price = (
+        select(menu_model.MenuItem.price)
+        .where(menu_model.MenuItem.id == model.OrderDetail.menu_item_id)
+        .scalar_subquery()
+    )
+    filled = 0
+    last_id = 0
+    while True:
+        ids = [
+            row.id
+            for row in db.query(model.OrderDetail.id)
+            .filter(model.OrderDetail.unit_price.is_(None))
+            .filter(model.OrderDetail.id > last_id)
+            .order_by(model.OrderDetail.id)
+            .limit(batch_size)
+        ]
+        if not ids:
+            return filled
+        db.query(model.OrderDetail).filter(model.OrderDetail.id.in_(ids)).update(
+            {"unit_price": menu_price, "line_total": model.OrderDetail.quantity * menu_price},
+            synchronize_session=False,
+        )
+        db.commit()
+        filled += len(ids)
+        last_id = ids[-1]
@@ -0,0 +1,237 @@
+import asyncio
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from ..dependencies.config import conf
+from ..dependencies.events import RESYNC, bus, sse
+from ..models import order as order_model
+from ..controllers import notifications as notification_controller
+from ..controllers import sales_rollup as sales_rollup_controller
+from ..controllers import tracking_cache
+
+# Allowed moves from each status; Paid -> Pending undoes a reversed payment.
+TRANSITIONS = {
+    "Pending": {"Paid", "Cancelled"},
+    "Paid": {"Preparing", "Pending", "Cancelled"},
+    "Preparing": {"Ready", "Cancelled"},
+    "Ready": {"Completed", "Cancelled"},
+    "Completed": set(),
+    "Cancelled": set(),
+}
+STATUSES = tuple(TRANSITIONS)
+# In-flight statuses shown on the kitchen display, in the order they are worked
+ACTIVE = ("Pending", "Paid", "Preparing", "Ready")
+TERMINAL = ("Completed", "Cancelled")
+# Event bus topic for every committed status change
+CHANGES = "orders.status"
+
+
+def can_transition(current: str | None, new: str):
+    return new in TRANSITIONS.get(current or "Pending", set())
+
+
+def check_transition(current: str | None, new: str | None):
+    """Raise a 400 unless an order in `current` may move to `new`."""
+    if new not in TRANSITIONS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown status: {new}")
+    if new != current and not can_transition(current, new):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Order cannot move from {current} to {new}.",
+        )
+
+
+def sources_for(new: str):
+    """Statuses an order may be in to move to `new`."""
+    return sorted(current for current, targets in TRANSITIONS.items() if new in targets)
+
+
+def bulk_update(db: Session, changes):
+    """Apply many (order_id, new_status) changes in one transaction.
+
+    Every change is validated first and nothing is written unless all are
+    allowed. Orders are then moved with one UPDATE per target status, the
+    sales rollup with one upsert per affected row, and the notifications
+    with a single INSERT.
+    """
+    targets = {}
+    for change in changes:
+        if change.order_id in targets:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Order {change.order_id} appears more than once.",
+            )
+        targets[change.order_id] = change.status
+
+    unknown = sorted({s for s in targets.values() if s not in TRANSITIONS})
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown statuses: {unknown}")
+
+    order = order_model.Order
+    try:
+        rows = (
+            db.query(
+                order.id,
+                order.status,
+                order.order_date,
+                order.order_type,
+                order.total_price,
+                order.discount_amount,
+                order.tracking_number,
+            )
+            .filter(order.id.in_(list(targets)))
+            .with_for_update()
+            .all()
+        )
+        current = {row.id: row for row in rows}
+        missing = sorted(set(targets) - set(current))
+        if missing:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Orders not found: {missing}")
+        invalid = [
+            f"{order_id}: {current[order_id].status} -> {new}"
+            for order_id, new in targets.items()
+            if current[order_id].status != new and not can_transition(current[order_id].status, new)
+        ]
+        if invalid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Transitions not allowed: {invalid}",
+            )
+
+        moved = {order_id: new for order_id, new in targets.items() if current[order_id].status != new}
+        by_target = {}
+        for order_id, new in moved.items():
+            by_target.setdefault(new, []).append(order_id)
+        for new, ids in sorted(by_target.items()):
+            result = db.execute(
+                update(order)
+                .where(order.id.in_(ids), order.status.in_(sources_for(new)))
+                .values(status=new)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != len(ids):
+                # Another request moved some of these orders after validation
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Orders changed status concurrently; retry the update.",
+                )
+
+        signed = []
+        for order_id, new in moved.items():
+            before = sales_rollup_controller.snapshot(current[order_id])
+            signed.append((before, -1))
+            signed.append((before[:2] + (new,) + before[3:], 1))
+        sales_rollup_controller.apply_many(db, signed)
+        notification_controller.enqueue_many(
+            db, [(order_id, notification_controller.status_message(order_id, new)) for order_id, new in moved.items()]
+        )
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        error = str(e.__dict__.get("orig", e))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    except HTTPException:
+        db.rollback()
+        raise
+
+    tracking_cache.invalidate(*(current[order_id].tracking_number for order_id in moved))
+    for order_id, new in moved.items():
+        row = current[order_id]
+        publish(order_id, row.tracking_number, row.order_date, row.status, new)
+    return {
+        "updated": len(moved),
+        "unchanged": len(targets) - len(moved),
+        "changes": [
+            {"order_id": order_id, "from": current[order_id].status, "to": new}
+            for order_id, new in moved.items()
+        ],
+    }
+
+
+def publish(order_id: int, tracking_number: str | None, order_date, previous: str | None, new: str):
+    """Announce a committed status change to this worker's subscribers."""
+    change = {
+        "order_id": order_id,
+        "tracking_number": tracking_number,
+        "order_date": order_date.isoformat() if order_date else None,
+        "from": previous,
+        "to": new,
+    }
+    # Keyed by tracking number so customer streams only wake for their order
+    bus.publish(CHANGES, change, key=tracking_number)
+
+
+def publish_change(order_obj, previous: str | None):
+    if order_obj.status != previous:
+        publish(order_obj.id, order_obj.tracking_number, order_obj.order_date, previous, order_obj.status)
+
+
+def version():
+    return bus.version(CHANGES)
+
+
+async def wait_for_change(since: int, timeout: float):
+    return await bus.wait(CHANGES, since, timeout)
+
+
+async def stream_changes(request, statuses=ACTIVE):
+    """SSE stream of status changes touching `statuses`, with keep-alives.
+
+    Starts with a `hello` event carrying the current version; a `resync`
+    event means changes were dropped and the display should refetch.
+    """
+    watched = set(statuses)
+    with bus.subscribe(CHANGES) as subscription:
+        yield sse({"version": version()}, event="hello")
+        while not await request.is_disconnected():
+            try:
+                item = await subscription.get(conf.sse_keepalive_interval)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if item is RESYNC:
+                yield sse({"version": version()}, event="resync")
+                continue
+            event_version, change = item
+            if change["from"] in watched or change["to"] in watched:
+                yield sse(change, event="status", id=event_version)
+
+
+async def stream_tracking(request, current: dict, since: int, refresh):
+    """SSE stream of one order's status until it is Completed or Cancelled.
+
+    `current` is the status read at version() `since`; if any order changed
+    before the stream subscribed, `refresh()` re-reads it so no change to
+    this one is missed. Each event carries the order's status (and the
+    previous one on changes).
+    """
+    with bus.subscribe(CHANGES, key=current["tracking_number"]) as subscription:
+        if version() > since:
+            current = await run_in_threadpool(refresh)
+        yield sse(current, event="status")
+        state = current["status"]
+        while state not in TERMINAL and not await request.is_disconnected():
+            try:
+                item = await subscription.get(conf.sse_keepalive_interval)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if item is RESYNC:
+                current = await run_in_threadpool(refresh)
+                yield sse(current, event="status")
+                state = current["status"]
+                continue
+            event_version, change = item
+            state = change["to"]
+            yield sse(
+                {
+                    "order_id": change["order_id"],
+                    "tracking_number": change["tracking_number"],
+                    "status": state,
+                    "previous": change["from"],
+                },
+                event="status",
+                id=event_version,
+            )
@@ -1,115 +1,234 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from datetime import date, datetime, time, timedelta
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import func, select, or_, and_
 from fastapi import HTTPException, status, Response
 from sqlalchemy.exc import SQLAlchemyError
 from ..models import order as model
-from ..models import menu_item as menu_model
 from ..models import order_details as order_detail_model
-from ..controllers import promotions as promotion_controller
+from ..models import payment as payment_model
+from ..schemas import order as order_schema
+from ..schemas import order_details as order_detail_schema
+from ..schemas import payment as payment_schema
+from ..dependencies import fast_json
 from ..controllers import notifications as notification_controller
-from uuid import uuid4
+from ..controllers import checkout as checkout_controller
+from ..controllers import sales_rollup as sales_rollup_controller
+from ..controllers import item_sales as item_sales_controller
+from ..controllers import order_status as order_status_controller
+from ..controllers import tracking_cache
 
 
 def create(db: Session, request):
-    # Expect items for registered user checkout
-    if not request.items:
+    return checkout_controller.pipeline.run(db, request, user_id=request.user_id)
+
+
+MAX_PAGE_SIZE = 200
+STREAM_CHUNK_SIZE = 500
+
+
+def parse_date(value: str, name: str):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Order must contain at least one menu item.",
+            detail=f"Invalid {name}: expected YYYY-MM-DD.",
         )
 
-    menu_item_ids = [item.menu_item_id for item in request.items]
-    existing_items = (
-        db.query(menu_model.MenuItem)
-        .filter(menu_model.MenuItem.id.in_(menu_item_ids))
-        .all()
+
+def order_date_filters(start_date: str | None, end_date: str | None):
+    """Filters for an inclusive day range as a half-open datetime range.
+
+    Comparing the bare column (instead of DATE(order_date)) lets the
+    order_date indexes serve the range.
+    """
+    filters = []
+    if start_date:
+        start = parse_date(start_date, "start_date")
+        filters.append(model.Order.order_date >= datetime.combine(start, time.min))
+    if end_date:
+        end = parse_date(end_date, "end_date") + timedelta(days=1)
+        filters.append(model.Order.order_date < datetime.combine(end, time.min))
+    return filters
+
+
+def list_options():
+    # selectinload keeps LIMIT/yield_per on the orders rows themselves
+    return (
+        selectinload(model.Order.order_details),
+        joinedload(model.Order.payment),
     )
-    existing_item_map = {item.id: item for item in existing_items}
-    missing_items = sorted(set(menu_item_ids) - set(existing_item_map.keys()))
-    if missing_items:
+
+
+LIST_ORDERING = (model.Order.order_date.desc(), model.Order.id.desc())
+
+
+def list_filters(user_id: int | None, start_date: str | None, end_date: str | None):
+    filters = order_date_filters(start_date, end_date)
+    if user_id is not None:
+        filters.append(model.Order.user_id == user_id)
+    return filters
+
+
+def cursor_anchor(cursor: int):
+    """The order_date of order `cursor`, which after_cursor pages from."""
+    return select(model.Order.order_date).where(model.Order.id == cursor)
+
+
+def after_cursor(cursor: int, found):
+    """Rows that sort after order `cursor` in LIST_ORDERING.
+
+    `found` is the row cursor_anchor returned. A cursor whose order has since
+    been deleted is rejected rather than matching nothing, which would look
+    like the end of the list.
+    """
+    if found is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Menu items not found: {missing_items}",
+            detail="Invalid cursor: that order no longer exists, start again from the first page.",
         )
+    anchor = found.order_date
+    return or_(
+        model.Order.order_date < anchor,
+        and_(model.Order.order_date == anchor, model.Order.id < cursor),
+    )
 
-    total_price = 0.0
-    order_details = []
-    # Enforce stock availability using menu_item.stock
-    for item in request.items:
-        menu_item_obj = existing_item_map[item.menu_item_id]
-        if menu_item_obj.stock is not None and menu_item_obj.stock < item.quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Insufficient stock for item {menu_item_obj.name} (id {menu_item_obj.id}).",
-            )
 
-    for item in request.items:
-        menu_item_obj = existing_item_map[item.menu_item_id]
-        unit_price = float(menu_item_obj.price)
-        line_total = unit_price * item.quantity
-        total_price += line_total
-        od = order_detail_model.OrderDetail(
-            menu_item_id=item.menu_item_id,
-            quantity=item.quantity,
-        )
-        od.menu_item = menu_item_obj
-        od.unit_price = unit_price  # transient for response
-        od.line_total = line_total
-        order_details.append(od)
-        if menu_item_obj.stock is not None:
-            menu_item_obj.stock = max(0, menu_item_obj.stock - item.quantity)
-
-    promotion = None
-    if request.promo_code:
-        promotion = promotion_controller.get_valid_promotion(db, request.promo_code)
-        discount = (promotion.discount_percent or 0) / 100
-        total_price = max(0.0, total_price * (1 - discount))
-
-    new_item = model.Order(
-        status="Pending",
-        total_price=total_price,
-        tracking_number=str(uuid4()),
-        order_type=request.order_type or "takeout",
-        user_id=request.user_id,
-        order_details=order_details,
-        promotion_id=promotion.id if promotion else None,
-        promotion_code=promotion.promo_code if promotion else None,
-        promotion_discount=promotion.discount_percent if promotion else 0,
+def _list_query(db: Session, user_id: int | None, start_date: str | None, end_date: str | None):
+    return (
+        db.query(model.Order)
+        .options(*list_options())
+        .filter(*list_filters(user_id, start_date, end_date))
+        .order_by(*LIST_ORDERING)
     )
 
+
+def read_all(db: Session, user_id: int | None = None, start_date: str | None = None, end_date: str | None = None):
     try:
-        db.add(new_item)
-        db.commit()
-        db.refresh(new_item)
+        result = _list_query(db, user_id, start_date, end_date).all()
     except SQLAlchemyError as e:
-        db.rollback()
-        error = str(e.__dict__.get("orig", e))
+        error = str(e.__dict__["orig"])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    return result
 
-    _attach_line_totals(new_item)
-    return new_item
 
+def read_page(
+    db: Session,
+    user_id: int | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    cursor: int | None = None,
+    limit: int = 50,
+):
+    """Return one page of orders, newest first, and the cursor for the next page.
+
+    Pages are keyset-paginated on (order_date, id): `cursor` is the id of the
+    last order of the previous page, so each page is an index range scan no
+    matter how deep into the history it is.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    try:
+        query = _list_query(db, user_id, start_date, end_date)
+        if cursor is not None:
+            query = query.filter(after_cursor(cursor, db.execute(cursor_anchor(cursor)).first()))
+        rows = query.limit(limit + 1).all()
+    except SQLAlchemyError as e:
+        error = str(e.__dict__["orig"])
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def attach_rows(db: Session, orders):
+    """Fill in order_details and payment on order row dicts, with one query each."""
+    by_id = {}
+    for order_row in orders:
+        order_row["order_details"] = []
+        order_row["payment"] = None
+        by_id[order_row["id"]] = order_row
+    if not by_id:
+        return orders
+    details = (
+        db.query(*fast_json.columns(order_detail_model.OrderDetail, order_detail_schema.OrderDetail))
+        .filter(order_detail_model.OrderDetail.order_id.in_(list(by_id)))
+        .order_by(order_detail_model.OrderDetail.id)
+    )
+    for detail in fast_json.as_dicts(details):
+        by_id[detail["order_id"]]["order_details"].append(detail)
+    payments = db.query(*fast_json.columns(payment_model.Payment, payment_schema.PaymentResponse)).filter(
+        payment_model.Payment.order_id.in_(list(by_id))
+    )
+    for payment in fast_json.as_dicts(payments):
+        by_id[payment["order_id"]]["payment"] = payment
+    return orders
+
+
+def read_page_rows(
+    db: Session,
+    user_id: int | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    cursor: int | None = None,
+    limit: int = 50,
+):
+    """read_page for the fast JSON path: plain dicts shaped like OrderResponse."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    try:
+        query = (
+            db.query(*fast_json.columns(model.Order, order_schema.OrderResponse, exclude=("order_details", "payment")))
+            .filter(*list_filters(user_id, start_date, end_date))
+            .order_by(*LIST_ORDERING)
+        )
+        if cursor is not None:
+            query = query.filter(after_cursor(cursor, db.execute(cursor_anchor(cursor)).first()))
+        rows = fast_json.as_dicts(query.limit(limit + 1))
+        next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+        return attach_rows(db, rows[:limit]), next_cursor
+    except SQLAlchemyError as e:
+        error = str(e.__dict__["orig"])
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
-def read_all(db: Session, user_id: int | None = None, start_date: str | None = None, end_date: str | None = None):
+
+def stream_all(
+    db: Session,
+    user_id: int | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+):
+    """Yield every matching order as one NDJSON line, fetching in chunks."""
+    query = _list_query(db, user_id, start_date, end_date).yield_per(chunk_size)
+    for order_obj in query:
+        yield order_schema.OrderResponse.model_validate(order_obj, from_attributes=True).model_dump_json() + "\n"
+
+
+def read_active(db: Session, statuses=None, limit: int = MAX_PAGE_SIZE):
+    """In-flight orders, oldest first, for the kitchen display.
+
+    One query per status, each a range of the (status, order_date) index, so
+    only in-flight rows are read however long the order history gets. (With
+    `status IN (...)` the planner walks the order_date index over every order
+    instead.) The oldest `limit` of the merged results are returned.
+    """
+    statuses = [s for s in (statuses or order_status_controller.ACTIVE) if s in order_status_controller.ACTIVE]
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows = []
     try:
-        result = (
-            db.query(model.Order)
-            .options(
-                joinedload(model.Order.order_details).joinedload(order_detail_model.OrderDetail.menu_item),
-                joinedload(model.Order.payment),
+        for order_status in dict.fromkeys(statuses):
+            rows += (
+                db.query(model.Order)
+                .options(*list_options())
+                .filter(model.Order.status == order_status)
+                .order_by(model.Order.order_date, model.Order.id)
+                .limit(limit)
+                .all()
             )
-        )
-        if user_id is not None:
-            result = result.filter(model.Order.user_id == user_id)
-        if start_date:
-            result = result.filter(func.date(model.Order.order_date) >= start_date)
-        if end_date:
-            result = result.filter(func.date(model.Order.order_date) <= end_date)
-        result = result.all()
     except SQLAlchemyError as e:
         error = str(e.__dict__["orig"])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-    return result
+    # NULL dates sort first, as they do in SQL
+    rows.sort(key=lambda o: (o.order_date is not None, o.order_date or datetime.min, o.id))
+    return rows[:limit]
 
 
 def read_one(db: Session, item_id):
@@ -117,7 +236,7 @@ def read_one(db: Session, item_id):
         item = (
             db.query(model.Order)
             .options(
-                joinedload(model.Order.order_details).joinedload(order_detail_model.OrderDetail.menu_item),
+                joinedload(model.Order.order_details),
                 joinedload(model.Order.payment),
             )
             .filter(model.Order.id == item_id)
@@ -131,17 +250,34 @@ def read_one(db: Session, item_id):
     return item
 
 
+def render(order_obj):
+    # A detached, plain-data copy of the order that is safe to share between requests
+    return order_schema.OrderResponse.model_validate(order_obj, from_attributes=True)
+
+
+def _tracked(db: Session, tracking_number: str):
+    """The rendered order for a tracking number (None if there is none), cached."""
+    cached = tracking_cache.get(tracking_number)
+    if cached is not tracking_cache.MISS:
+        return cached
+    loaded_at = tracking_cache.generation()
+    item = (
+        db.query(model.Order)
+        .options(
+            joinedload(model.Order.order_details),
+            joinedload(model.Order.payment),
+        )
+        .filter(model.Order.tracking_number == tracking_number)
+        .first()
+    )
+    rendered = render(item) if item else None
+    tracking_cache.put(tracking_number, rendered, loaded_at)
+    return rendered
+
+
 def track_by_number(db: Session, tracking_number: str):
     try:
-        item = (
-            db.query(model.Order)
-            .options(
-                joinedload(model.Order.order_details).joinedload(order_detail_model.OrderDetail.menu_item),
-                joinedload(model.Order.payment),
-            )
-            .filter(model.Order.tracking_number == tracking_number)
-            .first()
-        )
+        item = _tracked(db, tracking_number)
         if not item:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Tracking number not found!"
@@ -152,23 +288,37 @@ def track_by_number(db: Session, tracking_number: str):
     return item
 
 
-def track_by_tracking_and_name(db: Session, tracking_number: str, name: str | None = None):
+def track_status(db: Session, tracking_number: str):
+    """Current status of an order by tracking number, without its details."""
     try:
-        query = (
-            db.query(model.Order)
-            .options(
-                joinedload(model.Order.order_details).joinedload(order_detail_model.OrderDetail.menu_item),
-                joinedload(model.Order.payment),
-            )
+        row = (
+            db.query(model.Order.id, model.Order.status)
             .filter(model.Order.tracking_number == tracking_number)
+            .first()
         )
-        if name:
-            lowered = name.strip().lower()
-            query = query.filter(
-                func.lower(model.Order.guest_name) == lowered
-            )
-        item = query.first()
-        if not item:
+    except SQLAlchemyError as e:
+        error = str(e.__dict__["orig"])
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    finally:
+        # Event streams keep the session for their whole lifetime; hand the
+        # connection back to the pool now instead
+        db.close()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tracking number not found!")
+    return {"order_id": row.id, "tracking_number": tracking_number, "status": row.status}
+
+
+def matches_name(rendered, name: str | None):
+    """Whether a rendered order belongs to guest `name` (any order when no name is given)."""
+    if not name:
+        return True
+    return (rendered.guest_name or "").lower() == name.strip().lower()
+
+
+def track_by_tracking_and_name(db: Session, tracking_number: str, name: str | None = None):
+    try:
+        item = _tracked(db, tracking_number)
+        if not item or not matches_name(item, name):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Tracking number (and name, if provided) not found!",
@@ -199,18 +349,18 @@ def update_guest_details(db: Session, item_id: int, request):
             detail="Provide guest_name, guest_email, guest_phone, description, or order_type to update.",
         )
 
-    if "guest_name" in update_data:
-        order_obj.guest_name = update_data["guest_name"]
-    if "guest_phone" in update_data:
-        order_obj.guest_phone = update_data["guest_phone"]
-    if "guest_email" in update_data:
-        order_obj.guest_email = update_data["guest_email"]
-    if "description" in update_data:
-        order_obj.description = update_data["description"]
-    if "order_type" in update_data and update_data["order_type"]:
-        order_obj.order_type = update_data["order_type"]
-
     try:
+        with sales_rollup_controller.tracking(db, order_obj):
+            if "guest_name" in update_data:
+                order_obj.guest_name = update_data["guest_name"]
+            if "guest_phone" in update_data:
+                order_obj.guest_phone = update_data["guest_phone"]
+            if "guest_email" in update_data:
+                order_obj.guest_email = update_data["guest_email"]
+            if "description" in update_data:
+                order_obj.description = update_data["description"]
+            if "order_type" in update_data and update_data["order_type"]:
+                order_obj.order_type = update_data["order_type"]
         db.commit()
         db.refresh(order_obj)
     except SQLAlchemyError as e:
@@ -218,31 +368,36 @@ def update_guest_details(db: Session, item_id: int, request):
         error = str(e.__dict__.get("orig", e))
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
+    tracking_cache.invalidate(order_obj.tracking_number)
     return order_obj
 
 
 def update(db: Session, item_id, request):
     try:
-        item = db.query(model.Order).filter(model.Order.id == item_id)
-        existing = item.first()
+        existing = db.query(model.Order).filter(model.Order.id == item_id).with_for_update().first()
         if not existing:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
         update_data = request.model_dump(exclude_unset=True)
-        status_changed = "status" in update_data and update_data["status"] != existing.status
-        item.update(update_data, synchronize_session=False)
-        db.commit()
-        updated = item.first()
+        previous = existing.status
+        previous_tracking_number = existing.tracking_number
+        status_changed = "status" in update_data and update_data["status"] != previous
         if status_changed:
-            try:
-                notification_controller.log_status_notification(
-                    db=db, order_id=updated.id, new_status=updated.status
-                )
-            except HTTPException:
-                # Notification failure shouldn't break order update
-                pass
+            order_status_controller.check_transition(previous, update_data["status"])
+        with sales_rollup_controller.tracking(db, existing):
+            for field, value in update_data.items():
+                setattr(existing, field, value)
+        if status_changed:
+            notification_controller.log_status_notification(
+                db=db, order_id=existing.id, new_status=existing.status
+            )
+        db.commit()
+        updated = existing
     except SQLAlchemyError as e:
         error = str(e.__dict__["orig"])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    tracking_cache.invalidate(previous_tracking_number, updated.tracking_number)
+    if status_changed:
+        order_status_controller.publish_change(updated, previous)
     return updated
 
 
@@ -260,12 +415,16 @@ def delete(db: Session, item_id):
         if not order_obj:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
 
+        sales_rollup_controller.record(db, order_obj, sign=-1)
+        item_sales_controller.record(db, order_obj.order_details, sign=-1)
+        tracking_number = order_obj.tracking_number
         # Use ORM delete so cascades (order_details, payment) are honored by DB constraints.
         db.delete(order_obj)
         db.commit()
     except SQLAlchemyError as e:
         error = str(e.__dict__["orig"])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    tracking_cache.invalidate(tracking_number)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -279,93 +438,11 @@ def total_price_for_user(db: Session, user_id: int):
 
 
 def create_guest_order(db: Session, request):
-    if not request.items:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Order must contain at least one menu item.",
-        )
-
-    menu_item_ids = [item.menu_item_id for item in request.items]
-
-    # Fetch menu items in a single query
-    existing_items = (
-        db.query(menu_model.MenuItem)
-        .filter(menu_model.MenuItem.id.in_(menu_item_ids))
-        .all()
-    )
-    existing_item_map = {item.id: item for item in existing_items}
-
-    missing_items = sorted(set(menu_item_ids) - set(existing_item_map.keys()))
-    if missing_items:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Menu items not found: {missing_items}",
-        )
-
-    total_price = 0.0
-    order_details = []
-    for item in request.items:
-        menu_item_obj = existing_item_map[item.menu_item_id]
-        if menu_item_obj.stock is not None and menu_item_obj.stock < item.quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Insufficient stock for item {menu_item_obj.name} (id {menu_item_obj.id}).",
-            )
-
-    for item in request.items:
-        menu_item_obj = existing_item_map[item.menu_item_id]
-        unit_price = float(menu_item_obj.price)
-        line_total = unit_price * item.quantity
-        total_price += line_total
-        od = order_detail_model.OrderDetail(
-            menu_item_id=item.menu_item_id,
-            quantity=item.quantity,
-        )
-        od.menu_item = menu_item_obj
-        od.unit_price = unit_price  # transient for response
-        od.line_total = line_total
-        order_details.append(od)
-        if menu_item_obj.stock is not None:
-            menu_item_obj.stock = max(0, menu_item_obj.stock - item.quantity)
-
-    promotion = None
-    if request.promo_code:
-        promotion = promotion_controller.get_valid_promotion(db, request.promo_code)
-        discount = (promotion.discount_percent or 0) / 100
-        total_price = max(0.0, total_price * (1 - discount))
-
-    new_order = model.Order(
-        status="Pending",
-        total_price=total_price,
-        tracking_number=str(uuid4()),
+    return checkout_controller.pipeline.run(
+        db,
+        request,
         guest_name=request.guest_name,
         guest_email=request.guest_email,
         guest_phone=request.guest_phone,
-        order_type=request.order_type or "takeout",
         description=request.description,
-        order_details=order_details,
-        promotion_id=promotion.id if promotion else None,
-        promotion_code=promotion.promo_code if promotion else None,
-        promotion_discount=promotion.discount_percent if promotion else 0,
     )
-
-    try:
-        db.add(new_order)
-        db.commit()
-        db.refresh(new_order)
-    except SQLAlchemyError as e:
-        db.rollback()
-        error = str(e.__dict__["orig"])
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-
-    _attach_line_totals(new_order)
-    return new_order
-
-
-def _attach_line_totals(order_obj):
-    """Populate transient unit_price and line_total for response rendering."""
-    for od in order_obj.order_details:
-        if hasattr(od, "menu_item") and od.menu_item:
-            unit_price = float(od.menu_item.price)
-            od.unit_price = unit_price
-            od.line_total = unit_price * od.quantity
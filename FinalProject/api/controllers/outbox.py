@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session, selectinload
+from ..dependencies import channels
+from ..dependencies.config import conf
+from ..models import notification as notification_model
+from ..models import order as order_model
+
+logger = logging.getLogger(__name__)
+
+
+def backoff(attempts: int):
+    """Seconds to wait before retrying after `attempts` failed deliveries."""
+    return min(conf.notification_retry_max, conf.notification_retry_base * 2 ** (attempts - 1))
+
+
+def due(db: Session, now: datetime, batch_size: int):
+    """Pending rows whose time has come, and "sending" rows whose lease ran out
+    (their dispatcher died mid-delivery)."""
+    notif = notification_model.Notification
+    return (
+        db.query(notif)
+        # Recipients for email/SMS; selectin keeps the row lock on notifications only
+        .options(selectinload(notif.order).selectinload(order_model.Order.user))
+        .filter(notif.status.in_(("pending", "sending")), notif.next_attempt_at <= now)
+        .order_by(notif.next_attempt_at, notif.id)
+        .limit(batch_size)
+        # Lets several dispatcher processes share the outbox on MySQL 8
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+
+def _message(notif):
+    order_obj = notif.order
+    user = order_obj.user if order_obj is not None else None
+    return channels.Message(
+        id=notif.id,
+        order_id=notif.order_id,
+        text=notif.message,
+        email=(order_obj.guest_email if order_obj is not None else None) or (user.email if user else None),
+        phone=(order_obj.guest_phone if order_obj is not None else None) or (user.phone if user else None),
+    )
+
+
+async def _deliver(by_channel):
+    """Send every channel's messages at once; returns {notification id: error or None}."""
+    async def send(channel, messages):
+        driver = channels.get_driver(channel)
+        if driver is None:
+            error = channels.PermanentError(f"No driver configured for channel {channel!r}")
+            return [(message.id, error) for message in messages]
+        errors = await driver.send_many(messages)
+        return list(zip([message.id for message in messages], errors))
+
+    results = await asyncio.gather(*(send(channel, messages) for channel, messages in by_channel.items()))
+    return dict(pair for result in results for pair in result)
+
+
+def claim(db: Session, now: datetime, batch_size: int):
+    """Lease a batch of due rows to this dispatcher and commit.
+
+    The rows are marked "sending" until the lease (conf.notification_send_lease)
+    runs out, so the row locks taken by due() end here rather than being held
+    through the gateway calls. Returns the messages grouped by channel.
+    """
+    by_channel = {}
+    lease_until = now + timedelta(seconds=conf.notification_send_lease)
+    for notif in due(db, now, batch_size):
+        by_channel.setdefault(notif.channel or "mock", []).append(_message(notif))
+        notif.status = "sending"
+        notif.next_attempt_at = lease_until
+    db.commit()
+    return by_channel
+
+
+def record(db: Session, errors, now: datetime):
+    """Store delivery outcomes in one short transaction; returns counts by outcome."""
+    notif_model = notification_model.Notification
+    counts = {"sent": 0, "retrying": 0, "failed": 0}
+    rows = (
+        db.query(notif_model)
+        # A row whose lease ran out may have been re-claimed and settled elsewhere
+        .filter(notif_model.id.in_(list(errors)), notif_model.status == "sending")
+        .with_for_update()
+        .all()
+    )
+    for notif in rows:
+        error = errors[notif.id]
+        if error is None:
+            notif.status = "sent"
+            notif.sent_at = now
+            counts["sent"] += 1
+            continue
+        notif.attempts += 1
+        notif.last_error = str(error)[:255]
+        if isinstance(error, channels.PermanentError) or notif.attempts >= conf.notification_max_attempts:
+            notif.status = "failed"
+            counts["failed"] += 1
+        else:
+            notif.status = "pending"
+            notif.next_attempt_at = now + timedelta(seconds=backoff(notif.attempts))
+            counts["retrying"] += 1
+    db.commit()
+    return counts
+
+
+def dispatch_batch(db: Session, batch_size: int | None = None, now: datetime | None = None):
+    """Deliver one batch of due notifications; returns counts by outcome.
+
+    Rows are grouped by channel and each group goes out through its driver's
+    send_many, so a batch costs a few gateway calls rather than one per row.
+    No transaction is open while the gateways are called.
+    """
+    now = now or datetime.now()
+    by_channel = claim(db, now, batch_size or conf.notification_batch_size)
+    if not by_channel:
+        return {"sent": 0, "retrying": 0, "failed": 0}
+    errors = asyncio.run(_deliver(by_channel))
+    return record(db, errors, now)
+
+
+def drain(session_factory, batch_size: int | None = None):
+    """Dispatch batches until fewer than a full batch is due."""
+    batch_size = batch_size or conf.notification_batch_size
+    totals = {"sent": 0, "retrying": 0, "failed": 0}
+    while True:
+        with session_factory() as db:
+            counts = dispatch_batch(db, batch_size)
+        for outcome, count in counts.items():
+            totals[outcome] += count
+        if sum(counts.values()) < batch_size:
+            return totals
+
+
+async def run_dispatcher(session_factory, stop: asyncio.Event, interval: float | None = None):
+    """Background loop: drain the outbox, then sleep until the next poll or `stop`."""
+    interval = conf.notification_poll_interval if interval is None else interval
+    while not stop.is_set():
+        try:
+            await asyncio.to_thread(drain, session_factory)
+        except Exception:
+            logger.exception("notification dispatch failed")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
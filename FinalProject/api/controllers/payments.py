@@ -6,6 +6,10 @@ from ..models import payment as payment_model
 from ..models import order as order_model
 from ..models import user as user_model
 from ..controllers import notifications as notification_controller
+from ..controllers import sales_rollup as sales_rollup_controller
+from ..controllers import order_status as order_status_controller
+from ..controllers import tracking_cache
+from ..dependencies import metrics
 
 
 def create(db: Session, request):
@@ -32,6 +36,11 @@ def create(db: Session, request):
             detail="Payment amount must match the order total.",
         )
 
+    paid = request.transaction_status.lower() == "success"
+    if paid:
+        order_status_controller.check_transition(order.status, "Paid")
+    previous = order.status
+
     new_payment = payment_model.Payment(
         order_id=request.order_id,
         payment_type=request.payment_type,
@@ -39,25 +48,24 @@ def create(db: Session, request):
         amount=request.amount,
     )
 
-    if request.transaction_status.lower() == "success":
-        order.status = "Paid"
-
     try:
+        if paid:
+            with sales_rollup_controller.tracking(db, order):
+                order.status = "Paid"
+            notification_controller.log_status_notification(
+                db=db, order_id=order.id, new_status=order.status
+            )
         db.add(new_payment)
         db.commit()
         db.refresh(new_payment)
-        if request.transaction_status.lower() == "success":
-            try:
-                notification_controller.log_status_notification(
-                    db=db, order_id=new_payment.order_id, new_status=order.status
-                )
-            except HTTPException:
-                pass
     except SQLAlchemyError as e:
         db.rollback()
         error = str(e.__dict__.get("orig", e))
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
+    metrics.payments.inc(result="success" if paid else "failure")
+    tracking_cache.invalidate(order.tracking_number)
+    order_status_controller.publish_change(order, previous)
     return new_payment
 
 
@@ -133,14 +141,18 @@ def update(db: Session, item_id: int, request):
     if "payment_type" in update_data:
         payment.payment_type = update_data["payment_type"]
 
+    previous = order.status
     if "transaction_status" in update_data:
-        payment.transaction_status = update_data["transaction_status"]
-        if update_data["transaction_status"] and update_data["transaction_status"].lower() == "success":
-            order.status = "Paid"
-        else:
-            order.status = "Pending"
+        transaction_status = update_data["transaction_status"]
+        # A failed or reversed payment sends a Paid order back to Pending
+        new_status = "Paid" if transaction_status and transaction_status.lower() == "success" else "Pending"
+        order_status_controller.check_transition(previous, new_status)
 
     try:
+        if "transaction_status" in update_data:
+            payment.transaction_status = update_data["transaction_status"]
+            with sales_rollup_controller.tracking(db, order):
+                order.status = new_status
         db.commit()
         db.refresh(payment)
     except SQLAlchemyError as e:
@@ -148,6 +160,8 @@ def update(db: Session, item_id: int, request):
         error = str(e.__dict__.get("orig", e))
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
+    tracking_cache.invalidate(order.tracking_number)
+    order_status_controller.publish_change(order, previous)
     return payment
 
 
@@ -162,16 +176,29 @@ def delete(db: Session, item_id: int):
             status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found!"
         )
 
-    order = db.query(order_model.Order).filter(order_model.Order.id == payment.order_id).first()
+    order_id = payment.order_id
+    order = db.query(order_model.Order).filter(order_model.Order.id == order_id).first()
+    previous = order.status if order else None
+    # Only a Paid order reverts; Pending and Cancelled orders keep their status
+    reverts = previous == "Paid"
+    if order and not reverts and previous not in ("Pending", "Cancelled"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot remove the payment of a {previous} order.",
+        )
 
     try:
         db.delete(payment)
-        if order:
-            order.status = "Pending"
+        if reverts:
+            with sales_rollup_controller.tracking(db, order):
+                order.status = "Pending"
         db.commit()
     except SQLAlchemyError as e:
         db.rollback()
         error = str(e.__dict__.get("orig", e))
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
+    tracking_cache.invalidate_orders(order_id)
+    if reverts:
+        order_status_controller.publish_change(order, previous)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
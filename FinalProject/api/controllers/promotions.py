@@ -3,6 +3,8 @@ from fastapi import HTTPException, status
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from ..models import promotion as promotion_model
+from ..dependencies import http_cache
+from ..controllers import catalog_versions
 
 
 def create(db: Session, request):
@@ -26,6 +28,7 @@ def create(db: Session, request):
     )
     try:
         db.add(new_item)
+        catalog_versions.bump(db, catalog_versions.PROMOTIONS)
         db.commit()
         db.refresh(new_item)
     except SQLAlchemyError as e:
@@ -43,6 +46,16 @@ def read_all(db: Session):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
 
+def list_etag(db: Session):
+    """The ETag for the current promotions list; the rows load only on a miss."""
+    try:
+        version = catalog_versions.current(db, catalog_versions.PROMOTIONS)
+    except SQLAlchemyError as e:
+        error = str(e.__dict__.get("orig", e))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    return http_cache.etag("promotions", version)
+
+
 def read_one(db: Session, item_id: int):
     try:
         promo = (
@@ -90,6 +103,7 @@ def update(db: Session, item_id: int, request):
     try:
         for field, value in update_data.items():
             setattr(promo, field, value)
+        catalog_versions.bump(db, catalog_versions.PROMOTIONS)
         db.commit()
         db.refresh(promo)
     except SQLAlchemyError as e:
@@ -110,6 +124,7 @@ def delete(db: Session, item_id: int):
 
     try:
         db.delete(promo)
+        catalog_versions.bump(db, catalog_versions.PROMOTIONS)
         db.commit()
     except SQLAlchemyError as e:
         db.rollback()
@@ -1,6 +1,7 @@
 from fastapi import HTTPException, status
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
+from ..dependencies import fast_json
 from ..models import review as review_model
 from ..models import order as order_model
 from ..models import menu_item as menu_model
@@ -47,6 +48,15 @@ def read_all(db: Session):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
 
+def read_all_rows(db: Session):
+    """read_all for the fast JSON path: the response fields as plain dicts."""
+    try:
+        return fast_json.as_dicts(db.query(*fast_json.columns(review_model.Review, review_schema.ReviewResponse)))
+    except SQLAlchemyError as e:
+        error = str(e.__dict__.get("orig", e))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+
 def read_one(db: Session, item_id: int):
     try:
         review = db.query(review_model.Review).filter(review_model.Review.id == item_id).first()
@@ -0,0 +1,139 @@
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from ..dependencies.upsert import increment
+from ..models import order as order_model
+from ..models import order_daily_rollup as rollup_model
+
+
+def snapshot(order_obj):
+    """The rollup key and measures an order currently contributes."""
+    order_date = order_obj.order_date or date.today()
+    day = order_date.date() if hasattr(order_date, "date") else order_date
+    return (
+        day,
+        order_obj.order_type or "",
+        order_obj.status or "",
+        float(order_obj.total_price or 0),
+        float(order_obj.discount_amount or 0),
+    )
+
+
+def apply(db: Session, snap, sign: int = 1):
+    day, order_type, order_status, revenue, discount = snap
+    increment(
+        db,
+        rollup_model.OrderDailyRollup,
+        {"day": day, "order_type": order_type, "status": order_status},
+        {"order_count": sign, "revenue": sign * revenue, "discount_total": sign * discount},
+    )
+
+
+def apply_many(db: Session, signed_snaps):
+    """Apply many (snapshot, sign) pairs with one upsert per rollup row touched."""
+    totals = {}
+    for (day, order_type, order_status, revenue, discount), sign in signed_snaps:
+        key = (day, order_type, order_status)
+        count, rev, disc = totals.get(key, (0, 0.0, 0.0))
+        totals[key] = (count + sign, rev + sign * revenue, disc + sign * discount)
+    # Fixed key order keeps concurrent batches from deadlocking on the rows
+    for (day, order_type, order_status), (count, revenue, discount) in sorted(totals.items()):
+        if count or revenue or discount:
+            increment(
+                db,
+                rollup_model.OrderDailyRollup,
+                {"day": day, "order_type": order_type, "status": order_status},
+                {"order_count": count, "revenue": revenue, "discount_total": discount},
+            )
+
+
+def record(db: Session, order_obj, sign: int = 1):
+    """Add (or with sign=-1, remove) an order's contribution to its day."""
+    apply(db, snapshot(order_obj), sign)
+
+
+def move(db: Session, before, order_obj):
+    """Shift an order's contribution from `before` to its current values."""
+    after = snapshot(order_obj)
+    if after != before:
+        apply(db, before, -1)
+        apply(db, after, 1)
+
+
+@contextmanager
+def tracking(db: Session, order_obj):
+    """Keep the rollup in step with whatever the block changes on `order_obj`."""
+    before = snapshot(order_obj)
+    yield order_obj
+    move(db, before, order_obj)
+
+
+def summarize(db: Session, start_day: date | None = None, end_day: date | None = None):
+    """Totals and per-type/per-status counts for an inclusive day range."""
+    rollup = rollup_model.OrderDailyRollup
+    query = db.query(
+        rollup.order_type,
+        rollup.status,
+        func.sum(rollup.order_count).label("order_count"),
+        func.sum(rollup.revenue).label("revenue"),
+        func.sum(rollup.discount_total).label("discount_total"),
+    )
+    if start_day:
+        query = query.filter(rollup.day >= start_day)
+    if end_day:
+        query = query.filter(rollup.day <= end_day)
+    rows = query.group_by(rollup.order_type, rollup.status).all()
+
+    summary = {
+        "total_orders": 0,
+        "total_revenue": 0.0,
+        "total_discount": 0.0,
+        "orders_by_type": {},
+        "orders_by_status": {},
+    }
+    for r in rows:
+        count = int(r.order_count or 0)
+        if not count:
+            continue
+        summary["total_orders"] += count
+        summary["total_revenue"] += float(r.revenue or 0)
+        summary["total_discount"] += float(r.discount_total or 0)
+        by_type = summary["orders_by_type"]
+        by_type[r.order_type] = by_type.get(r.order_type, 0) + count
+        by_status = summary["orders_by_status"]
+        by_status[r.status] = by_status.get(r.status, 0) + count
+    return summary
+
+
+def rebuild(db: Session, start_day: date | None = None, end_day: date | None = None):
+    """Recompute rollup rows for a day range (all days by default) from orders."""
+    rollup = rollup_model.OrderDailyRollup
+    order = order_model.Order
+    day = func.date(order.order_date)
+
+    clear = delete(rollup)
+    source = select(
+        day,
+        func.coalesce(order.order_type, ""),
+        func.coalesce(order.status, ""),
+        func.count(order.id),
+        func.coalesce(func.sum(order.total_price), 0),
+        func.coalesce(func.sum(order.discount_amount), 0),
+    )
+    if start_day:
+        clear = clear.where(rollup.day >= start_day)
+        source = source.where(order.order_date >= datetime.combine(start_day, time.min))
+    if end_day:
+        clear = clear.where(rollup.day <= end_day)
+        source = source.where(order.order_date < datetime.combine(end_day + timedelta(days=1), time.min))
+    source = source.group_by(day, func.coalesce(order.order_type, ""), func.coalesce(order.status, ""))
+
+    db.execute(clear)
+    db.execute(
+        insert(rollup).from_select(
+            ["day", "order_type", "status", "order_count", "revenue", "discount_total"],
+            source,
+        )
+    )
+    db.commit()
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+from ..dependencies.config import conf
+
+# Returned by get() when the tracking number is not cached at all
+MISS = object()
+
+_lock = threading.Lock()
+# tracking_number -> (expires_at, rendered order or None for "no such order").
+# Tracking numbers are UUIDs, so one cache serves every engine (primary,
+# replicas, the async engine) of the same database.
+_entries = OrderedDict()
+_by_order_id = {}
+_generation = 0
+_stats = {"hits": 0, "negative_hits": 0, "misses": 0}
+
+
+def generation():
+    """Read before loading; put() drops the result if anything was invalidated since."""
+    return _generation
+
+
+def get(tracking_number: str):
+    """The rendered order, None if known not to exist, or MISS."""
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(tracking_number)
+        if entry is None or entry[0] <= now:
+            if entry is not None:
+                _drop(tracking_number)
+            _stats["misses"] += 1
+            return MISS
+        _entries.move_to_end(tracking_number)
+        _stats["hits" if entry[1] is not None else "negative_hits"] += 1
+        return entry[1]
+
+
+def put(tracking_number: str, rendered, loaded_at: int):
+    """Cache a rendered order (or None for an unknown number) loaded at generation `loaded_at`."""
+    if conf.tracking_cache_size <= 0:
+        return
+    ttl = conf.tracking_cache_ttl if rendered is not None else conf.tracking_negative_ttl
+    with _lock:
+        if loaded_at != _generation:
+            # An invalidation raced the load; it may have read the old order
+            return
+        _drop(tracking_number)
+        _entries[tracking_number] = (time.monotonic() + ttl, rendered)
+        if rendered is not None:
+            _by_order_id[rendered.id] = tracking_number
+        while len(_entries) > conf.tracking_cache_size:
+            _drop(next(iter(_entries)))
+
+
+def _drop(tracking_number: str):
+    entry = _entries.pop(tracking_number, None)
+    if entry is not None and entry[1] is not None:
+        _by_order_id.pop(entry[1].id, None)
+
+
+def invalidate(*tracking_numbers):
+    """Forget these tracking numbers; call after committing a change to their orders."""
+    global _generation
+    with _lock:
+        _generation += 1
+        for tracking_number in tracking_numbers:
+            if tracking_number:
+                _drop(tracking_number)
+
+
+def invalidate_orders(*order_ids):
+    """Forget the cached orders with these ids."""
+    global _generation
+    with _lock:
+        _generation += 1
+        for order_id in order_ids:
+            tracking_number = _by_order_id.get(order_id)
+            if tracking_number is not None:
+                _drop(tracking_number)
+
+
+def clear():
+    global _generation
+    with _lock:
+        _generation += 1
+        _entries.clear()
+        _by_order_id.clear()
+
+
+def stats():
+    with _lock:
+        hits, negative_hits, misses = _stats["hits"], _stats["negative_hits"], _stats["misses"]
+        size = len(_entries)
+    lookups = hits + negative_hits + misses
+    return {
+        "hits": hits,
+        "negative_hits": negative_hits,
+        "misses": misses,
+        "hit_ratio": (hits + negative_hits) / lookups if lookups else 0.0,
+        "size": size,
+    }
@@ -1,6 +1,7 @@
 from fastapi import HTTPException, status
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
+from ..dependencies import fast_json
 from ..models import user as user_model
 from ..schemas import user as user_schema
 
@@ -13,6 +14,15 @@ def read_all(db: Session):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
 
+def read_all_rows(db: Session):
+    """read_all for the fast JSON path: the response fields as plain dicts."""
+    try:
+        return fast_json.as_dicts(db.query(*fast_json.columns(user_model.User, user_schema.UserResponse)))
+    except SQLAlchemyError as e:
+        error = str(e.__dict__.get("orig", e))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+
 def read_one(db: Session, item_id: int):
     try:
         user = db.query(user_model.User).filter(user_model.User.id == item_id).first()
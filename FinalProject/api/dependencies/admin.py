@@ -0,0 +1,14 @@
+import secrets
+from fastapi import Header, HTTPException, status
+from .config import conf
+
+
+def require_admin(x_admin_token: str | None = Header(None)):
+    """Admin-only routes need the X-Admin-Token header to equal conf.admin_token.
+
+    With no admin_token configured they are disabled altogether.
+    """
+    if not conf.admin_token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin endpoints are disabled.")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, conf.admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token.")
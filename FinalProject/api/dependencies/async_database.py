@@ -0,0 +1,39 @@
+from urllib.parse import quote_plus
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from .config import conf
+from .database import apply_statement_timeout, pool_options
+from .pool_metrics import InstrumentedAsyncQueuePool
+
+password = quote_plus(conf.db_password)
+
+ASYNC_DATABASE_URL = (
+    f"mysql+{conf.async_db_driver}://{conf.db_user}:{password}"
+    f"@{conf.db_host}:{conf.db_port}/{conf.db_name}"
+)
+
+# expire_on_commit=False: attributes must stay readable after commit, since
+# an async session cannot lazy-load them again during serialization.
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+_engine = None
+
+
+def get_engine():
+    """The async engine, created on first use so the driver is only needed in async mode."""
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(
+            ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncQueuePool, **pool_options()
+        )
+        apply_statement_timeout(_engine.sync_engine, conf.db_statement_timeout_ms)
+    return _engine
+
+
+async def get_db():
+    async with AsyncSessionLocal(bind=get_engine()) as db:
+        yield db
+
+
+def current_engine():
+    """The async engine if async mode has created it, else None."""
+    return _engine
@@ -0,0 +1,239 @@
+"""Notification channel drivers.
+
+Each driver delivers a list of messages with `send_many`, splitting it into
+batches of at most `max_batch` sent concurrently (up to `concurrency` in
+flight) and paced by a per-channel token bucket. The result is one entry per
+message: None when delivered, otherwise the exception for that message.
+"""
+import abc
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+import httpx
+from .config import conf
+
+logger = logging.getLogger(__name__)
+
+
+class PermanentError(Exception):
+    """A delivery that can never succeed (e.g. no address); not retried."""
+
+
+@dataclass(frozen=True)
+class Message:
+    id: int
+    order_id: int | None
+    text: str
+    email: str | None = None
+    phone: str | None = None
+
+
+class TokenBucket:
+    """Allows `rate` tokens per second on average, with bursts up to `capacity`.
+
+    Callers reserve tokens up front (the balance may go negative) and sleep
+    off the debt, so one bucket can pace callers on any thread or event loop.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1):
+        """Take `tokens` and return the seconds to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self, tokens: float = 1):
+        wait = self.reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
+
+
+class ChannelDriver(abc.ABC):
+    name = "base"
+
+    def __init__(self, max_batch: int = 100, concurrency: int = 4, rate: float | None = None):
+        self.max_batch = max_batch
+        self.concurrency = concurrency
+        # Messages per second across all calls; None means unlimited
+        self.bucket = TokenBucket(rate) if rate else None
+
+    @abc.abstractmethod
+    async def send_batch(self, client: httpx.AsyncClient, messages):
+        """Deliver one batch; return per-message errors (None = delivered)."""
+
+    async def send_many(self, messages):
+        messages = list(messages)
+        if not messages:
+            return []
+        semaphore = asyncio.Semaphore(self.concurrency)
+        batches = [messages[i:i + self.max_batch] for i in range(0, len(messages), self.max_batch)]
+
+        async with httpx.AsyncClient(timeout=conf.notification_http_timeout) as client:
+            async def deliver(batch):
+                async with semaphore:
+                    if self.bucket is not None:
+                        await self.bucket.acquire(len(batch))
+                    try:
+                        return await self.send_batch(client, batch)
+                    except Exception as e:
+                        return [e] * len(batch)
+
+            results = await asyncio.gather(*(deliver(batch) for batch in batches))
+        return [error for batch_result in results for error in batch_result]
+
+
+class MockDriver(ChannelDriver):
+    name = "mock"
+
+    async def send_batch(self, client, messages):
+        for message in messages:
+            logger.info("notification %s: %s", message.id, message.text)
+        return [None] * len(messages)
+
+
+class HttpBatchDriver(ChannelDriver):
+    """POSTs each batch as JSON to `url`; any non-2xx fails the whole batch."""
+
+    # Email and SMS need a recipient on the order; webhooks do not
+    requires_address = False
+
+    def __init__(self, url: str, api_key: str = "", **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+        self.api_key = api_key
+
+    def address(self, message):
+        return None
+
+    @abc.abstractmethod
+    def payload(self, messages):
+        """The JSON body for one batch of messages."""
+
+    async def send_batch(self, client, messages):
+        errors = [None] * len(messages)
+        sendable = []
+        for index, message in enumerate(messages):
+            if self.requires_address and not self.address(message):
+                errors[index] = PermanentError(f"No {self.name} address for notification {message.id}")
+            else:
+                sendable.append(index)
+        if not sendable:
+            return errors
+
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        response = await client.post(self.url, json=self.payload([messages[i] for i in sendable]), headers=headers)
+        if response.is_error:
+            failure = RuntimeError(f"{self.name} gateway returned {response.status_code}")
+            for index in sendable:
+                errors[index] = failure
+        return errors
+
+
+class WebhookDriver(HttpBatchDriver):
+    name = "webhook"
+
+    def payload(self, messages):
+        return {
+            "notifications": [
+                {"id": m.id, "order_id": m.order_id, "message": m.text} for m in messages
+            ]
+        }
+
+
+class EmailDriver(HttpBatchDriver):
+    name = "email"
+    requires_address = True
+
+    def __init__(self, url: str, api_key: str = "", sender: str = "", **kwargs):
+        super().__init__(url, api_key, **kwargs)
+        self.sender = sender
+
+    def address(self, message):
+        return message.email
+
+    def payload(self, messages):
+        return {
+            "messages": [
+                {"from": self.sender, "to": m.email, "subject": "Your order", "text": m.text}
+                for m in messages
+            ]
+        }
+
+
+class SmsDriver(HttpBatchDriver):
+    name = "sms"
+    requires_address = True
+
+    def address(self, message):
+        return message.phone
+
+    def payload(self, messages):
+        return {"messages": [{"to": m.phone, "body": m.text} for m in messages]}
+
+
+def _build(name: str):
+    options = {"max_batch": conf.notification_batch_size, "concurrency": conf.notification_concurrency}
+    if name == "mock":
+        return MockDriver(**options)
+    if name == "webhook" and conf.webhook_url:
+        return WebhookDriver(conf.webhook_url, rate=conf.webhook_rate_per_second or None, **options)
+    if name == "email" and conf.email_api_url:
+        return EmailDriver(
+            conf.email_api_url,
+            conf.email_api_key,
+            sender=conf.email_sender,
+            rate=conf.email_rate_per_second or None,
+            **options,
+        )
+    if name == "sms" and conf.sms_api_url:
+        return SmsDriver(conf.sms_api_url, conf.sms_api_key, rate=conf.sms_rate_per_second or None, **options)
+    return None
+
+
+CHANNELS = ("mock", "email", "sms", "webhook")
+
+
+# NOTIFICATION_CHANNELS values already warned about
+_reported = set()
+
+
+def configured_channels():
+    """Channels status-change notifications are sent on, from conf.
+
+    Unknown names are dropped with a warning (once per value), so a typo in
+    the setting can't make every status change fail.
+    """
+    names = [name.strip() for name in conf.notification_channels.split(",") if name.strip()]
+    unknown = [name for name in names if name not in CHANNELS]
+    if unknown and conf.notification_channels not in _reported:
+        _reported.add(conf.notification_channels)
+        logger.warning(
+            "NOTIFICATION_CHANNELS names unknown channels %s (known: %s); they are ignored",
+            ", ".join(unknown),
+            ", ".join(CHANNELS),
+        )
+    return [name for name in names if name in CHANNELS]
+
+
+# Drivers by channel name, built from conf on first use (tests may replace them)
+drivers = {}
+
+
+def get_driver(name: str):
+    if name not in drivers:
+        driver = _build(name)
+        if driver is None:
+            return None
+        drivers[name] = driver
+    return drivers[name]
@@ -1,3 +1,11 @@
+import os
+from dotenv import load_dotenv
+
+# Every setting below can be overridden from the environment, or from a .env
+# file (ENV_FILE, default ./.env), using its upper-cased name: DB_POOL_SIZE=20.
+load_dotenv(os.getenv("ENV_FILE", ".env"))
+
+
 class conf:
     db_host = "localhost"
     db_name = "sandwich_maker_api"
@@ -6,3 +14,124 @@ class conf:
     db_password = "University@14"
     app_host = "localhost"
     app_port = 8000
+    # Connection pool, per worker process: size it so workers * (size + overflow)
+    # stays under the server's max_connections
+    db_pool_size = 5
+    db_max_overflow = 10
+    # Seconds to wait for a free connection before failing the request
+    db_pool_timeout = 30.0
+    # Replace connections older than this (seconds), ahead of MySQL's wait_timeout
+    db_pool_recycle = 1800
+    # Test each connection on checkout so stale ones are replaced, not surfaced as errors
+    db_pool_pre_ping = True
+    # MySQL max_execution_time for SELECTs, in milliseconds (0 = no limit)
+    db_statement_timeout_ms = 0
+    # Comma-separated host[:port] list of read replicas (same credentials and
+    # database name); GET routes that tolerate replication lag read from them
+    db_replica_hosts = ""
+    # Seconds between health probes of each replica
+    db_replica_check_interval = 5.0
+    # Seconds a worker trusts its cached menu before re-checking the version
+    catalog_version_ttl = 0.0
+    # Cache-Control max-age (whole seconds) on GET /menu, /menu/filter and /promotions;
+    # clients revalidate with If-None-Match once it runs out
+    menu_cache_max_age = 0
+    promotions_cache_max_age = 0
+    # Count the SQL statements, rows and database time of every request (debug
+    # log), and warn when one SELECT runs this many times in a request (0 = off)
+    query_stats = True
+    n_plus_one_threshold = 10
+    # Also report the counts as X-DB-Queries / X-DB-Rows / X-DB-Time headers
+    query_stats_headers = False
+    # Record request latency by route, in-flight requests and business counters
+    # for GET /metrics
+    metrics = True
+    # Sampling profiler (opt-in): profile this fraction of requests, and keep the
+    # profile of any request slower than profiler_slow_ms (0 = only sampled
+    # ones); stacks are sampled every profiler_interval_ms
+    profiler = False
+    profiler_sample_rate = 0.0
+    profiler_slow_ms = 1000.0
+    profiler_interval_ms = 10.0
+    # Comma-separated path prefixes to profile, e.g. /orders,/analytics (empty = all)
+    profiler_paths = ""
+    # Folded stacks of the newest profiler_max_profiles profiles are kept here
+    profiler_dir = "profiles"
+    profiler_max_profiles = 200
+    # Value of the X-Admin-Token header admin-only routes (/diagnostics/profiles)
+    # require; they are disabled while it is empty
+    admin_token = ""
+    # Import each router (and the controllers and models behind it) on the first
+    # request under its prefix rather than at start-up
+    lazy_routes = True
+    # Log a warning at worker start-up if `python -m api.manage migrate` has
+    # pending migrations (costs one query)
+    schema_check_on_startup = True
+    # Seconds an Idempotency-Key and its stored response are kept for replay
+    idempotency_ttl = 86400
+    # Seconds a request holds its Idempotency-Key before committing anything;
+    # if its worker dies, a retry may take the key over after this
+    idempotency_lease = 60.0
+    # Deliver queued notifications from a background task in each worker;
+    # leave off when `python -m api.manage dispatch-notifications` runs instead
+    notification_dispatcher = False
+    notification_batch_size = 100
+    # Seconds a dispatcher holds the batch it is delivering; if it dies, the
+    # rows are sent again after this (keep it above notification_http_timeout)
+    notification_send_lease = 120.0
+    # Seconds the dispatcher sleeps once the outbox is drained
+    notification_poll_interval = 1.0
+    # Failed deliveries retry after base * 2**(attempt - 1) seconds, up to the cap
+    notification_max_attempts = 5
+    notification_retry_base = 2.0
+    notification_retry_max = 300.0
+    # Channels every status-change notification goes out on (mock, email, sms, webhook)
+    notification_channels = "mock"
+    # Batches each channel may have in flight at once
+    notification_concurrency = 4
+    notification_http_timeout = 10.0
+    webhook_url = ""
+    webhook_rate_per_second = 0.0
+    email_api_url = ""
+    email_api_key = ""
+    email_sender = "orders@example.com"
+    email_rate_per_second = 0.0
+    sms_api_url = ""
+    sms_api_key = ""
+    sms_rate_per_second = 0.0
+    # Rendered /orders/track responses kept per worker (0 disables the cache);
+    # a worker drops its copy when it changes the order, other workers' copies
+    # expire after the TTL (seconds)
+    tracking_cache_size = 10000
+    tracking_cache_ttl = 30.0
+    # Seconds an unknown tracking number is remembered as not found
+    tracking_negative_ttl = 60.0
+    # Longest a GET /orders/active long-poll (?since=&wait=) is held open, in seconds
+    active_orders_max_wait = 30.0
+    # Seconds between keep-alive comments on idle server-sent event streams
+    sse_keepalive_interval = 15.0
+    # Build list responses (/orders, /menu, /reviews, /notifications, /users)
+    # from column rows encoded with orjson, skipping response_model validation
+    fast_json = False
+    # Serve the hot read paths and checkout from async routes on an async engine
+    async_db = False
+    async_db_driver = "aiomysql"
+
+
+def _coerce(default, value: str, name: str = "setting"):
+    if isinstance(default, bool):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    try:
+        if isinstance(default, int):
+            return int(value)
+        if isinstance(default, float):
+            return float(value)
+    except ValueError:
+        kind = "a whole number" if isinstance(default, int) else "a number"
+        raise ValueError(f"{name} must be {kind}, got {value!r}") from None
+    return value
+
+
+for _name, _default in list(vars(conf).items()):
+    if not _name.startswith("_") and _name.upper() in os.environ:
+        setattr(conf, _name, _coerce(_default, os.environ[_name.upper()], _name.upper()))
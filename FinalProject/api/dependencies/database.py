@@ -1,25 +1,91 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Mapper, sessionmaker, declarative_base
 from .config import conf
+from .pool_metrics import InstrumentedQueuePool
+from .read_replicas import ReadRouter
 from urllib.parse import quote_plus
 
 # URL-encode the password to safely handle special characters like "@"
 password = quote_plus(conf.db_password)
 
-SQLALCHEMY_DATABASE_URL = (
-    f"mysql+pymysql://{conf.db_user}:{password}"
-    f"@{conf.db_host}:{conf.db_port}/{conf.db_name}"
-)
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+def database_url(host: str, port: int):
+    return f"mysql+pymysql://{conf.db_user}:{password}@{host}:{port}/{conf.db_name}"
+
+
+SQLALCHEMY_DATABASE_URL = database_url(conf.db_host, conf.db_port)
+
+
+def pool_options():
+    """Pool settings from conf, shared by the sync and async engines."""
+    return {
+        "pool_size": conf.db_pool_size,
+        "max_overflow": conf.db_max_overflow,
+        "pool_timeout": conf.db_pool_timeout,
+        "pool_recycle": conf.db_pool_recycle,
+        "pool_pre_ping": conf.db_pool_pre_ping,
+    }
+
+
+def apply_statement_timeout(engine, timeout_ms: int):
+    """Cap SELECT run time on every new MySQL connection of `engine`."""
+    if not timeout_ms or engine.dialect.name != "mysql":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_timeout(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"SET SESSION max_execution_time = {int(timeout_ms)}")
+        cursor.close()
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=InstrumentedQueuePool, **pool_options())
+apply_statement_timeout(engine, conf.db_statement_timeout_ms)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _replica_engine(address: str):
+    host, _, port = address.strip().partition(":")
+    replica = create_engine(
+        database_url(host, int(port or conf.db_port)), poolclass=InstrumentedQueuePool, **pool_options()
+    )
+    apply_statement_timeout(replica, conf.db_statement_timeout_ms)
+    return replica
+
+
+read_router = ReadRouter(
+    engine,
+    [_replica_engine(address) for address in conf.db_replica_hosts.split(",") if address.strip()],
+    check_interval=conf.db_replica_check_interval,
+)
+
 Base = declarative_base()
 
 
+@event.listens_for(Mapper, "before_configured")
+def _register_models():
+    # Models are imported on demand (by whichever controller needs them), but
+    # relationships name their targets as strings; load every model before
+    # SQLAlchemy resolves them on first use.
+    from ..models import model_loader  # noqa: F401
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """A session on a healthy replica (or the primary) for read-only routes.
+
+    Replicas may lag the primary, so routes that must see their own writes,
+    such as tracking right after checkout, keep using get_db.
+    """
+    db = SessionLocal(bind=read_router.pick())
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,128 @@
+"""In-process publish/subscribe for change events.
+
+Controllers publish after committing, from any thread; subscribers are
+asyncio tasks (long-poll and SSE routes), each with its own bounded queue.
+A subscriber gets every event on its topic, or only those published with
+its key (e.g. one order's tracking number). Events only reach subscribers in
+the same worker process, and every topic carries a version that counts the
+events published on it since start-up.
+"""
+import asyncio
+import json
+import threading
+
+# Returned by Subscription.get when the subscriber fell behind and events
+# were dropped; the client should refetch the full state.
+RESYNC = object()
+
+
+class Subscription:
+    def __init__(self, bus, topic: str, key, maxsize: int):
+        self.bus = bus
+        self.topic = topic
+        self.key = key
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def _deliver(self, item):
+        # Runs on the subscriber's loop
+        if self.queue.full():
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+        self.queue.put_nowait(item)
+
+    def push(self, item):
+        try:
+            self.loop.call_soon_threadsafe(self._deliver, item)
+        except RuntimeError:
+            # The subscriber's loop has closed; it is going away anyway
+            pass
+
+    async def get(self, timeout: float | None = None):
+        """The next (version, event), RESYNC after an overflow, or TimeoutError."""
+        item = await asyncio.wait_for(self.queue.get(), timeout)
+        if self.overflowed:
+            self.overflowed = False
+            return RESYNC
+        return item
+
+    def close(self):
+        self.bus._unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class EventBus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._versions = {}
+
+    def version(self, topic: str):
+        with self._lock:
+            return self._versions.get(topic, 0)
+
+    def subscriber_count(self, topic: str, key=None):
+        with self._lock:
+            return len(self._subscribers.get((topic, key), ()))
+
+    def publish(self, topic: str, event, key=None):
+        with self._lock:
+            version = self._versions[topic] = self._versions.get(topic, 0) + 1
+            subscribers = list(self._subscribers.get((topic, None), ()))
+            if key is not None:
+                subscribers += self._subscribers.get((topic, key), ())
+        for subscription in subscribers:
+            subscription.push((version, event))
+        return version
+
+    def subscribe(self, topic: str, key=None, maxsize: int = 100):
+        """Start receiving events on `topic` (only `key`'s, if given).
+
+        Call from the subscriber's event loop.
+        """
+        subscription = Subscription(self, topic, key, maxsize)
+        with self._lock:
+            self._subscribers.setdefault((topic, key), set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        channel = (subscription.topic, subscription.key)
+        with self._lock:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    async def wait(self, topic: str, since: int, timeout: float):
+        """Wait until `topic` is past version `since`; False on timeout."""
+        with self.subscribe(topic, maxsize=1) as subscription:
+            # Checked after subscribing so a publish in between is not missed
+            if self.version(topic) > since:
+                return True
+            try:
+                await subscription.get(timeout)
+            except asyncio.TimeoutError:
+                return False
+            return True
+
+
+def sse(data, event: str | None = None, id: int | None = None):
+    """Format one server-sent event."""
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    if id is not None:
+        lines.append(f"id: {id}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+bus = EventBus()
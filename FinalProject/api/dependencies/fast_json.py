@@ -0,0 +1,42 @@
+"""Opt-in fast path for large list responses (conf.fast_json).
+
+Instead of loading ORM instances and having FastAPI validate them against the
+response_model and encode the result with the stdlib, list endpoints select
+just the response columns as plain dicts and encode them with orjson. The
+output is the same JSON; it is simply built without the intermediate objects.
+"""
+from fastapi import Response
+from .config import conf
+
+try:
+    import orjson
+except ImportError:  # optional: without it the regular path is always used
+    orjson = None
+
+
+def enabled():
+    return conf.fast_json and orjson is not None
+
+
+def fields(schema, exclude=()):
+    """Field names of a response schema, in declaration order."""
+    return [name for name in schema.model_fields if name not in exclude]
+
+
+def columns(model, schema, exclude=()):
+    """The model's columns for each field of `schema`, labelled by field name."""
+    return [getattr(model, name).label(name) for name in fields(schema, exclude)]
+
+
+def as_dicts(rows):
+    return [row._asdict() for row in rows]
+
+
+def response(content, status_code: int = 200, headers=None):
+    """A JSON response encoded by orjson (dataclasses and datetimes included)."""
+    return Response(
+        orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
@@ -0,0 +1,28 @@
+import hashlib
+from fastapi import Request, Response, status
+
+
+def etag(*parts):
+    """A strong ETag built from whatever identifies the response content."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def matches(request: Request, tag: str):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match uses weak comparison, so W/"x" still matches "x"
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return "*" in candidates or tag in candidates
+
+
+def conditional(request: Request, response: Response, tag: str, max_age: int, load):
+    """Return load() with caching headers, or a bodyless 304 if the client has it."""
+    headers = {"ETag": tag, "Cache-Control": f"public, max-age={max_age}"}
+    if matches(request, tag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    content = load()
+    # A Response returned by load() is sent as is, so the headers go on it
+    (content if isinstance(content, Response) else response).headers.update(headers)
+    return content
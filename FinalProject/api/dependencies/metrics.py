@@ -0,0 +1,168 @@
+"""Prometheus metrics of this worker process, served by GET /metrics.
+
+Request latency and the in-flight gauge are recorded by the RequestMetrics
+middleware, which only runs on the event loop thread, as does the async
+/metrics route that reads them, so they need no lock. Business counters are
+bumped from the threadpool and take a short, uncontended lock per increment.
+Each worker process keeps its own numbers; Prometheus sums them across
+workers.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+# Seconds; the last bucket (+Inf) is implied
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def exposition(name: str, kind: str, help_text: str, samples):
+    """Text-format lines for one metric; samples are (suffix, labels, value)."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for suffix, labels, value in samples:
+        label_text = ",".join(f'{key}="{_escape(v)}"' for key, v in labels.items())
+        lines.append(f"{name}{suffix}{{{label_text}}} {_format(value)}" if labels else f"{name}{suffix} {_format(value)}")
+    return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(label, "") for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels.get(label, "") for label in self.labels), 0)
+
+    def lines(self):
+        values = dict(self._values) or ({(): 0} if not self.labels else {})
+        samples = [("", dict(zip(self.labels, key)), value) for key, value in sorted(values.items())]
+        return exposition(self.name, "counter", self.help_text, samples)
+
+
+class Gauge:
+    """Updated from the event loop only."""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def lines(self):
+        return exposition(self.name, "gauge", self.help_text, [("", {}, self.value)])
+
+
+class Histogram:
+    """Observed from the event loop only."""
+
+    def __init__(self, name: str, help_text: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._series = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(label, "") for label in self.labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, **labels):
+        series = self._series.get(tuple(labels.get(label, "") for label in self.labels))
+        return sum(series[0]) if series else 0
+
+    def lines(self):
+        samples = []
+        for key, (counts, total) in sorted(self._series.items()):
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append(("_bucket", {**labels, "le": _format(float(bound))}, cumulative))
+            samples.append(("_sum", labels, total))
+            samples.append(("_count", labels, cumulative))
+        return exposition(self.name, "histogram", self.help_text, samples)
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to finishing its response, by route template",
+    labels=("method", "route", "status"),
+)
+requests_in_flight = Gauge("http_requests_in_flight", "Requests being handled by this worker")
+orders_created = Counter("orders_created_total", "Orders placed through checkout")
+payments = Counter("payments_total", "Payments recorded, by result (success or failure)", labels=("result",))
+stock_outs = Counter("stock_outs_total", "Checkouts rejected for insufficient stock")
+
+REGISTRY = (request_duration, requests_in_flight, orders_created, payments, stock_outs)
+
+
+def render_registry():
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.lines()
+    return lines
+
+
+class RequestMetrics:
+    """ASGI middleware timing each HTTP request by its route template.
+
+    The template (/orders/{item_id}) keeps the label set bounded; requests
+    that match no route share the "unmatched" label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            requests_in_flight.dec()
+            route = scope.get("route")
+            request_duration.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status_code),
+            )
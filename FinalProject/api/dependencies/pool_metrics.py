@@ -0,0 +1,74 @@
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    """Checkout wait times and peak usage for one connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.peak_checked_out = 0
+
+    def record(self, wait_ms: float, checked_out: int, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.total_wait_ms += wait_ms
+                self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+
+class _Instrumented:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        # Covers both waiting for a free connection and opening a new one
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record((time.perf_counter() - started) * 1000, self.checkedout(), timed_out=True)
+            raise
+        self.stats.record((time.perf_counter() - started) * 1000, self.checkedout())
+        return connection
+
+
+class InstrumentedQueuePool(_Instrumented, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_Instrumented, AsyncAdaptedQueuePool):
+    pass
+
+
+def snapshot(pool):
+    """Current usage and accumulated checkout stats of an instrumented pool."""
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    stats = pool.stats
+    with stats._lock:
+        return {
+            "pool_size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "capacity": capacity,
+            "checked_out": checked_out,
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "saturation": checked_out / capacity if capacity else 0.0,
+            "peak_checked_out": stats.peak_checked_out,
+            "peak_saturation": stats.peak_checked_out / capacity if capacity else 0.0,
+            "checkouts": stats.checkouts,
+            "timeouts": stats.timeouts,
+            "avg_wait_ms": stats.total_wait_ms / stats.checkouts if stats.checkouts else 0.0,
+            "max_wait_ms": stats.max_wait_ms,
+        }
@@ -0,0 +1,236 @@
+"""Opt-in sampling profiler for slow requests (conf.profiler).
+
+While a profiled request is in flight, one background thread per worker
+samples the Python stack of every busy thread (sys._current_frames) each
+conf.profiler_interval_ms. A request is profiled when it is picked at random
+(conf.profiler_sample_rate) or, with conf.profiler_slow_ms set, every request
+is sampled and the profile is kept only if the request turned out slower
+than that. Kept profiles are written as folded stacks ("a;b;c 12" lines, the
+input of flamegraph.pl and speedscope) to a ring buffer of the newest
+conf.profiler_max_profiles files in conf.profiler_dir, served by the
+admin-only /diagnostics/profiles routes.
+
+Samples are per thread, not per request: when requests overlap, a profile
+also holds what the others were doing, which still shows where the worker's
+time went during the slow one.
+"""
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from starlette.concurrency import run_in_threadpool
+from .config import conf
+
+MAX_DEPTH = 128
+# Leaf frames of a thread that is waiting for work rather than doing it
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("runners.py", "run"),
+}
+_PROFILE_ID = re.compile(r"^\d{20}-\d+$")
+
+
+@lru_cache(maxsize=8192)
+def _frame_name(code):
+    path = code.co_filename
+    site_packages = "site-packages" + os.sep
+    package = os.sep + "api" + os.sep
+    if site_packages in path:
+        path = path.split(site_packages, 1)[1]
+    elif package in path:
+        path = "api" + os.sep + path.rsplit(package, 1)[1]
+    else:
+        path = os.path.basename(path)
+    return f"{path}:{code.co_name}".replace(";", ":")
+
+
+def _idle(frame):
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+
+class Profile:
+    def __init__(self):
+        self.stacks = Counter()
+        self.samples = 0
+
+
+class Sampler:
+    """One daemon thread sampling stacks for every active Profile."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._active = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def begin(self):
+        profile = Profile()
+        with self._lock:
+            self._active.add(profile)
+            self._wake.set()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+                self._thread.start()
+        return profile
+
+    def end(self, profile: Profile):
+        with self._lock:
+            self._active.discard(profile)
+
+    def sample(self):
+        """Folded stacks of every busy thread except the sampler."""
+        me = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident == me or _idle(frame):
+                continue
+            frames = []
+            while frame is not None and len(frames) < MAX_DEPTH:
+                frames.append(_frame_name(frame.f_code))
+                frame = frame.f_back
+            frames.append(names.get(ident, "thread").replace(";", ":"))
+            stacks.append(";".join(reversed(frames)))
+        return stacks
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._active:
+                    self._wake.clear()
+            self._wake.wait()
+            time.sleep(self.interval)
+            stacks = self.sample()
+            with self._lock:
+                for profile in self._active:
+                    profile.stacks.update(stacks)
+                    profile.samples += 1
+
+
+class ProfileStore:
+    """The newest `max_profiles` profiles, one .folded and one .json file each."""
+
+    def __init__(self, directory: str, max_profiles: int):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    def _path(self, profile_id: str, suffix: str):
+        return os.path.join(self.directory, f"{profile_id}{suffix}")
+
+    def _ids(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[: -len(".json")] for name in names if name.endswith(".json"))
+
+    def save(self, meta: dict, stacks: Counter):
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = f"{time.time_ns():020d}-{os.getpid()}"
+        with open(self._path(profile_id, ".folded"), "w") as folded:
+            folded.writelines(f"{stack} {count}\n" for stack, count in stacks.most_common())
+        # Written last: a profile is listed once its stacks are on disk
+        with open(self._path(profile_id, ".json"), "w") as f:
+            json.dump(dict(meta, id=profile_id), f)
+        self.prune()
+        return profile_id
+
+    def prune(self):
+        ids = self._ids()
+        for profile_id in ids[: max(len(ids) - self.max_profiles, 0)]:
+            for suffix in (".json", ".folded"):
+                try:
+                    os.remove(self._path(profile_id, suffix))
+                except FileNotFoundError:
+                    pass  # another worker pruned it first
+
+    def list(self):
+        profiles = []
+        for profile_id in reversed(self._ids()):
+            try:
+                with open(self._path(profile_id, ".json")) as f:
+                    profiles.append(json.load(f))
+            except (FileNotFoundError, ValueError):
+                continue
+        return profiles
+
+    def folded(self, profile_id: str):
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        try:
+            with open(self._path(profile_id, ".folded")) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+store = ProfileStore(conf.profiler_dir, conf.profiler_max_profiles)
+
+
+class SamplingProfiler:
+    """ASGI middleware profiling sampled or slow HTTP requests into `store`."""
+
+    def __init__(
+        self,
+        app,
+        store: ProfileStore = store,
+        sample_rate: float = 0.0,
+        slow_ms: float = 0,
+        interval_ms: float = 10,
+        paths=(),
+    ):
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.paths = tuple(paths)
+        self.sampler = Sampler(interval_ms / 1000)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (self.paths and not scope["path"].startswith(self.paths)):
+            await self.app(scope, receive, send)
+            return
+        sampled = random.random() < self.sample_rate
+        if not sampled and not self.slow_ms:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        profile = self.sampler.begin()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.sampler.end(profile)
+            await self.keep(scope, profile, sampled, status_code, (time.perf_counter() - started) * 1000)
+
+    async def keep(self, scope, profile: Profile, sampled: bool, status_code: int, elapsed_ms: float):
+        slow = bool(self.slow_ms) and elapsed_ms >= self.slow_ms
+        if profile.samples and (sampled or slow):
+            meta = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(scope.get("route"), "path", None),
+                "status": status_code,
+                "duration_ms": round(elapsed_ms, 3),
+                "reason": "slow" if slow else "sampled",
+                "samples": profile.samples,
+                "interval_ms": self.sampler.interval * 1000,
+                "started_at": time.time() - elapsed_ms / 1000,
+            }
+            await run_in_threadpool(self.store.save, meta, profile.stacks)
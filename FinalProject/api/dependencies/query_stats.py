@@ -0,0 +1,142 @@
+"""Per-request SQL statement counts, rows and database time.
+
+Engine event hooks add every statement to the QueryStats of the current
+context (a ContextVar, so each request, and the threadpool calls it makes,
+counts separately; outside a tracked block the hooks do nothing). The
+QueryCounter middleware tracks each request, reports the totals as
+X-DB-Queries / X-DB-Rows / X-DB-Time headers (conf.query_stats_headers) and
+a debug log line, and warns when the same SELECT repeats often enough to look
+like an N+1. Tests declare budgets with `budget()`.
+
+Rows are what the driver reports in cursor.rowcount: affected rows for
+writes and, with MySQL's buffered cursors, rows returned by SELECTs (SQLite
+does not report the latter).
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar["QueryStats | None"] = ContextVar("query_stats", default=None)
+
+
+class QueryStats:
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.selects = Counter()
+
+    def add(self, statement: str, rows: int, seconds: float):
+        self.statements += 1
+        self.rows += max(rows, 0)
+        self.seconds += seconds
+        if statement.lstrip()[:6].upper() == "SELECT":
+            self.selects[statement] += 1
+
+    def merge(self, other: "QueryStats"):
+        self.statements += other.statements
+        self.rows += other.rows
+        self.seconds += other.seconds
+        self.selects.update(other.selects)
+
+    def repeated(self, threshold: int):
+        """(statement, times) for each SELECT run at least `threshold` times."""
+        return [(s, n) for s, n in self.selects.most_common() if n >= threshold]
+
+    def headers(self):
+        return {
+            "X-DB-Queries": str(self.statements),
+            "X-DB-Rows": str(self.rows),
+            "X-DB-Time": f"{self.seconds * 1000:.3f}",
+        }
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def track():
+    """Count the statements run in this block; nested blocks also count toward the outer one."""
+    stats = QueryStats()
+    parent = _current.get()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        if parent is not None:
+            parent.merge(stats)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def budget(statements: int, rows: int | None = None):
+    """Fail (for tests) if the block runs more than `statements` statements or touches more than `rows` rows."""
+    with track() as stats:
+        yield stats
+    if stats.statements > statements or (rows is not None and stats.rows > rows):
+        issued = "\n".join(f"  {n}x {s.splitlines()[0][:120]}" for s, n in stats.selects.most_common())
+        raise QueryBudgetExceeded(
+            f"{stats.statements} statements / {stats.rows} rows over the budget of "
+            f"{statements} statements / {rows} rows; SELECTs:\n{issued}"
+        )
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        # The execution context lives for this one statement
+        context.query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, "query_started", None)
+    if stats is not None and started is not None:
+        stats.add(statement, cursor.rowcount, time.perf_counter() - started)
+
+
+class QueryCounter:
+    """ASGI middleware tracking the SQL each HTTP request runs."""
+
+    def __init__(self, app, headers: bool = False, n_plus_one_threshold: int = 0):
+        self.app = app
+        self.headers = headers
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (name.lower().encode(), value.encode()) for name, value in stats.headers().items()
+                ]
+            await send(message)
+
+        with track() as stats:
+            await self.app(scope, receive, send_with_headers if self.headers else send)
+        self.report(scope, stats)
+
+    def report(self, scope, stats: QueryStats):
+        route = f"{scope['method']} {scope['path']}"
+        logger.debug(
+            "%s: %d statements, %d rows, %.1f ms in the database", route, stats.statements, stats.rows,
+            stats.seconds * 1000,
+        )
+        if self.n_plus_one_threshold:
+            for statement, times in stats.repeated(self.n_plus_one_threshold):
+                logger.warning("possible N+1 in %s: %d x %s", route, times, " ".join(statement.split())[:200])
@@ -0,0 +1,61 @@
+import itertools
+import threading
+import time
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+
+class ReadRouter:
+    """Hands out replica engines round-robin, skipping ones that fail a health check.
+
+    A replica is probed with SELECT 1 at most once per `check_interval`
+    seconds; one that fails is skipped until its next probe succeeds. With
+    no healthy replica (or none configured) reads go to the primary.
+    """
+
+    def __init__(self, primary, replicas=(), check_interval: float = 5.0):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._state = {id(engine): {"healthy": True, "checked_at": None} for engine in self.replicas}
+
+    def pick(self):
+        if not self.replicas:
+            return self.primary
+        start = next(self._counter) % len(self.replicas)
+        for offset in range(len(self.replicas)):
+            engine = self.replicas[(start + offset) % len(self.replicas)]
+            if self._healthy(engine):
+                return engine
+        return self.primary
+
+    def _healthy(self, engine):
+        state = self._state[id(engine)]
+        now = time.monotonic()
+        with self._lock:
+            if state["checked_at"] is not None and now - state["checked_at"] < self.check_interval:
+                return state["healthy"]
+            # Claim the probe so concurrent requests don't all run it
+            state["checked_at"] = now
+        healthy = self.probe(engine)
+        with self._lock:
+            state["healthy"] = healthy
+        return healthy
+
+    @staticmethod
+    def probe(engine):
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return True
+        except SQLAlchemyError:
+            return False
+
+    def status(self):
+        with self._lock:
+            return [
+                {"url": engine.url.render_as_string(hide_password=True), "healthy": self._state[id(engine)]["healthy"]}
+                for engine in self.replicas
+            ]
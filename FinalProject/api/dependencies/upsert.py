@@ -0,0 +1,35 @@
+from sqlalchemy import update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+
+def increment(db: Session, model, key: dict, deltas: dict):
+    """Add `deltas` to the counter row identified by `key`, creating it if needed.
+
+    Runs as a single upsert statement on MySQL and SQLite so concurrent
+    writers never lose an increment or collide on the insert.
+    """
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        stmt = sqlite_insert(table).values(**key, **deltas)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key),
+            set_={name: table.c[name] + stmt.excluded[name] for name in deltas},
+        )
+        db.execute(stmt)
+    elif dialect == "mysql":
+        stmt = mysql_insert(table).values(**key, **deltas)
+        stmt = stmt.on_duplicate_key_update(
+            {name: table.c[name] + stmt.inserted[name] for name in deltas}
+        )
+        db.execute(stmt)
+    else:
+        result = db.execute(
+            update(table)
+            .where(*(table.c[name] == value for name, value in key.items()))
+            .values({name: table.c[name] + value for name, value in deltas.items()})
+        )
+        if result.rowcount == 0:
+            db.execute(table.insert().values(**key, **deltas))
@@ -1,11 +1,15 @@
-import uvicorn
+import asyncio
+import logging
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import SQLAlchemyError
 from .routers import index as indexRoute
-from .models import model_loader
 from .dependencies.config import conf
+from .dependencies.database import SessionLocal, engine
+from .dependencies import metrics, profiler, query_stats
+from . import migrations
 
-from .models.model_loader import create_tables
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
@@ -19,15 +23,63 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if conf.query_stats:
+    app.add_middleware(
+        query_stats.QueryCounter,
+        headers=conf.query_stats_headers,
+        n_plus_one_threshold=conf.n_plus_one_threshold,
+    )
+
+if conf.metrics:
+    app.add_middleware(metrics.RequestMetrics)
+
+if conf.profiler:
+    app.add_middleware(
+        profiler.SamplingProfiler,
+        sample_rate=conf.profiler_sample_rate,
+        slow_ms=conf.profiler_slow_ms,
+        interval_ms=conf.profiler_interval_ms,
+        paths=[path.strip() for path in conf.profiler_paths.split(",") if path.strip()],
+    )
+
 
 @app.on_event("startup")
-def on_startup():
-    create_tables()
+async def on_startup():
+    # Workers never change the schema (run `python -m api.manage migrate` on
+    # deploy); they only check, with one query, that it has been migrated.
+    if conf.schema_check_on_startup:
+        try:
+            if not migrations.at_head(engine):
+                logger.warning("database schema is behind; run `python -m api.manage migrate`")
+        except SQLAlchemyError as e:
+            logger.warning("could not check the schema version: %s", e)
+    # Reports a mistyped NOTIFICATION_CHANNELS when the worker starts
+    from .dependencies import channels
+
+    channels.configured_channels()
+    if conf.notification_dispatcher:
+        from .controllers import outbox
 
+        app.state.outbox_stop = asyncio.Event()
+        app.state.outbox_task = asyncio.create_task(
+            outbox.run_dispatcher(SessionLocal, app.state.outbox_stop)
+        )
 
-model_loader.index()
-indexRoute.load_routes(app)
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    if getattr(app.state, "outbox_task", None):
+        app.state.outbox_stop.set()
+        await app.state.outbox_task
+
+
+if conf.lazy_routes:
+    indexRoute.load_routes_lazily(app)
+else:
+    indexRoute.load_routes(app)
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(app, host=conf.app_host, port=conf.app_port)
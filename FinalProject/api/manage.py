@@ -0,0 +1,112 @@
+"""Maintenance commands: python -m api.manage <command> [options]"""
+import argparse
+import time
+from datetime import date
+from .dependencies.database import SessionLocal, engine
+from .models import model_loader  # noqa: F401  register every model
+from .controllers import sales_rollup as sales_rollup_controller
+from .controllers import item_sales as item_sales_controller
+from .controllers import order_details as order_details_controller
+from .controllers import idempotency as idempotency_controller
+from .controllers import outbox
+from . import migrations
+
+
+def migrate(args):
+    with engine.connect() as conn:
+        current = migrations.current_version(conn)
+    if args.status:
+        for migration in migrations.discover():
+            state = "applied" if migration.version <= current else "pending"
+            print(f"{migration.version:04d} {migration.name}: {state}")
+        return
+    applied = migrations.upgrade(engine, target=args.to)
+    for migration in applied:
+        print(f"applied {migration.version:04d} {migration.name}")
+    with engine.connect() as conn:
+        print(f"schema at version {migrations.current_version(conn)} (head {migrations.head()})")
+
+
+def rebuild_sales_rollup(args):
+    with SessionLocal() as db:
+        sales_rollup_controller.rebuild(db, start_day=args.start, end_day=args.end)
+    print("order_daily_rollup rebuilt")
+
+
+def rebuild_item_sales(args):
+    with SessionLocal() as db:
+        if args.verify:
+            mismatches = item_sales_controller.verify(db, batch_size=args.batch_size)
+            for m in mismatches:
+                print(m)
+            print(f"{len(mismatches)} menu items differ from order history")
+            return
+        count = item_sales_controller.rebuild(db, batch_size=args.batch_size)
+    print(f"menu_item_sales rebuilt for {count} menu items")
+
+
+def backfill_line_prices(args):
+    # The price columns come from migration v0002
+    if not migrations.at_head(engine):
+        raise SystemExit("database schema is behind; run `python -m api.manage migrate` first")
+    with SessionLocal() as db:
+        filled = order_details_controller.backfill_prices(db, batch_size=args.batch_size)
+    print(f"backfilled prices on {filled} order lines")
+
+
+def purge_idempotency_keys(args):
+    with SessionLocal() as db:
+        deleted = idempotency_controller.purge_expired(db)
+    print(f"deleted {deleted} expired idempotency keys")
+
+
+def dispatch_notifications(args):
+    while True:
+        totals = outbox.drain(SessionLocal, batch_size=args.batch_size)
+        if any(totals.values()):
+            print(", ".join(f"{count} {outcome}" for outcome, count in totals.items()))
+        if args.once:
+            return
+        time.sleep(args.interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m api.manage")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_cmd = commands.add_parser("migrate", help="apply pending schema migrations")
+    migrate_cmd.add_argument("--to", type=int, help="stop at this version")
+    migrate_cmd.add_argument("--status", action="store_true", help="list migrations without applying them")
+    migrate_cmd.set_defaults(func=migrate)
+
+    rollup = commands.add_parser("rebuild-sales-rollup", help="recompute order_daily_rollup from orders")
+    rollup.add_argument("--start", type=date.fromisoformat, help="first day (YYYY-MM-DD)")
+    rollup.add_argument("--end", type=date.fromisoformat, help="last day (YYYY-MM-DD)")
+    rollup.set_defaults(func=rebuild_sales_rollup)
+
+    item_sales = commands.add_parser("rebuild-item-sales", help="recompute menu_item_sales from order_details")
+    item_sales.add_argument("--batch-size", type=int, default=1000)
+    item_sales.add_argument("--verify", action="store_true", help="only report counters that differ")
+    item_sales.set_defaults(func=rebuild_item_sales)
+
+    prices = commands.add_parser(
+        "backfill-line-prices", help="fill order_details.unit_price/line_total (after migrate)"
+    )
+    prices.add_argument("--batch-size", type=int, default=1000)
+    prices.set_defaults(func=backfill_line_prices)
+
+    purge = commands.add_parser("purge-idempotency-keys", help="delete expired Idempotency-Key records")
+    purge.set_defaults(func=purge_idempotency_keys)
+
+    dispatch = commands.add_parser("dispatch-notifications", help="deliver queued notifications")
+    dispatch.add_argument("--batch-size", type=int, default=None)
+    dispatch.add_argument("--interval", type=float, default=1.0, help="seconds between polls")
+    dispatch.add_argument("--once", action="store_true", help="drain the outbox once and exit")
+    dispatch.set_defaults(func=dispatch_notifications)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
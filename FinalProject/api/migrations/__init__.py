@@ -0,0 +1,136 @@
+"""Versioned schema migrations: python -m api.manage migrate
+
+Each migration is a module here named vNNNN_<name>.py with an
+upgrade(conn) function. Applied versions are recorded in schema_version, so
+checking whether a database is at head is a single query. MySQL commits DDL
+implicitly, so a migration that fails halfway is not rolled back; write
+migrations to be re-runnable (create/add only what is missing; the helpers
+below do that).
+
+v0001 is a frozen copy of the schema when migrations were introduced;
+model changes since then, and from now on, each get a numbered migration.
+"""
+import importlib
+import logging
+import pkgutil
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Held while migrating so two deploys can't run the same migration at once
+LOCK_NAME = "schema_migrations"
+LOCK_TIMEOUT = 300
+
+_MODULE_NAME = re.compile(r"^v(\d{4})_(\w+)$")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    module: str
+
+    def upgrade(self, conn):
+        importlib.import_module(f"{__name__}.{self.module}").upgrade(conn)
+
+
+def discover():
+    """Every migration in this package, oldest first."""
+    migrations = []
+    for module in pkgutil.iter_modules(__path__):
+        match = _MODULE_NAME.match(module.name)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), module.name))
+    return sorted(migrations, key=lambda m: m.version)
+
+
+def head():
+    migrations = discover()
+    return migrations[-1].version if migrations else 0
+
+
+def current_version(conn):
+    """The newest applied version (0 for a database never migrated); one query."""
+    try:
+        return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+    except DBAPIError:
+        # No schema_version table yet
+        conn.rollback()
+        return 0
+
+
+def at_head(engine):
+    with engine.connect() as conn:
+        return current_version(conn) >= head()
+
+
+def _lock(conn):
+    if conn.dialect.name == "mysql":
+        acquired = conn.execute(
+            text("SELECT GET_LOCK(:name, :timeout)"), {"name": LOCK_NAME, "timeout": LOCK_TIMEOUT}
+        ).scalar()
+        if not acquired:
+            raise RuntimeError("Timed out waiting for another migration run to finish")
+
+
+def _unlock(conn):
+    if conn.dialect.name == "mysql":
+        conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": LOCK_NAME})
+
+
+def upgrade(engine, target: int | None = None):
+    """Apply pending migrations up to `target` (default: head); returns those applied."""
+    applied = []
+    with engine.connect() as conn:
+        _lock(conn)
+        try:
+            metadata.create_all(conn)
+            conn.commit()
+            current = current_version(conn)
+            for migration in discover():
+                if migration.version <= current or (target is not None and migration.version > target):
+                    continue
+                logger.info("applying migration %04d %s", migration.version, migration.name)
+                migration.upgrade(conn)
+                conn.execute(
+                    schema_version.insert().values(
+                        version=migration.version, name=migration.name, applied_at=datetime.now()
+                    )
+                )
+                conn.commit()
+                applied.append(migration)
+        finally:
+            _unlock(conn)
+    return applied
+
+
+def add_column(conn, table: str, column: Column):
+    """ALTER TABLE ... ADD COLUMN unless the column already exists."""
+    if column.name in {c["name"] for c in inspect(conn).get_columns(table)}:
+        return False
+    ddl = column.type.compile(dialect=conn.dialect)
+    nullable = "" if column.nullable else " NOT NULL"
+    default = f" DEFAULT {column.server_default.arg}" if column.server_default is not None else ""
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column.name} {ddl}{default}{nullable}"))
+    return True
+
+
+def create_index(conn, index):
+    """Create a model-declared Index unless one with its name exists."""
+    if index.name in {i["name"] for i in inspect(conn).get_indexes(index.table.name)}:
+        return False
+    index.create(conn)
+    return True
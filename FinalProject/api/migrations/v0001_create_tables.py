@@ -0,0 +1,198 @@
+"""The schema as it stood when migrations were introduced.
+
+Frozen: these definitions must not follow later model changes (new
+columns, tables or indexes belong in a later migration), so every database
+at version 1 has the same schema. Tables that already exist are left
+alone, which lets databases made by the old start-up create_all adopt
+migrations; v0002 brings those up to this schema.
+"""
+from sqlalchemy import (
+    DECIMAL,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    func,
+)
+
+metadata = MetaData()
+
+catalog_versions = Table(
+    "catalog_versions",
+    metadata,
+    Column("name", String(50), primary_key=True),
+    Column("version", Integer, nullable=False),
+)
+
+idempotency_keys = Table(
+    "idempotency_keys",
+    metadata,
+    Column("scope", String(50), primary_key=True),
+    Column("key", String(255), primary_key=True),
+    Column("request_hash", String(64), nullable=False),
+    Column("status_code", Integer),
+    Column("response_body", Text),
+    Column("created_at", DateTime, nullable=False),
+    Column("expires_at", DateTime, nullable=False),
+    Index("ix_idempotency_keys_expires_at", "expires_at"),
+)
+
+menu_items = Table(
+    "menu_items",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(100), nullable=False),
+    Column("description", String(255)),
+    Column("price", Float, nullable=False),
+    Column("category", String(50)),
+    Column("calories", Integer),
+    Column("stock", Integer),
+)
+
+order_daily_rollup = Table(
+    "order_daily_rollup",
+    metadata,
+    Column("day", Date, primary_key=True),
+    Column("order_type", String(50), primary_key=True),
+    Column("status", String(50), primary_key=True),
+    Column("order_count", Integer, nullable=False),
+    Column("revenue", Float, nullable=False),
+    Column("discount_total", Float, nullable=False),
+)
+
+promotions = Table(
+    "promotions",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("promo_code", String(50), unique=True, nullable=False),
+    Column("discount_percent", Float, nullable=False),
+    Column("expiration_date", Date),
+)
+
+resources = Table(
+    "resources",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+    Column("item", String(100), unique=True, nullable=False),
+    Column("amount", Integer, index=True, nullable=False, server_default="0.0"),
+)
+
+sandwiches = Table(
+    "sandwiches",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+    Column("sandwich_name", String(100), unique=True, nullable=True),
+    Column("price", DECIMAL(4, 2), nullable=False, server_default="0.0"),
+)
+
+users = Table(
+    "users",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(100), nullable=False),
+    Column("email", String(120), unique=True, nullable=False),
+    Column("phone", String(20)),
+    Column("address", String(255)),
+    Column("password", String(255), nullable=False),
+    Column("role", String(50), nullable=False),
+)
+
+menu_item_sales = Table(
+    "menu_item_sales",
+    metadata,
+    Column("menu_item_id", Integer, ForeignKey("menu_items.id"), primary_key=True),
+    Column("quantity_sold", Integer, nullable=False),
+    Column("revenue", Float, nullable=False),
+    Index("ix_menu_item_sales_quantity_sold", "quantity_sold"),
+)
+
+orders = Table(
+    "orders",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("order_date", DateTime(timezone=True), server_default=func.now()),
+    Column("status", String(50)),
+    Column("total_price", Float),
+    Column("tracking_number", String(100)),
+    Column("order_type", String(50)),
+    Column("user_id", Integer, ForeignKey("users.id")),
+    Column("guest_name", String(100)),
+    Column("guest_email", String(255)),
+    Column("guest_phone", String(20)),
+    Column("description", Text),
+    Column("promotion_id", Integer, ForeignKey("promotions.id")),
+    Column("promotion_code", String(50)),
+    Column("promotion_discount", Float),
+    Column("discount_amount", Float),
+    Index("ix_orders_order_date", "order_date"),
+    Index("ix_orders_user_id_order_date", "user_id", "order_date"),
+    Index("ix_orders_tracking_number", "tracking_number", unique=True),
+    Index("ix_orders_status_order_date", "status", "order_date"),
+)
+
+recipes = Table(
+    "recipes",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+    Column("sandwich_id", Integer, ForeignKey("sandwiches.id")),
+    Column("resource_id", Integer, ForeignKey("resources.id")),
+    Column("amount", Integer, index=True, nullable=False, server_default="0.0"),
+)
+
+notifications = Table(
+    "notifications",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("order_id", Integer, ForeignKey("orders.id")),
+    Column("channel", String(50)),
+    Column("status", String(50)),
+    Column("message", String(255)),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("attempts", Integer, nullable=False, server_default="0"),
+    Column("next_attempt_at", DateTime),
+    Column("sent_at", DateTime),
+    Column("last_error", String(255)),
+    Index("ix_notifications_status_next_attempt_at", "status", "next_attempt_at"),
+)
+
+order_details = Table(
+    "order_details",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("order_id", Integer, ForeignKey("orders.id"), nullable=False),
+    Column("menu_item_id", Integer, ForeignKey("menu_items.id"), nullable=False),
+    Column("quantity", Integer, nullable=False),
+    Column("unit_price", Float),
+    Column("line_total", Float),
+)
+
+payments = Table(
+    "payments",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("order_id", Integer, ForeignKey("orders.id"), nullable=False),
+    Column("payment_type", String(50), nullable=False),
+    Column("transaction_status", String(50), nullable=False),
+    Column("amount", Float, nullable=False),
+)
+
+reviews = Table(
+    "reviews",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("order_id", Integer, ForeignKey("orders.id")),
+    Column("menu_item_id", Integer, ForeignKey("menu_items.id"), nullable=False),
+    Column("rating", Integer, nullable=False),
+    Column("comment", String(255)),
+)
+
+
+def upgrade(conn):
+    metadata.create_all(conn)
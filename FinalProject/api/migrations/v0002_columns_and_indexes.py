@@ -0,0 +1,21 @@
+"""Columns and indexes added to tables that existed before migrations.
+
+create_all never alters an existing table, so databases created before
+these were added to the models get them here.
+"""
+from sqlalchemy import Column, DateTime, Float, Integer, String
+from .. import migrations
+from . import v0001_create_tables as v0001
+
+
+def upgrade(conn):
+    migrations.add_column(conn, "order_details", Column("unit_price", Float))
+    migrations.add_column(conn, "order_details", Column("line_total", Float))
+    migrations.add_column(conn, "orders", Column("discount_amount", Float))
+    migrations.add_column(conn, "notifications", Column("attempts", Integer, nullable=False, server_default="0"))
+    migrations.add_column(conn, "notifications", Column("next_attempt_at", DateTime))
+    migrations.add_column(conn, "notifications", Column("sent_at", DateTime))
+    migrations.add_column(conn, "notifications", Column("last_error", String(255)))
+    # The frozen v0001 definitions, not the live models
+    for index in (*v0001.orders.indexes, *v0001.notifications.indexes):
+        migrations.create_index(conn, index)
@@ -0,0 +1,7 @@
+"""Lease on in-progress Idempotency-Key claims, so a crashed worker's claim expires."""
+from sqlalchemy import Column, DateTime
+from .. import migrations
+
+
+def upgrade(conn):
+    migrations.add_column(conn, "idempotency_keys", Column("in_progress_until", DateTime))
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String
+from ..dependencies.database import Base
+
+
+class CatalogVersion(Base):
+    """Change counters for cached catalogs ("menu", "promotions")."""
+
+    __tablename__ = "catalog_versions"
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from ..dependencies.database import Base
+
+
+class IdempotencyKey(Base):
+    """A client-supplied Idempotency-Key and the response it produced.
+
+    status_code is NULL while the first request with the key is still running.
+    Its claim lasts until in_progress_until, after which another request may
+    take the key over; once the request has committed its work the claim is
+    extended to expires_at, so the work can never run twice.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (Index("ix_idempotency_keys_expires_at", "expires_at"),)
+
+    scope = Column(String(50), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    in_progress_until = Column(DateTime, nullable=True)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, Index
+from ..dependencies.database import Base
+
+
+class MenuItemSales(Base):
+    """Running sales counters per menu item, kept in step with order_details."""
+
+    __tablename__ = "menu_item_sales"
+    __table_args__ = (
+        Index("ix_menu_item_sales_quantity_sold", "quantity_sold"),
+    )
+    menu_item_id = Column(Integer, ForeignKey("menu_items.id"), primary_key=True)
+    quantity_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
@@ -1,23 +1,15 @@
-from ..dependencies.database import Base, engine
 # Import model modules so SQLAlchemy registers them with the metadata
 from . import (
     user,
     order,
     order_details,
+    order_daily_rollup,
     menu_item,
+    menu_item_sales,
     payment,
     notification,
     review,
     promotion,
-    recipes,
-    sandwiches,
-    resources,
+    catalog_version,
+    idempotency_key,
 )
-
-
-def create_tables():
-    Base.metadata.create_all(bind=engine)
-
-
-def index():
-    Base.metadata.create_all(engine)
@@ -1,16 +1,24 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from ..dependencies.database import Base
 
 
 class Notification(Base):
     __tablename__ = "notifications"
+    # The dispatcher scans for due "pending" rows
+    __table_args__ = (Index("ix_notifications_status_next_attempt_at", "status", "next_attempt_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=True)
     channel = Column(String(50), default="mock")
+    # pending -> sending (leased to a dispatcher until next_attempt_at) -> sent,
+    # back to pending to retry, or failed once delivery attempts run out
     status = Column(String(50), default="sent")
     message = Column(String(255))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+    last_error = Column(String(255), nullable=True)
 
     order = relationship("Order", back_populates="notifications")
@@ -1,12 +1,21 @@
-from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime, func, Text
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime, func, Text, Index
 from sqlalchemy.orm import relationship
+from datetime import datetime
 from ..dependencies.database import Base
 
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_order_date", "order_date"),
+        Index("ix_orders_user_id_order_date", "user_id", "order_date"),
+        Index("ix_orders_tracking_number", "tracking_number", unique=True),
+        Index("ix_orders_status_order_date", "status", "order_date"),
+    )
     id = Column(Integer, primary_key=True, index=True)
-    order_date = Column(DateTime(timezone=True), server_default=func.now())
+    # Stamped by the app on insert so the sales rollup knows the order's day
+    # without reading it back; server_default still covers raw inserts.
+    order_date = Column(DateTime(timezone=True), default=datetime.now, server_default=func.now())
     status = Column(String(50), default="Pending")
     total_price = Column(Float)
     tracking_number = Column(String(100))
@@ -20,6 +29,7 @@ class Order(Base):
     promotion_id = Column(Integer, ForeignKey("promotions.id"), nullable=True)
     promotion_code = Column(String(50))
     promotion_discount = Column(Float, default=0)
+    discount_amount = Column(Float, default=0)
     user = relationship("User", back_populates="orders")
     order_details = relationship(
         "OrderDetail", back_populates="order", cascade="all, delete-orphan"
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, Float, Date
+from ..dependencies.database import Base
+
+
+class OrderDailyRollup(Base):
+    """Per-day order totals, split by order_type and status."""
+
+    __tablename__ = "order_daily_rollup"
+    day = Column(Date, primary_key=True)
+    order_type = Column(String(50), primary_key=True)
+    status = Column(String(50), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+    discount_total = Column(Float, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, Float, ForeignKey
 from sqlalchemy.orm import relationship
 from ..dependencies.database import Base
 
@@ -9,5 +9,8 @@ class OrderDetail(Base):
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
     menu_item_id = Column(Integer, ForeignKey("menu_items.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
+    # Price at checkout, so history doesn't drift when the menu price changes
+    unit_price = Column(Float)
+    line_total = Column(Float)
     order = relationship("Order", back_populates="order_details")
     menu_item = relationship("MenuItem", back_populates="order_details")
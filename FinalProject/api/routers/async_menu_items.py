@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..controllers import async_menu_items as controller
+from ..schemas import menu_item as schema
+from ..dependencies.config import conf
+from ..dependencies.async_database import get_db
+from ..dependencies import http_cache
+
+# Included ahead of routers.menu_items when conf.async_db is on; writes stay sync.
+router = APIRouter(tags=["Menu"], prefix="/menu")
+
+
+@router.get("/", response_model=list[schema.MenuItemResponse])
+async def read_menu(request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    tag, items = await controller.read_tagged(db)
+    return http_cache.conditional(request, response, tag, conf.menu_cache_max_age, lambda: items)
+
+
+@router.get("/filter", response_model=list[schema.MenuItemResponse])
+async def filter_menu(
+    request: Request, response: Response, category: str | None = None, db: AsyncSession = Depends(get_db)
+):
+    tag, items = await controller.read_tagged(db, category=category)
+    return http_cache.conditional(request, response, tag, conf.menu_cache_max_age, lambda: items)
+
+
+@router.get("/{item_id}", response_model=schema.MenuItemResponse)
+async def read_menu_item(item_id: int, db: AsyncSession = Depends(get_db)):
+    return await controller.read_one(db, item_id=item_id)
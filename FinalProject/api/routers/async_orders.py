@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..controllers import async_orders as controller
+from ..controllers import checkout as checkout_controller
+from ..controllers import orders as orders_controller
+from ..schemas import order as order_schema
+from ..dependencies.async_database import get_db
+
+# Included ahead of routers.orders when conf.async_db is on; the routes not
+# listed here (updates, deletes, streaming, lookups by id) stay sync.
+router = APIRouter(
+    tags=['Orders'],
+    prefix="/orders"
+)
+
+
+@router.post("/", response_model=order_schema.OrderResponse, status_code=status.HTTP_201_CREATED)
+async def create(
+    request: order_schema.OrderCreate,
+    response: Response,
+    idempotency_key: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    order, timings = await controller.create(db=db, request=request, idempotency_key=idempotency_key)
+    if timings is None:
+        return order
+    response.headers["Server-Timing"] = checkout_controller.server_timing_header(timings)
+    return order
+
+
+@router.post(
+    "/guest",
+    response_model=order_schema.OrderResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_guest_order(
+    request: order_schema.GuestOrderCreate,
+    response: Response,
+    idempotency_key: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    order, timings = await controller.create_guest_order(db=db, request=request, idempotency_key=idempotency_key)
+    if timings is None:
+        return order
+    response.headers["Server-Timing"] = checkout_controller.server_timing_header(timings)
+    return order
+
+
+@router.get("/", response_model=list[order_schema.OrderResponse])
+async def read_all(
+    response: Response,
+    user_id: int | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    cursor: int | None = None,
+    limit: int = Query(50, ge=1, le=orders_controller.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+):
+    orders, next_cursor = await controller.read_page(
+        db, user_id=user_id, start_date=start_date, end_date=end_date, cursor=cursor, limit=limit
+    )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return orders
+
+
+@router.get("/track/{tracking_number}", response_model=order_schema.OrderResponse)
+async def track_order(tracking_number: str, db: AsyncSession = Depends(get_db)):
+    return await controller.track_by_number(db=db, tracking_number=tracking_number)
+
+
+@router.get("/track", response_model=order_schema.OrderResponse)
+async def track_order_with_name(tracking_number: str, name: str | None = None, db: AsyncSession = Depends(get_db)):
+    return await controller.track_by_tracking_and_name(db=db, tracking_number=tracking_number, name=name)
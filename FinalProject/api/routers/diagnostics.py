@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from ..controllers import diagnostics as controller
+from ..dependencies.admin import require_admin
+
+router = APIRouter(tags=["Diagnostics"], prefix="/diagnostics")
+
+
+@router.get("/db-pool", dependencies=[Depends(require_admin)])
+def db_pool():
+    return controller.db_pool()
+
+
+@router.get("/db-replicas", dependencies=[Depends(require_admin)])
+def db_replicas():
+    return controller.db_replicas()
+
+
+@router.get("/profiles", dependencies=[Depends(require_admin)])
+def profiles():
+    return controller.profiles()
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+def profile(profile_id: str):
+    """Folded stacks ("frame;frame;frame count"), for flamegraph.pl or speedscope."""
+    return controller.profile(profile_id)
@@ -1,13 +1,80 @@
-from . import orders, order_details, menu_items, payments, notifications, promotions, analytics, users, reviews
-
-
-def load_routes(app):
-    app.include_router(orders.router)
-    app.include_router(order_details.router)
-    app.include_router(menu_items.router)
-    app.include_router(payments.router)
-    app.include_router(notifications.router)
-    app.include_router(promotions.router)
-    app.include_router(analytics.router)
-    app.include_router(users.router)
-    app.include_router(reviews.router)
+import importlib
+from ..dependencies.config import conf
+
+# Router modules by URL prefix, in registration order
+ROUTE_GROUPS = {
+    "/orders": ("orders",),
+    "/orderdetails": ("order_details",),
+    "/menu": ("menu_items",),
+    "/payments": ("payments",),
+    "/notifications": ("notifications",),
+    "/promotions": ("promotions",),
+    "/analytics": ("analytics",),
+    "/users": ("users",),
+    "/reviews": ("reviews",),
+    "/diagnostics": ("diagnostics",),
+    "/metrics": ("metrics",),
+}
+# Registered ahead of their group when async mode is on, so these routes
+# answer before their sync twins
+ASYNC_ROUTE_GROUPS = {
+    "/orders": ("async_orders",),
+    "/menu": ("async_menu_items",),
+}
+
+
+def _use_async(async_db: bool | None):
+    return conf.async_db if async_db is None else async_db
+
+
+def include_group(app, prefix: str, async_db: bool | None = None):
+    modules = ROUTE_GROUPS[prefix]
+    if _use_async(async_db):
+        # Imported only when enabled, so the asyncio extras stay optional
+        modules = ASYNC_ROUTE_GROUPS.get(prefix, ()) + modules
+    for name in modules:
+        app.include_router(importlib.import_module(f"{__package__}.{name}").router)
+
+
+def load_routes(app, async_db: bool | None = None):
+    for prefix in ROUTE_GROUPS:
+        include_group(app, prefix, async_db)
+
+
+class LazyRoutes:
+    """ASGI middleware that imports and includes each route group on the
+    first request under its prefix, so a cold worker only pays for the
+    routes it serves. The OpenAPI schema and docs load every group.
+    """
+
+    def __init__(self, app, target, async_db: bool | None = None):
+        self.app = app
+        self.target = target
+        self.async_db = async_db
+        self.loaded = set()
+        self.docs_paths = {target.openapi_url, target.docs_url, target.redoc_url} - {None}
+
+    def load(self, prefix: str):
+        # Runs on the event loop without awaiting, so requests can't interleave here
+        if prefix not in self.loaded:
+            include_group(self.target, prefix, self.async_db)
+            self.loaded.add(prefix)
+
+    def load_all(self):
+        for prefix in ROUTE_GROUPS:
+            self.load(prefix)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            path = scope["path"]
+            if path in self.docs_paths:
+                self.load_all()
+            else:
+                prefix = "/" + path.lstrip("/").split("/", 1)[0]
+                if prefix in ROUTE_GROUPS:
+                    self.load(prefix)
+        await self.app(scope, receive, send)
+
+
+def load_routes_lazily(app, async_db: bool | None = None):
+    app.add_middleware(LazyRoutes, target=app, async_db=async_db)
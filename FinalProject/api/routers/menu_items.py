@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from sqlalchemy.orm import Session
 from ..controllers import menu_items as controller
 from ..schemas import menu_item as schema
-from ..dependencies.database import get_db
+from ..dependencies.config import conf
+from ..dependencies.database import get_db, get_read_db
+from ..dependencies import fast_json, http_cache
 
 router = APIRouter(tags=["Menu"], prefix="/menu")
 
@@ -12,18 +14,27 @@ def create_menu_item(request: schema.MenuItemCreate, db: Session = Depends(get_d
     return controller.create(db=db, request=request)
 
 
+def _listing(items):
+    # Catalog items are frozen dataclasses, which orjson encodes directly
+    return fast_json.response(items) if fast_json.enabled() else items
+
+
 @router.get("/", response_model=list[schema.MenuItemResponse])
-def read_menu(db: Session = Depends(get_db)):
-    return controller.read_all(db)
+def read_menu(request: Request, response: Response, db: Session = Depends(get_read_db)):
+    tag, items = controller.read_tagged(db)
+    return http_cache.conditional(request, response, tag, conf.menu_cache_max_age, lambda: _listing(items))
 
 
 @router.get("/filter", response_model=list[schema.MenuItemResponse])
-def filter_menu(category: str | None = None, db: Session = Depends(get_db)):
-    return controller.read_filtered(db, category=category)
+def filter_menu(
+    request: Request, response: Response, category: str | None = None, db: Session = Depends(get_read_db)
+):
+    tag, items = controller.read_tagged(db, category=category)
+    return http_cache.conditional(request, response, tag, conf.menu_cache_max_age, lambda: _listing(items))
 
 
 @router.get("/{item_id}", response_model=schema.MenuItemResponse)
-def read_menu_item(item_id: int, db: Session = Depends(get_db)):
+def read_menu_item(item_id: int, db: Session = Depends(get_read_db)):
     return controller.read_one(db, item_id=item_id)
 
 
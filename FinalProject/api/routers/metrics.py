@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..controllers import metrics as controller
+
+router = APIRouter(tags=["Diagnostics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Async so it runs on the event loop, where the request metrics are recorded
+    return PlainTextResponse(controller.render(), media_type=controller.CONTENT_TYPE)
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
 from ..controllers import notifications as controller
 from ..schemas import notification as schema
+from ..dependencies import fast_json
 from ..dependencies.database import get_db
 
 router = APIRouter(tags=["Notifications"], prefix="/notifications")
@@ -9,11 +10,15 @@ router = APIRouter(tags=["Notifications"], prefix="/notifications")
 
 @router.post("/test", response_model=schema.NotificationResponse, status_code=status.HTTP_201_CREATED)
 def send_test_notification(request: schema.NotificationCreate, db: Session = Depends(get_db)):
-    return controller.send_test(db=db, message=request.message, order_id=request.order_id)
+    return controller.send_test(
+        db=db, message=request.message, order_id=request.order_id, channel=request.channel or "mock"
+    )
 
 
 @router.get("/", response_model=list[schema.NotificationResponse])
 def list_notifications(db: Session = Depends(get_db)):
+    if fast_json.enabled():
+        return fast_json.response(controller.read_all_rows(db=db))
     return controller.read_all(db=db)
 
 
@@ -1,8 +1,15 @@
-from fastapi import APIRouter, Depends, FastAPI, status, Response
+from fastapi import APIRouter, Depends, FastAPI, Header, Query, Request, status, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from ..controllers import orders as controller
+from ..controllers import checkout as checkout_controller
+from ..controllers import idempotency as idempotency_controller
+from ..controllers import order_status as order_status_controller
 from ..schemas import order as order_schema
-from ..dependencies.database import engine, get_db
+from ..dependencies import fast_json
+from ..dependencies.config import conf
+from ..dependencies.database import get_db, get_read_db
 
 router = APIRouter(
     tags=['Orders'],
@@ -11,8 +18,21 @@ router = APIRouter(
 
 
 @router.post("/", response_model=order_schema.OrderResponse, status_code=status.HTTP_201_CREATED)
-def create(request: order_schema.OrderCreate, db: Session = Depends(get_db)):
-    return controller.create(db=db, request=request)
+def create(
+    request: order_schema.OrderCreate,
+    response: Response,
+    idempotency_key: str | None = Header(None),
+    db: Session = Depends(get_db),
+):
+    order = idempotency_controller.run(
+        db, "orders", idempotency_key, request,
+        lambda: controller.create(db=db, request=request),
+        order_schema.OrderResponse, status.HTTP_201_CREATED,
+    )
+    if isinstance(order, Response):
+        return order
+    response.headers["Server-Timing"] = checkout_controller.server_timing(order)
+    return order
 
 
 @router.post(
@@ -21,19 +41,93 @@ def create(request: order_schema.OrderCreate, db: Session = Depends(get_db)):
     status_code=status.HTTP_201_CREATED,
 )
 def create_guest_order(
-    request: order_schema.GuestOrderCreate, db: Session = Depends(get_db)
+    request: order_schema.GuestOrderCreate,
+    response: Response,
+    idempotency_key: str | None = Header(None),
+    db: Session = Depends(get_db),
 ):
-    return controller.create_guest_order(db=db, request=request)
+    order = idempotency_controller.run(
+        db, "orders.guest", idempotency_key, request,
+        lambda: controller.create_guest_order(db=db, request=request),
+        order_schema.OrderResponse, status.HTTP_201_CREATED,
+    )
+    if isinstance(order, Response):
+        return order
+    response.headers["Server-Timing"] = checkout_controller.server_timing(order)
+    return order
 
 
 @router.get("/", response_model=list[order_schema.OrderResponse])
 def read_all(
+    response: Response,
+    user_id: int | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    cursor: int | None = None,
+    limit: int = Query(50, ge=1, le=controller.MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+):
+    if fast_json.enabled():
+        rows, next_cursor = controller.read_page_rows(
+            db, user_id=user_id, start_date=start_date, end_date=end_date, cursor=cursor, limit=limit
+        )
+        headers = {"X-Next-Cursor": str(next_cursor)} if next_cursor is not None else None
+        return fast_json.response(rows, headers=headers)
+    orders, next_cursor = controller.read_page(
+        db, user_id=user_id, start_date=start_date, end_date=end_date, cursor=cursor, limit=limit
+    )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return orders
+
+
+@router.get("/stream")
+def stream_all(
     user_id: int | None = None,
     start_date: str | None = None,
     end_date: str | None = None,
+    db: Session = Depends(get_read_db),
+):
+    return StreamingResponse(
+        controller.stream_all(db, user_id=user_id, start_date=start_date, end_date=end_date),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/active", response_model=list[order_schema.OrderResponse])
+async def read_active(
+    response: Response,
+    statuses: list[str] | None = Query(None, alias="status"),
+    since: int | None = None,
+    wait: float = Query(0, ge=0),
+    limit: int = Query(controller.MAX_PAGE_SIZE, ge=1, le=controller.MAX_PAGE_SIZE),
     db: Session = Depends(get_db),
 ):
-    return controller.read_all(db, user_id=user_id, start_date=start_date, end_date=end_date)
+    """In-flight orders, oldest first.
+
+    Long-poll by passing the X-Queue-Version of the previous response as
+    `since` with `wait` seconds: the request returns as soon as any order
+    changes status, or when the wait runs out.
+    """
+    if since is not None and wait:
+        await order_status_controller.wait_for_change(since, min(wait, conf.active_orders_max_wait))
+    # Read before the query, so a change racing it makes the next poll return at once
+    response.headers["X-Queue-Version"] = str(order_status_controller.version())
+    return await run_in_threadpool(controller.read_active, db, statuses=statuses, limit=limit)
+
+
+@router.get("/active/events")
+async def active_events(request: Request, statuses: list[str] | None = Query(None, alias="status")):
+    return StreamingResponse(
+        order_status_controller.stream_changes(request, statuses=statuses or order_status_controller.ACTIVE),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.patch("/status")
+def bulk_update_status(request: order_schema.OrderStatusBulkUpdate, db: Session = Depends(get_db)):
+    return order_status_controller.bulk_update(db=db, changes=request.updates)
 
 
 @router.get("/track/{tracking_number}", response_model=order_schema.OrderResponse)
@@ -41,6 +135,20 @@ def track_order(tracking_number: str, db: Session = Depends(get_db)):
     return controller.track_by_number(db=db, tracking_number=tracking_number)
 
 
+@router.get("/track/{tracking_number}/events")
+async def track_order_events(tracking_number: str, request: Request, db: Session = Depends(get_db)):
+    """Server-sent events with the order's status now and on every change."""
+    since = order_status_controller.version()
+    current = await run_in_threadpool(controller.track_status, db, tracking_number)
+    return StreamingResponse(
+        order_status_controller.stream_tracking(
+            request, current, since, refresh=lambda: controller.track_status(db, tracking_number)
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/track", response_model=order_schema.OrderResponse)
 def track_order_with_name(tracking_number: str, name: str | None = None, db: Session = Depends(get_db)):
     return controller.track_by_tracking_and_name(db=db, tracking_number=tracking_number, name=name)
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, status
 from sqlalchemy.orm import Session
 from ..controllers import payments as controller
+from ..controllers import idempotency as idempotency_controller
 from ..schemas import payment as schema
 from ..dependencies.database import get_db
 
@@ -8,8 +9,16 @@ router = APIRouter(tags=["Payments"], prefix="/payments")
 
 
 @router.post("/", response_model=schema.PaymentResponse, status_code=status.HTTP_201_CREATED)
-def create_payment(request: schema.PaymentCreate, db: Session = Depends(get_db)):
-    return controller.create(db=db, request=request)
+def create_payment(
+    request: schema.PaymentCreate,
+    idempotency_key: str | None = Header(None),
+    db: Session = Depends(get_db),
+):
+    return idempotency_controller.run(
+        db, "payments", idempotency_key, request,
+        lambda: controller.create(db=db, request=request),
+        schema.PaymentResponse, status.HTTP_201_CREATED,
+    )
 
 
 @router.get("/by-user", response_model=schema.PaymentResponse)
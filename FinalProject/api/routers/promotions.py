@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from sqlalchemy.orm import Session
 from ..controllers import promotions as controller
 from ..schemas import promotion as schema
+from ..dependencies.config import conf
 from ..dependencies.database import get_db
+from ..dependencies import http_cache
 
 router = APIRouter(tags=["Promotions"], prefix="/promotions")
 
@@ -13,8 +15,11 @@ def create_promotion(request: schema.PromotionCreate, db: Session = Depends(get_
 
 
 @router.get("/", response_model=list[schema.PromotionResponse])
-def list_promotions(db: Session = Depends(get_db)):
-    return controller.read_all(db=db)
+def list_promotions(request: Request, response: Response, db: Session = Depends(get_db)):
+    tag = controller.list_etag(db)
+    return http_cache.conditional(
+        request, response, tag, conf.promotions_cache_max_age, lambda: controller.read_all(db=db)
+    )
 
 
 @router.get("/{id}", response_model=schema.PromotionResponse)
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
 from ..controllers import reviews as controller
 from ..schemas import review as schema
+from ..dependencies import fast_json
 from ..dependencies.database import get_db
 
 router = APIRouter(tags=["Reviews"], prefix="/reviews")
@@ -14,6 +15,8 @@ def create_review(request: schema.ReviewCreate, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=list[schema.ReviewResponse])
 def list_reviews(db: Session = Depends(get_db)):
+    if fast_json.enabled():
+        return fast_json.response(controller.read_all_rows(db=db))
     return controller.read_all(db=db)
 
 
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from ..controllers import users as controller
 from ..schemas import user as schema
+from ..dependencies import fast_json
 from ..dependencies.database import get_db
 
 router = APIRouter(tags=["Users"], prefix="/users")
@@ -14,6 +15,8 @@ def create_user(request: schema.UserCreate, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=list[schema.UserResponse])
 def read_users(db: Session = Depends(get_db)):
+    if fast_json.enabled():
+        return fast_json.response(controller.read_all_rows(db=db))
     return controller.read_all(db)
 
 
@@ -61,9 +61,19 @@ class GuestOrderUpdate(BaseModel):
     order_type: Optional[str] = None
 
 
+class OrderStatusChange(BaseModel):
+    order_id: int
+    status: str
+
+
+class OrderStatusBulkUpdate(BaseModel):
+    updates: List[OrderStatusChange] = Field(min_length=1)
+
+
 class OrderResponse(OrderBase):
     id: int
     order_date: Optional[datetime] = None
+    discount_amount: Optional[float] = 0.0
     order_details: List[OrderDetailResponse] = []
     payment: Optional[PaymentResponse] = None
 
@@ -1,10 +1,16 @@
 import pytest
+from datetime import date, timedelta
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from ..dependencies.database import Base
 from ..controllers import analytics as analytics_controller
 from ..controllers import orders as orders_controller
+from ..controllers import sales_rollup as sales_rollup_controller
+from ..controllers import item_sales as item_sales_controller
 from ..models import menu_item as menu_model
+from ..models import order as order_model
+from ..models import order_daily_rollup as rollup_model
+from ..models import menu_item_sales as item_sales_model
 from ..models import user as user_model
 from ..models import order_details as order_details_model  # register metadata
 from ..models import payment as payment_model  # register metadata
@@ -80,3 +86,89 @@ def test_popular_items(db_session):
     revenues = {item["name"]: item["total_revenue"] for item in popular}
     assert revenues["Pizza"] == pytest.approx(36.0)
     assert revenues["Pasta"] == pytest.approx(27.0)
+
+
+def test_sales_summary_breaks_down_by_type_and_status(db_session):
+    seed_orders(db_session)
+    order = db_session.query(order_model.Order).first()
+    orders_controller.update(db_session, order.id, order_schema.OrderBase(status="Paid"))
+
+    summary = analytics_controller.sales_summary(db_session)
+    assert summary["orders_by_type"] == {"takeout": 2}
+    assert summary["orders_by_status"] == {"Paid": 1, "Pending": 1}
+    assert summary["total_revenue"] == pytest.approx(63.0)
+
+
+def test_sales_rollup_tracks_deletes_and_discounts(db_session):
+    seed_orders(db_session)
+    promotion = promotion_model.Promotion(promo_code="QUARTER", discount_percent=25)
+    db_session.add(promotion)
+    db_session.commit()
+    pasta = db_session.query(menu_model.MenuItem).filter_by(name="Pasta").one()
+    discounted = orders_controller.create_guest_order(
+        db_session,
+        order_schema.GuestOrderCreate(
+            guest_name="Promo Guest",
+            items=[order_schema.OrderItem(menu_item_id=pasta.id, quantity=4)],
+            promo_code="QUARTER",
+        ),
+    )
+    first = db_session.query(order_model.Order).order_by(order_model.Order.id).first()
+    orders_controller.delete(db_session, first.id)
+
+    summary = analytics_controller.sales_summary(db_session)
+    assert summary["total_orders"] == 2
+    # 39 left from seed order 2, plus 36 - 25% = 27
+    assert summary["total_revenue"] == pytest.approx(66.0)
+    assert summary["total_discount"] == pytest.approx(9.0)
+    assert discounted.discount_amount == pytest.approx(9.0)
+
+
+def test_sales_by_date_range_filters_days(db_session):
+    seed_orders(db_session)
+    today = date.today()
+
+    in_range = analytics_controller.sales_by_date_range(db_session, str(today), str(today))
+    before = analytics_controller.sales_by_date_range(
+        db_session, None, str(today - timedelta(days=1))
+    )
+
+    assert in_range["total_orders"] == 2
+    assert before["total_orders"] == 0
+
+
+def test_rebuild_matches_incremental_rollup(db_session):
+    seed_orders(db_session)
+    incremental = analytics_controller.sales_summary(db_session)
+
+    db_session.query(rollup_model.OrderDailyRollup).delete()
+    db_session.commit()
+    assert analytics_controller.sales_summary(db_session)["total_orders"] == 0
+
+    sales_rollup_controller.rebuild(db_session)
+    assert analytics_controller.sales_summary(db_session) == incremental
+
+
+def test_popular_items_counters_follow_order_deletes(db_session):
+    seed_orders(db_session)
+    second = db_session.query(order_model.Order).order_by(order_model.Order.id.desc()).first()
+    orders_controller.delete(db_session, second.id)
+
+    popular = analytics_controller.popular_items(db_session)
+    assert [(p["name"], p["total_quantity"]) for p in popular] == [("Pizza", 2)]
+    assert popular[0]["total_revenue"] == pytest.approx(24.0)
+
+
+def test_item_sales_rebuild_and_verify(db_session):
+    seed_orders(db_session)
+    assert item_sales_controller.verify(db_session, batch_size=1) == []
+
+    db_session.query(item_sales_model.MenuItemSales).delete()
+    db_session.commit()
+    mismatches = item_sales_controller.verify(db_session, batch_size=1)
+    assert {m["menu_item_id"] for m in mismatches} == {p.id for p in db_session.query(menu_model.MenuItem)}
+
+    assert item_sales_controller.rebuild(db_session, batch_size=1) == 2
+    assert item_sales_controller.verify(db_session) == []
+    quantities = {p["name"]: p["total_quantity"] for p in analytics_controller.popular_items(db_session)}
+    assert quantities == {"Pizza": 3, "Pasta": 3}
@@ -0,0 +1,111 @@
+import asyncio
+import pytest
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import create_async_engine
+from ..controllers import async_orders as controller
+from ..controllers import async_menu_items as menu_controller
+from ..dependencies.async_database import AsyncSessionLocal
+from ..dependencies.database import Base
+from ..models import menu_item as menu_model
+from ..models import model_loader  # noqa: F401  register every model
+from ..schemas import order as order_schema
+
+
+@pytest.fixture
+def async_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSessionLocal(bind=engine) as db:
+            db.add_all(
+                [
+                    menu_model.MenuItem(name="Bagel", price=3.0, category="breakfast", stock=5),
+                    menu_model.MenuItem(name="Latte", price=4.0, category="drinks"),
+                ]
+            )
+            await db.commit()
+
+    asyncio.run(setup())
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+def run(engine, func):
+    async def wrapper():
+        async with AsyncSessionLocal(bind=engine) as db:
+            return await func(db)
+
+    return asyncio.run(wrapper())
+
+
+def test_async_checkout_and_tracking(async_engine):
+    request = order_schema.GuestOrderCreate(
+        guest_name="Async Guest",
+        items=[
+            order_schema.OrderItem(menu_item_id=1, quantity=2),
+            order_schema.OrderItem(menu_item_id=2, quantity=1),
+        ],
+    )
+    created, timings = run(async_engine, lambda db: controller.create_guest_order(db, request))
+    assert created.total_price == pytest.approx(10.0)
+    assert len(created.order_details) == 2
+    assert "persist" in timings
+
+    tracked = run(async_engine, lambda db: controller.track_by_number(db, created.tracking_number))
+    assert tracked.id == created.id
+    assert len(tracked.order_details) == 2
+
+    named = run(
+        async_engine,
+        lambda db: controller.track_by_tracking_and_name(db, created.tracking_number, name=" async guest "),
+    )
+    assert named.id == created.id
+
+    with pytest.raises(HTTPException) as exc:
+        run(async_engine, lambda db: controller.track_by_number(db, "missing"))
+    assert exc.value.status_code == 404
+
+
+def test_async_checkout_reports_shortage(async_engine):
+    request = order_schema.OrderCreate(
+        user_id=1, items=[order_schema.OrderItem(menu_item_id=1, quantity=6)]
+    )
+    with pytest.raises(HTTPException) as exc:
+        run(async_engine, lambda db: controller.create(db, request))
+    assert exc.value.status_code == 400
+    assert "Insufficient stock" in exc.value.detail
+
+
+def test_async_order_pages(async_engine):
+    request = order_schema.GuestOrderCreate(
+        guest_name="Pager", items=[order_schema.OrderItem(menu_item_id=2, quantity=1)]
+    )
+    for _ in range(3):
+        run(async_engine, lambda db: controller.create_guest_order(db, request))
+
+    first, cursor = run(async_engine, lambda db: controller.read_page(db, limit=2))
+    second, last_cursor = run(async_engine, lambda db: controller.read_page(db, cursor=cursor, limit=2))
+
+    assert [o.id for o in first] == [3, 2]
+    assert [o.id for o in second] == [1]
+    assert last_cursor is None
+    with pytest.raises(HTTPException) as exc:
+        run(async_engine, lambda db: controller.read_page(db, cursor=99, limit=2))
+    assert exc.value.status_code == 400
+
+
+def test_async_menu_reads(async_engine):
+    tag, items = run(async_engine, lambda db: menu_controller.read_tagged(db))
+    assert [item.name for item in items] == ["Bagel", "Latte"]
+    drinks_tag, drinks = run(async_engine, lambda db: menu_controller.read_tagged(db, category="drinks"))
+    assert [item.name for item in drinks] == ["Latte"]
+    assert drinks_tag != tag
+
+    bagel = run(async_engine, lambda db: menu_controller.read_one(db, 1))
+    assert bagel.stock == 5
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from ..controllers import notifications as notifications_controller
+from ..controllers import outbox
+from ..dependencies import channels
+from ..dependencies.database import Base
+from ..models import model_loader  # noqa: F401  register every model
+from ..models import notification as notification_model
+from ..models import order as order_model
+
+
+class StubGateway:
+    """A local HTTP server standing in for the email/SMS/webhook providers."""
+
+    def __init__(self, status=200, delay=0.0):
+        self.status = status
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                with stub._lock:
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                time.sleep(stub.delay)
+                with stub._lock:
+                    stub.requests.append({"path": self.path, "body": body, "auth": self.headers.get("Authorization")})
+                    stub.in_flight -= 1
+                self.send_response(stub.status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def gateway():
+    stub = StubGateway()
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def messages(count, **fields):
+    return [channels.Message(id=i, order_id=None, text=f"note {i}", **fields) for i in range(count)]
+
+
+def test_webhook_sends_messages_in_batches(gateway):
+    driver = channels.WebhookDriver(f"{gateway.url}/hooks", api_key="secret", max_batch=100)
+
+    errors = asyncio.run(driver.send_many(messages(250)))
+
+    assert errors == [None] * 250
+    assert sorted(len(r["body"]["notifications"]) for r in gateway.requests) == [50, 100, 100]
+    assert {r["path"] for r in gateway.requests} == {"/hooks"}
+    assert {r["auth"] for r in gateway.requests} == {"Bearer secret"}
+
+
+def test_batches_in_flight_are_capped(gateway):
+    gateway.delay = 0.05
+    driver = channels.WebhookDriver(gateway.url, max_batch=10, concurrency=2)
+
+    asyncio.run(driver.send_many(messages(80)))
+
+    assert len(gateway.requests) == 8
+    assert gateway.max_in_flight <= 2
+
+
+def test_rate_limit_paces_messages(gateway):
+    driver = channels.SmsDriver(gateway.url, max_batch=10, rate=20)
+
+    started = time.monotonic()
+    errors = asyncio.run(driver.send_many(messages(30, phone="555-0100")))
+
+    # A one-second burst (20 messages) goes at once; the last 10 wait ~0.5s
+    assert errors == [None] * 30
+    assert time.monotonic() - started >= 0.4
+    # Batches run concurrently, so requests are recorded in completion order
+    sent = [m for r in gateway.requests for m in r["body"]["messages"]]
+    assert sorted(m["body"] for m in sent) == sorted(f"note {n}" for n in range(30))
+    assert {m["to"] for m in sent} == {"555-0100"}
+
+
+def test_email_without_address_fails_permanently(gateway):
+    driver = channels.EmailDriver(gateway.url, sender="shop@example.com")
+
+    errors = asyncio.run(
+        driver.send_many([channels.Message(1, None, "hi", email="a@example.com"), channels.Message(2, None, "hi")])
+    )
+
+    assert errors[0] is None
+    assert isinstance(errors[1], channels.PermanentError)
+    assert [m["to"] for m in gateway.requests[0]["body"]["messages"]] == ["a@example.com"]
+
+
+def test_gateway_errors_fail_the_batch():
+    stub = StubGateway(status=503)
+    try:
+        errors = asyncio.run(channels.WebhookDriver(stub.url).send_many(messages(3)))
+    finally:
+        stub.close()
+    assert all(isinstance(e, RuntimeError) for e in errors)
+
+
+def test_status_spike_goes_out_as_few_calls(db_session, gateway, monkeypatch):
+    monkeypatch.setitem(channels.drivers, "webhook", channels.WebhookDriver(gateway.url, max_batch=100))
+    monkeypatch.setitem(channels.drivers, "email", channels.EmailDriver(gateway.url, max_batch=100))
+    monkeypatch.setattr(channels.conf, "notification_channels", "webhook,email")
+
+    orders = [order_model.Order(status="Preparing", guest_name=f"g{i}", guest_email=f"g{i}@example.com") for i in range(300)]
+    db_session.add_all(orders)
+    db_session.flush()
+    for o in orders:
+        notifications_controller.log_status_notification(db_session, o.id, "Ready")
+    db_session.commit()
+
+    totals = outbox.drain(lambda: db_session, batch_size=200)
+
+    assert totals == {"sent": 600, "retrying": 0, "failed": 0}
+    # 600 notifications over two channels: a handful of gateway calls, not 600
+    assert len(gateway.requests) <= 6
+    statuses = {n.status for n in db_session.query(notification_model.Notification)}
+    assert statuses == {"sent"}
+
+
+def test_unknown_configured_channels_are_ignored(db_session, monkeypatch, caplog):
+    monkeypatch.setattr(channels.conf, "notification_channels", "mock,emial")
+    order = order_model.Order(status="Paid", guest_name="g")
+    db_session.add(order)
+    db_session.flush()
+
+    queued = notifications_controller.log_status_notification(db_session, order.id, "Preparing")
+    queued_many = notifications_controller.enqueue_many(db_session, [(order.id, "Ready")])
+    db_session.commit()
+
+    assert [n.channel for n in queued] == ["mock"]
+    assert queued_many == 1
+    assert "emial" in caplog.text
+
+
+def test_driver_missing_a_method_fails_when_constructed():
+    class NoPayload(channels.HttpBatchDriver):
+        name = "incomplete"
+
+    with pytest.raises(TypeError, match="payload"):
+        NoPayload("http://gateway.invalid")
@@ -0,0 +1,68 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+from ..dependencies import config
+from ..dependencies import pool_metrics
+from ..dependencies.pool_metrics import InstrumentedQueuePool
+from ..routers import diagnostics as diagnostics_router
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_pool_reports_usage_and_waits(engine):
+    with engine.connect() as first:
+        first.execute(text("SELECT 1"))
+        stats = pool_metrics.snapshot(engine.pool)
+        assert stats["capacity"] == 2
+        assert stats["checked_out"] == 1
+        assert stats["saturation"] == 0.5
+
+        with engine.connect():
+            assert pool_metrics.snapshot(engine.pool)["overflow"] == 1
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+
+    stats = pool_metrics.snapshot(engine.pool)
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["peak_checked_out"] == 2
+    assert stats["peak_saturation"] == 1.0
+    assert stats["max_wait_ms"] >= stats["avg_wait_ms"] >= 0
+
+
+def test_env_values_are_coerced_to_setting_types():
+    assert config._coerce(True, "off") is False
+    assert config._coerce(False, "1") is True
+    assert config._coerce(5, "20") == 20
+    assert config._coerce("localhost", "db.internal") == "db.internal"
+    assert config._coerce(config.conf.catalog_version_ttl, "0.5") == 0.5
+
+
+def test_invalid_env_values_name_the_variable():
+    with pytest.raises(ValueError, match="MENU_CACHE_MAX_AGE must be a whole number, got '0.5'"):
+        config._coerce(0, "0.5", "MENU_CACHE_MAX_AGE")
+    with pytest.raises(ValueError, match="CATALOG_VERSION_TTL must be a number"):
+        config._coerce(0.0, "soon", "CATALOG_VERSION_TTL")
+
+
+def test_pool_diagnostics_are_admin_only(monkeypatch):
+    monkeypatch.setattr(config.conf, "admin_token", "s3cret")
+    app = FastAPI()
+    app.include_router(diagnostics_router.router)
+    client = TestClient(app)
+
+    assert client.get("/diagnostics/db-pool").status_code == 403
+    assert client.get("/diagnostics/db-pool", headers={"X-Admin-Token": "s3cret"}).status_code == 200
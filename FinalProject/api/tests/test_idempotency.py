@@ -0,0 +1,187 @@
+import threading
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from ..controllers import checkout as checkout_controller
+from ..controllers import idempotency as controller
+from ..controllers import orders as orders_controller
+from ..dependencies.database import Base
+from ..models import model_loader  # noqa: F401  register every model
+from ..models import idempotency_key as idempotency_model
+from ..models import menu_item as menu_model
+from ..models import order as order_model
+from ..schemas import order as order_schema
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'idem.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        db.add(menu_model.MenuItem(name="Panini", price=6.0, stock=10))
+        db.commit()
+    yield factory
+    engine.dispose()
+
+
+GUEST_ORDER = order_schema.GuestOrderCreate(
+    guest_name="Retry Guest", items=[order_schema.OrderItem(menu_item_id=1, quantity=2)]
+)
+
+
+def place(db, key, request=GUEST_ORDER, calls=None):
+    def handler():
+        if calls is not None:
+            calls.append(1)
+        return orders_controller.create_guest_order(db, request)
+
+    return controller.run(
+        db, "orders.guest", key, request, handler, order_schema.OrderResponse, 201
+    )
+
+
+def test_retry_replays_stored_response(session_factory):
+    calls = []
+    with session_factory() as db:
+        first = place(db, "key-1", calls=calls)
+        first_id = first.id
+        replay = place(db, "key-1", calls=calls)
+
+        assert len(calls) == 1
+        assert isinstance(replay, Response)
+        assert replay.status_code == 201
+        assert replay.headers["Idempotent-Replayed"] == "true"
+        assert b'"id":%d' % first_id in replay.body
+        assert db.get(menu_model.MenuItem, 1).stock == 8
+
+
+def test_key_reused_with_different_body_is_rejected(session_factory):
+    with session_factory() as db:
+        place(db, "key-2")
+        other = order_schema.GuestOrderCreate(
+            guest_name="Someone Else", items=[order_schema.OrderItem(menu_item_id=1, quantity=1)]
+        )
+        with pytest.raises(HTTPException) as exc:
+            place(db, "key-2", request=other)
+        assert exc.value.status_code == 422
+
+
+def test_failed_request_frees_the_key(session_factory):
+    too_many = order_schema.GuestOrderCreate(
+        guest_name="Greedy", items=[order_schema.OrderItem(menu_item_id=1, quantity=50)]
+    )
+    with session_factory() as db:
+        with pytest.raises(HTTPException):
+            place(db, "key-3", request=too_many)
+        assert db.get(idempotency_model.IdempotencyKey, ("orders.guest", "key-3")) is None
+
+
+def test_in_progress_key_from_another_worker_conflicts(session_factory):
+    with session_factory() as db:
+        now = datetime.now()
+        db.add(
+            idempotency_model.IdempotencyKey(
+                scope="orders.guest",
+                key="key-4",
+                request_hash=controller.request_hash(GUEST_ORDER),
+                created_at=now,
+                expires_at=now + timedelta(hours=1),
+            )
+        )
+        db.commit()
+        with pytest.raises(HTTPException) as exc:
+            place(db, "key-4")
+        assert exc.value.status_code == 409
+
+
+def test_concurrent_duplicates_run_once(session_factory):
+    calls, results = [], []
+
+    def attempt():
+        with session_factory() as db:
+            result = place(db, "key-5", calls=calls)
+            results.append(result.id if not isinstance(result, Response) else "replayed")
+
+    threads = [threading.Thread(target=attempt) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results.count("replayed") == 4
+    with session_factory() as db:
+        assert db.get(menu_model.MenuItem, 1).stock == 8
+
+
+def test_expired_keys_run_again_and_are_purged(session_factory):
+    calls = []
+    with session_factory() as db:
+        place(db, "key-6", calls=calls)
+        db.query(idempotency_model.IdempotencyKey).update({"expires_at": datetime.now() - timedelta(seconds=1)})
+        db.commit()
+
+        place(db, "key-6", calls=calls)
+        assert len(calls) == 2
+
+        db.query(idempotency_model.IdempotencyKey).update({"expires_at": datetime.now() - timedelta(seconds=1)})
+        db.commit()
+        assert controller.purge_expired(db) == 1
+
+
+def test_failure_after_commit_keeps_the_key(session_factory, monkeypatch):
+    def broken_listener(db, order):
+        raise RuntimeError("listener failed")
+
+    monkeypatch.setattr(checkout_controller, "order_placed_listeners", [broken_listener])
+    calls = []
+    with session_factory() as db:
+        with pytest.raises(RuntimeError):
+            place(db, "key-7", calls=calls)
+        # The order was committed before the listener ran: a retry must not place another
+        replay = place(db, "key-7", calls=calls)
+
+        assert len(calls) == 1
+        assert replay.status_code == 500
+        assert db.query(order_model.Order).count() == 1
+        assert db.get(menu_model.MenuItem, 1).stock == 8
+
+
+def test_claim_of_a_dead_worker_is_taken_over_after_its_lease(session_factory):
+    calls = []
+    with session_factory() as db:
+        now = datetime.now()
+        db.add(
+            idempotency_model.IdempotencyKey(
+                scope="orders.guest",
+                key="key-8",
+                request_hash=controller.request_hash(GUEST_ORDER),
+                created_at=now - timedelta(minutes=5),
+                expires_at=now + timedelta(hours=1),
+                in_progress_until=now - timedelta(seconds=1),
+            )
+        )
+        db.commit()
+
+        order = place(db, "key-8", calls=calls)
+        assert len(calls) == 1
+        assert isinstance(place(db, "key-8", calls=calls), Response)
+        assert len(calls) == 1
+        assert order.id is not None
+
+
+def test_failed_release_does_not_hide_the_error(session_factory, monkeypatch):
+    with session_factory() as db:
+        def handler():
+            def unavailable(*args, **kwargs):
+                raise OperationalError("DELETE", {}, Exception("connection lost"))
+
+            monkeypatch.setattr(db, "query", unavailable)
+            raise ValueError("handler failed")
+
+        with pytest.raises(ValueError, match="handler failed"):
+            controller.run(db, "orders.guest", "key-9", GUEST_ORDER, handler, order_schema.OrderResponse, 201)
@@ -0,0 +1,150 @@
+import os
+import threading
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from ..dependencies.database import Base
+from ..controllers import inventory as inventory_controller
+from ..controllers import orders as orders_controller
+from ..models import menu_item as menu_model
+from ..models import order as order_model
+from ..models import user as user_model  # register metadata
+from ..models import order_details as order_details_model  # register metadata
+from ..models import payment as payment_model  # register metadata
+from ..models import notification as notification_model  # register metadata
+from ..models import promotion as promotion_model  # register metadata
+from ..models import review as review_model  # register metadata
+from ..schemas import order as order_schema
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessions against a real file database so checkouts run concurrently.
+
+    Set STRESS_DATABASE_URL (e.g. a scratch MySQL schema) to run the stress
+    test against another backend.
+    """
+    url = os.environ.get("STRESS_DATABASE_URL") or f"sqlite:///{tmp_path / 'stress.db'}"
+    connect_args = {"check_same_thread": False, "timeout": 30} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def test_reserve_stock_decrements_all_lines(db_session):
+    fries = menu_model.MenuItem(name="Fries", price=3.0, stock=5)
+    soda = menu_model.MenuItem(name="Soda", price=2.0, stock=2)
+    water = menu_model.MenuItem(name="Water", price=1.0)
+    db_session.add_all([fries, soda, water])
+    db_session.commit()
+
+    inventory_controller.reserve_stock(db_session, {fries.id: 3, soda.id: 2, water.id: 10})
+    db_session.commit()
+
+    db_session.refresh(fries)
+    db_session.refresh(soda)
+    db_session.refresh(water)
+    assert fries.stock == 2
+    assert soda.stock == 0
+    assert water.stock is None
+
+
+def test_reserve_stock_reports_every_short_item(db_session):
+    fries = menu_model.MenuItem(name="Fries", price=3.0, stock=1)
+    soda = menu_model.MenuItem(name="Soda", price=2.0, stock=0)
+    shake = menu_model.MenuItem(name="Shake", price=4.0, stock=10)
+    db_session.add_all([fries, soda, shake])
+    db_session.commit()
+
+    with pytest.raises(HTTPException) as exc:
+        inventory_controller.reserve_stock(db_session, {fries.id: 2, soda.id: 1, shake.id: 1})
+
+    assert exc.value.status_code == 400
+    assert f"Fries (id {fries.id}, requested 2, available 1)" in exc.value.detail
+    assert f"Soda (id {soda.id}, requested 1, available 0)" in exc.value.detail
+    assert "Shake" not in exc.value.detail
+    # Nothing was reserved, not even for the line that had enough stock.
+    db_session.refresh(shake)
+    assert shake.stock == 10
+
+
+def test_duplicate_lines_are_reserved_together(db_session):
+    item = menu_model.MenuItem(name="Cookie", price=1.0, stock=3)
+    db_session.add(item)
+    db_session.commit()
+
+    with pytest.raises(HTTPException):
+        orders_controller.create_guest_order(
+            db_session,
+            order_schema.GuestOrderCreate(
+                guest_name="Greedy Guest",
+                items=[
+                    order_schema.OrderItem(menu_item_id=item.id, quantity=2),
+                    order_schema.OrderItem(menu_item_id=item.id, quantity=2),
+                ],
+            ),
+        )
+    db_session.refresh(item)
+    assert item.stock == 3
+
+
+def test_parallel_checkouts_never_oversell(session_factory):
+    stock, checkouts = 10, 40
+    with session_factory() as db:
+        item = menu_model.MenuItem(name="Lunch Special", price=9.0, stock=stock)
+        db.add(item)
+        db.commit()
+        item_id = item.id
+
+    barrier = threading.Barrier(checkouts)
+    outcomes = []
+    lock = threading.Lock()
+
+    def checkout(n):
+        with session_factory() as db:
+            barrier.wait()
+            try:
+                orders_controller.create_guest_order(
+                    db,
+                    order_schema.GuestOrderCreate(
+                        guest_name=f"Guest {n}",
+                        items=[order_schema.OrderItem(menu_item_id=item_id, quantity=1)],
+                    ),
+                )
+                result = "ok"
+            except HTTPException as exc:
+                result = exc.status_code
+        with lock:
+            outcomes.append(result)
+
+    threads = [threading.Thread(target=checkout, args=(n,)) for n in range(checkouts)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with session_factory() as db:
+        remaining = db.get(menu_model.MenuItem, item_id).stock
+        orders = db.query(order_model.Order).count()
+
+    assert outcomes.count("ok") == stock
+    assert orders == stock
+    assert remaining == 0
@@ -2,6 +2,9 @@ import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from ..controllers import menu_items as controller
+from ..controllers import catalog_versions
+from ..controllers import inventory as inventory_controller
+from ..controllers import menu_catalog
 from ..schemas import menu_item as schema
 from ..dependencies.database import Base
 
@@ -84,3 +87,68 @@ def test_filter_menu_items_by_category(db_session):
     assert len(entrees) == 1 and entrees[0].category == "entree"
     assert len(desserts) == 1 and desserts[0].category == "dessert"
     assert len(all_items) == 2
+
+
+def test_catalog_reads_are_served_from_cache(db_session):
+    controller.create(
+        db_session,
+        schema.MenuItemCreate(name="Wrap", description="Veggie", price=8.0, category="entree", calories=400),
+    )
+    controller.read_all(db_session)
+    before = menu_catalog.stats()
+    controller.read_all(db_session)
+    controller.read_filtered(db_session, category="entree")
+    after = menu_catalog.stats()
+
+    assert after["misses"] == before["misses"]
+    assert after["hits"] == before["hits"] + 2
+
+
+def test_catalog_reloads_when_version_moves(db_session):
+    created = controller.create(
+        db_session,
+        schema.MenuItemCreate(name="Taco", description="Fish", price=3.0, category="entree", calories=300),
+    )
+    assert controller.read_one(db_session, created.id).price == 3.0
+
+    controller.update(db_session, created.id, schema.MenuItemUpdate(price=3.5))
+    assert controller.read_one(db_session, created.id).price == 3.5
+
+    # Another worker's change: the row and the version move, nothing is invalidated here
+    db_session.query(menu_model.MenuItem).filter(menu_model.MenuItem.id == created.id).update({"price": 4.0})
+    catalog_versions.bump(db_session, catalog_versions.MENU)
+    db_session.commit()
+    assert controller.read_one(db_session, created.id).price == 4.0
+
+
+def test_catalog_stock_is_read_live(db_session):
+    created = controller.create(
+        db_session,
+        schema.MenuItemCreate(name="Pie", description="Apple", price=5.0, category="dessert", calories=350, stock=4),
+    )
+    assert controller.read_one(db_session, created.id).stock == 4
+
+    inventory_controller.reserve_stock(db_session, {created.id: 3})
+    db_session.commit()
+
+    assert controller.read_one(db_session, created.id).stock == 1
+    assert controller.read_filtered(db_session, category="dessert")[0].stock == 1
+
+
+def test_menu_etag_tracks_edits_and_stock(db_session):
+    created = controller.create(
+        db_session,
+        schema.MenuItemCreate(name="Cookie", description="Chip", price=2.0, category="dessert", calories=200, stock=10),
+    )
+    tag, items = controller.read_tagged(db_session)
+    assert [item.name for item in items] == ["Cookie"]
+    assert controller.read_tagged(db_session)[0] == tag
+    assert controller.read_tagged(db_session, category="dessert")[0] != tag
+
+    inventory_controller.reserve_stock(db_session, {created.id: 1})
+    db_session.commit()
+    after_sale, _ = controller.read_tagged(db_session)
+    assert after_sale != tag
+
+    controller.update(db_session, created.id, schema.MenuItemUpdate(price=2.25))
+    assert controller.read_tagged(db_session)[0] != after_sale
@@ -0,0 +1,97 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from ..controllers import metrics as metrics_controller
+from ..controllers import orders as orders_controller
+from ..controllers import payments as payments_controller
+from ..dependencies import metrics
+from ..dependencies.database import Base
+from ..models import model_loader  # noqa: F401  register every model
+from ..models import menu_item as menu_model
+from ..schemas import order as order_schema
+from ..schemas import payment as payment_schema
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def test_histogram_exposition_is_cumulative():
+    histogram = metrics.Histogram("latency_seconds", "Latency", labels=("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, route="/a")
+
+    lines = histogram.lines()
+    assert lines[:2] == ["# HELP latency_seconds Latency", "# TYPE latency_seconds histogram"]
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/a"} 4' in lines
+    assert 'latency_seconds_sum{route="/a"} 4.25' in lines
+
+
+def test_request_metrics_label_by_route_template():
+    app = FastAPI()
+    app.add_middleware(metrics.RequestMetrics)
+
+    @app.get("/widgets/{widget_id}")
+    def widget(widget_id: int):
+        if widget_id > 10:
+            raise HTTPException(status_code=404, detail="missing")
+        return {"id": widget_id}
+
+    client = TestClient(app)
+    before = metrics.request_duration.count(method="GET", route="/widgets/{widget_id}", status="200")
+    client.get("/widgets/1")
+    client.get("/widgets/2")
+    client.get("/widgets/99")
+    client.get("/nowhere")
+
+    assert metrics.request_duration.count(method="GET", route="/widgets/{widget_id}", status="200") == before + 2
+    assert metrics.request_duration.count(method="GET", route="/widgets/{widget_id}", status="404") >= 1
+    assert metrics.request_duration.count(method="GET", route="unmatched", status="404") >= 1
+    assert metrics.requests_in_flight.value == 0
+
+
+def test_business_counters_and_exposition(db_session):
+    db_session.add(menu_model.MenuItem(name="Sandwich", price=5.0, stock=1))
+    db_session.commit()
+    created = metrics.orders_created.value()
+    stock_outs = metrics.stock_outs.value()
+    failures = metrics.payments.value(result="failure")
+
+    order = orders_controller.create_guest_order(
+        db_session,
+        order_schema.GuestOrderCreate(guest_name="Guest", items=[order_schema.OrderItem(menu_item_id=1, quantity=1)]),
+    )
+    with pytest.raises(HTTPException):
+        orders_controller.create_guest_order(
+            db_session,
+            order_schema.GuestOrderCreate(guest_name="Guest", items=[order_schema.OrderItem(menu_item_id=1, quantity=1)]),
+        )
+    payments_controller.create(
+        db_session,
+        payment_schema.PaymentCreate(
+            order_id=order.id, payment_type="Card", transaction_status="Declined", amount=order.total_price
+        ),
+    )
+
+    assert metrics.orders_created.value() == created + 1
+    assert metrics.stock_outs.value() == stock_outs + 1
+    assert metrics.payments.value(result="failure") == failures + 1
+
+    text = metrics_controller.render()
+    assert f"orders_created_total {created + 1}" in text.splitlines()
+    assert "# TYPE payments_total counter" in text
+    assert 'cache_hit_ratio{cache="tracking"}' in text
+    assert "# TYPE db_pool_checkouts_total counter" in text
@@ -1,3 +1,5 @@
+import asyncio
+from datetime import datetime, timedelta
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -5,6 +7,9 @@ from ..dependencies.database import Base
 from ..controllers import notifications as notifications_controller
 from ..controllers import orders as orders_controller
 from ..controllers import payments as payments_controller
+from ..controllers import outbox
+from ..dependencies import channels
+from ..dependencies.config import conf
 from ..models import menu_item as menu_model
 from ..models import user as user_model
 from ..models import order_details as order_details_model  # register
@@ -55,13 +60,13 @@ def test_order_status_update_logs_notification(db_session):
     order = seed_order(db_session)
 
     orders_controller.update(
-        db_session, order.id, order_schema.OrderBase(status="Ready")
+        db_session, order.id, order_schema.OrderBase(status="Paid")
     )
 
     count = db_session.query(notification_model.Notification).count()
     assert count == 1
     notif = db_session.query(notification_model.Notification).first()
-    assert "Ready" in notif.message
+    assert "Paid" in notif.message
 
 
 def test_payment_success_logs_notification(db_session):
@@ -97,3 +102,112 @@ def test_payment_success_logs_notification(db_session):
     notif = db_session.query(notification_model.Notification).first()
     assert notif is not None
     assert "Paid" in notif.message
+
+
+def test_status_change_is_queued_with_the_change(db_session):
+    order = seed_order(db_session)
+    orders_controller.update(db_session, order.id, order_schema.OrderBase(status="Cancelled"))
+
+    notif = db_session.query(notification_model.Notification).one()
+    assert notif.status == "pending"
+    assert notif.attempts == 0
+    assert notif.next_attempt_at is not None
+
+
+def test_dispatcher_delivers_pending_notifications(db_session):
+    order = seed_order(db_session)
+    orders_controller.update(db_session, order.id, order_schema.OrderBase(status="Paid"))
+
+    counts = outbox.dispatch_batch(db_session)
+
+    assert counts == {"sent": 1, "retrying": 0, "failed": 0}
+    notif = db_session.query(notification_model.Notification).one()
+    assert notif.status == "sent"
+    assert notif.sent_at is not None
+    assert outbox.dispatch_batch(db_session)["sent"] == 0
+
+
+def test_failed_delivery_backs_off_then_gives_up(db_session, monkeypatch):
+    class BrokenDriver(channels.MockDriver):
+        async def send_batch(self, client, messages):
+            raise ConnectionError("gateway down")
+
+    monkeypatch.setitem(channels.drivers, "mock", BrokenDriver())
+    monkeypatch.setattr(conf, "notification_max_attempts", 3)
+    monkeypatch.setattr(conf, "notification_retry_base", 10.0)
+    order = seed_order(db_session)
+    orders_controller.update(db_session, order.id, order_schema.OrderBase(status="Paid"))
+
+    now = datetime.now()
+    assert outbox.dispatch_batch(db_session, now=now)["retrying"] == 1
+    notif = db_session.query(notification_model.Notification).one()
+    assert notif.attempts == 1
+    assert notif.last_error == "gateway down"
+    assert notif.next_attempt_at == now + timedelta(seconds=10)
+
+    # Not due again until the backoff has passed
+    assert outbox.dispatch_batch(db_session, now=now + timedelta(seconds=5))["retrying"] == 0
+    assert outbox.dispatch_batch(db_session, now=now + timedelta(seconds=10))["retrying"] == 1
+    assert notif.next_attempt_at == now + timedelta(seconds=30)
+    assert outbox.dispatch_batch(db_session, now=now + timedelta(seconds=30))["failed"] == 1
+    assert notif.status == "failed"
+
+
+def test_delivery_runs_outside_any_transaction(db_session, monkeypatch):
+    seen = []
+
+    class WatchingDriver(channels.MockDriver):
+        async def send_batch(self, client, messages):
+            seen.append((db_session.in_transaction(), db_session.query(notification_model.Notification).one().status))
+            db_session.rollback()
+            return await super().send_batch(client, messages)
+
+    monkeypatch.setitem(channels.drivers, "mock", WatchingDriver())
+    order = seed_order(db_session)
+    orders_controller.update(db_session, order.id, order_schema.OrderBase(status="Paid"))
+
+    assert outbox.dispatch_batch(db_session)["sent"] == 1
+    # The claim was committed before the gateway was called
+    assert seen == [(False, "sending")]
+
+
+def test_expired_send_lease_is_delivered_again(db_session, monkeypatch):
+    monkeypatch.setattr(conf, "notification_send_lease", 60.0)
+    order = seed_order(db_session)
+    orders_controller.update(db_session, order.id, order_schema.OrderBase(status="Paid"))
+
+    # A dispatcher claims the row and dies before recording the outcome
+    now = datetime.now()
+    assert outbox.claim(db_session, now, 10)
+    notif = db_session.query(notification_model.Notification).one()
+    assert notif.status == "sending"
+
+    assert outbox.dispatch_batch(db_session, now=now + timedelta(seconds=30))["sent"] == 0
+    assert outbox.dispatch_batch(db_session, now=now + timedelta(seconds=60))["sent"] == 1
+    assert notif.status == "sent"
+
+
+def test_background_dispatcher_drains_until_stopped(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'outbox.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        for i in range(3):
+            notifications_controller.enqueue(db, order_id=None, message=f"queued {i}")
+        db.commit()
+
+    async def run():
+        stop = asyncio.Event()
+        task = asyncio.create_task(outbox.run_dispatcher(factory, stop, interval=0.01))
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            with factory() as db:
+                if not db.query(notification_model.Notification).filter_by(status="pending").count():
+                    break
+        stop.set()
+        await task
+
+    asyncio.run(run())
+    with factory() as db:
+        assert {n.status for n in db.query(notification_model.Notification)} == {"sent"}
+    engine.dispose()
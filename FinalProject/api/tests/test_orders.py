@@ -1,10 +1,20 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
 import pytest
 from fastapi import HTTPException
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from ..controllers import orders as controller
+from ..controllers import checkout as checkout_controller
+from ..controllers import order_details as order_details_controller
+from ..controllers import order_status as order_status_controller
+from ..controllers import sales_rollup as sales_rollup_controller
+from ..controllers import tracking_cache
+from ..dependencies import fast_json
 from ..dependencies.database import Base
 from ..models import menu_item as menu_model
+from ..models import order as order_model
 from ..models import user as user_model  # ensure users table is registered
 from ..models import order_details as order_details_model  # ensure order_details table is registered
 from ..models import payment as payment_model  # ensure payment table is registered
@@ -210,3 +220,340 @@ def test_track_order_by_tracking_number_guest(db_session):
     tracked = controller.track_by_number(db_session, created.tracking_number)
     assert tracked.id == created.id
     assert tracked.guest_name == "Guest Tracker"
+
+
+def test_checkout_merges_repeated_menu_items(db_session):
+    item = menu_model.MenuItem(name="Taco", description="Spicy", price=4.0)
+    db_session.add(item)
+    db_session.commit()
+
+    created = controller.create_guest_order(
+        db_session,
+        order_schema.GuestOrderCreate(
+            guest_name="Taco Fan",
+            items=[
+                order_schema.OrderItem(menu_item_id=item.id, quantity=1),
+                order_schema.OrderItem(menu_item_id=item.id, quantity=2),
+            ],
+        ),
+    )
+
+    assert len(created.order_details) == 1
+    assert created.order_details[0].quantity == 3
+    assert created.total_price == pytest.approx(12.0)
+
+
+def test_checkout_pipeline_times_each_stage(db_session):
+    item = menu_model.MenuItem(name="Bagel", description="Plain", price=3.0)
+    db_session.add(item)
+    db_session.commit()
+
+    seen = []
+    pipeline = checkout_controller.CheckoutPipeline()
+    pipeline.add_stage("audit", lambda ctx: seen.append(ctx.total_price), after="discount")
+    order = pipeline.run(
+        db_session,
+        order_schema.GuestOrderCreate(
+            guest_name="Bagel Guest",
+            items=[order_schema.OrderItem(menu_item_id=item.id, quantity=2)],
+        ),
+        guest_name="Bagel Guest",
+    )
+
+    assert seen == [pytest.approx(6.0)]
+    assert list(order.checkout_timings) == [
+        "validate", "reserve", "price", "discount", "audit", "persist", "notify"
+    ]
+    assert pipeline.stats()["persist"]["count"] == 1
+    assert "persist;dur=" in checkout_controller.server_timing(order)
+
+
+def _seed_guest_orders(db_session, count):
+    item = menu_model.MenuItem(name="Muffin", description="Blueberry", price=2.0)
+    db_session.add(item)
+    db_session.commit()
+    return [
+        controller.create_guest_order(
+            db_session,
+            order_schema.GuestOrderCreate(
+                guest_name=f"Guest {n}",
+                items=[order_schema.OrderItem(menu_item_id=item.id, quantity=1)],
+            ),
+        ).id
+        for n in range(count)
+    ]
+
+
+def test_read_page_walks_history_with_cursor(db_session):
+    created_ids = _seed_guest_orders(db_session, 5)
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        page, cursor = controller.read_page(db_session, cursor=cursor, limit=2)
+        seen.extend(o.id for o in page)
+        pages += 1
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert seen == sorted(created_ids, reverse=True)
+
+
+def test_cursor_of_a_deleted_order_is_rejected(db_session):
+    _seed_guest_orders(db_session, 3)
+    _, cursor = controller.read_page(db_session, limit=1)
+    db_session.query(order_model.Order).filter(order_model.Order.id == cursor).delete()
+    db_session.commit()
+
+    for read in (controller.read_page, controller.read_page_rows):
+        with pytest.raises(HTTPException) as exc:
+            read(db_session, cursor=cursor, limit=1)
+        assert exc.value.status_code == 400
+
+
+def test_read_page_caps_page_size(db_session):
+    _seed_guest_orders(db_session, 3)
+    page, cursor = controller.read_page(db_session, limit=controller.MAX_PAGE_SIZE + 50)
+    assert len(page) == 3
+    assert cursor is None
+
+
+def test_stream_all_yields_ndjson_lines(db_session):
+    created_ids = _seed_guest_orders(db_session, 3)
+
+    lines = list(controller.stream_all(db_session, chunk_size=2))
+
+    assert len(lines) == 3
+    assert all(line.endswith("\n") for line in lines)
+    streamed_ids = [order_schema.OrderResponse.model_validate_json(line).id for line in lines]
+    assert streamed_ids == sorted(created_ids, reverse=True)
+
+
+def test_order_lines_keep_checkout_price(db_session):
+    item = menu_model.MenuItem(name="Latte", description="Hot", price=4.0)
+    db_session.add(item)
+    db_session.commit()
+    created = controller.create_guest_order(
+        db_session,
+        order_schema.GuestOrderCreate(
+            guest_name="Coffee Guest",
+            items=[order_schema.OrderItem(menu_item_id=item.id, quantity=2)],
+        ),
+    )
+
+    item.price = 5.5
+    db_session.commit()
+    db_session.expire_all()
+
+    line = controller.read_one(db_session, created.id).order_details[0]
+    assert line.unit_price == pytest.approx(4.0)
+    assert line.line_total == pytest.approx(8.0)
+
+
+def test_backfill_prices_fills_legacy_lines(db_session):
+    created_ids = _seed_guest_orders(db_session, 3)
+    db_session.query(order_details_model.OrderDetail).update({"unit_price": None, "line_total": None})
+    db_session.commit()
+
+    assert order_details_controller.backfill_prices(db_session, batch_size=2) == 3
+    lines = db_session.query(order_details_model.OrderDetail).all()
+    assert len(lines) == len(created_ids)
+    assert all(line.unit_price == pytest.approx(2.0) for line in lines)
+    assert all(line.line_total == pytest.approx(2.0) for line in lines)
+    assert order_details_controller.backfill_prices(db_session) == 0
+
+
+def _status_changes(*pairs):
+    return [order_schema.OrderStatusChange(order_id=order_id, status=new) for order_id, new in pairs]
+
+
+def test_bulk_status_update_moves_orders_in_few_statements(db_session):
+    orders = _seed_guest_orders(db_session, 40)
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        result = order_status_controller.bulk_update(
+            db_session,
+            _status_changes(*[(order_id, "Paid") for order_id in orders[:30]], *[(order_id, "Cancelled") for order_id in orders[30:]]),
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert result["updated"] == 40
+    updates = [s for s in statements if s.lstrip().upper().startswith("UPDATE ORDERS")]
+    inserts = [s for s in statements if "INSERT INTO notifications" in s]
+    assert len(updates) == 2
+    assert len(inserts) == 1
+    # Select + 2 updates + rollup upserts (one per status row) + 1 notification insert
+    assert len(statements) <= 8
+
+    db_session.expire_all()
+    statuses = [db_session.get(order_model.Order, order_id).status for order_id in orders]
+    assert statuses.count("Paid") == 30 and statuses.count("Cancelled") == 10
+    assert db_session.query(notification_model.Notification).count() == 40
+    summary = sales_rollup_controller.summarize(db_session)
+    assert summary["orders_by_status"] == {"Paid": 30, "Cancelled": 10}
+
+
+def test_bulk_status_update_rejects_the_whole_batch(db_session):
+    orders = _seed_guest_orders(db_session, 2)
+
+    with pytest.raises(HTTPException) as exc:
+        order_status_controller.bulk_update(
+            db_session, _status_changes((orders[0], "Paid"), (orders[1], "Completed"))
+        )
+    assert exc.value.status_code == 400
+    assert f"{orders[1]}: Pending -> Completed" in exc.value.detail
+
+    db_session.expire_all()
+    assert {db_session.get(order_model.Order, order_id).status for order_id in orders} == {"Pending"}
+    assert db_session.query(notification_model.Notification).count() == 0
+
+    with pytest.raises(HTTPException) as exc:
+        order_status_controller.bulk_update(db_session, _status_changes((9999, "Paid")))
+    assert exc.value.status_code == 404
+
+    with pytest.raises(HTTPException) as exc:
+        order_status_controller.bulk_update(
+            db_session, _status_changes((orders[0], "Paid"), (orders[0], "Cancelled"))
+        )
+    assert exc.value.status_code == 400
+
+
+def test_update_enforces_the_status_state_machine(db_session):
+    order_id = _seed_guest_orders(db_session, 1)[0]
+
+    with pytest.raises(HTTPException) as exc:
+        controller.update(db_session, order_id, order_schema.OrderBase(status="Ready"))
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException):
+        controller.update(db_session, order_id, order_schema.OrderBase(status="Shipped"))
+
+    for new in ("Paid", "Preparing", "Ready", "Completed"):
+        assert controller.update(db_session, order_id, order_schema.OrderBase(status=new)).status == new
+    with pytest.raises(HTTPException):
+        controller.update(db_session, order_id, order_schema.OrderBase(status="Cancelled"))
+
+
+def test_read_active_lists_in_flight_orders_oldest_first(db_session):
+    order_ids = _seed_guest_orders(db_session, 4)
+    start = datetime(2024, 5, 1, 12, 0)
+    for offset, order_id in enumerate(reversed(order_ids)):
+        db_session.get(order_model.Order, order_id).order_date = start + timedelta(minutes=offset)
+    db_session.commit()
+    controller.update(db_session, order_ids[0], order_schema.OrderBase(status="Cancelled"))
+    controller.update(db_session, order_ids[1], order_schema.OrderBase(status="Paid"))
+
+    active = controller.read_active(db_session)
+    assert [o.id for o in active] == [order_ids[3], order_ids[2], order_ids[1]]
+    # Merged across the per-status queries before the limit is applied
+    assert [o.id for o in controller.read_active(db_session, limit=2)] == [order_ids[3], order_ids[2]]
+    assert [o.id for o in controller.read_active(db_session, statuses=["Paid"])] == [order_ids[1]]
+
+
+def test_status_change_wakes_active_order_long_poll(db_session):
+    order_id = _seed_guest_orders(db_session, 1)[0]
+    since = order_status_controller.version()
+
+    async def poll():
+        waiter = asyncio.create_task(order_status_controller.wait_for_change(since, timeout=5))
+        await asyncio.sleep(0.05)
+        controller.update(db_session, order_id, order_schema.OrderBase(status="Paid"))
+        return await waiter
+
+    assert asyncio.run(poll()) is True
+    assert order_status_controller.version() == since + 1
+    assert asyncio.run(order_status_controller.wait_for_change(since + 1, timeout=0.05)) is False
+
+
+class _ConnectedRequest:
+    async def is_disconnected(self):
+        return False
+
+
+def test_tracking_stream_follows_one_order_until_completed(db_session):
+    order_ids = _seed_guest_orders(db_session, 2)
+    watched, other = (db_session.get(order_model.Order, order_id) for order_id in order_ids)
+    tracking_number = watched.tracking_number
+    since = order_status_controller.version()
+    current = controller.track_status(db_session, tracking_number)
+    assert current["status"] == "Pending"
+
+    async def follow():
+        stream = order_status_controller.stream_tracking(
+            _ConnectedRequest(), current, since, refresh=lambda: controller.track_status(db_session, tracking_number)
+        )
+        events = [await stream.__anext__()]
+        controller.update(db_session, other.id, order_schema.OrderBase(status="Cancelled"))
+        for new in ("Paid", "Preparing", "Ready", "Completed"):
+            controller.update(db_session, watched.id, order_schema.OrderBase(status=new))
+        events += [event async for event in stream]
+        return events
+
+    events = asyncio.run(follow())
+    statuses = [json.loads(event.split("data: ")[1])["status"] for event in events]
+    # The other order's change is not delivered, and the stream ends once completed
+    assert statuses == ["Pending", "Paid", "Preparing", "Ready", "Completed"]
+
+    with pytest.raises(HTTPException) as exc:
+        controller.track_status(db_session, "no-such-number")
+    assert exc.value.status_code == 404
+
+
+def test_tracking_lookups_are_cached_until_the_order_changes(db_session):
+    tracking_cache.clear()
+    order_id = _seed_guest_orders(db_session, 1)[0]
+    tracking_number = db_session.get(order_model.Order, order_id).tracking_number
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        assert controller.track_by_number(db_session, tracking_number).status == "Pending"
+        loaded = len(statements)
+        assert controller.track_by_tracking_and_name(db_session, tracking_number, name=" guest 0 ").id == order_id
+        with pytest.raises(HTTPException):
+            controller.track_by_tracking_and_name(db_session, tracking_number, name="Someone Else")
+        assert len(statements) == loaded
+
+        # Unknown numbers are remembered as missing
+        for _ in range(3):
+            with pytest.raises(HTTPException) as exc:
+                controller.track_by_number(db_session, "not-a-real-number")
+            assert exc.value.status_code == 404
+        assert len(statements) == loaded + 1
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    controller.update(db_session, order_id, order_schema.OrderBase(status="Paid"))
+    assert controller.track_by_number(db_session, tracking_number).status == "Paid"
+    assert tracking_cache.stats()["negative_hits"] == 2
+
+
+def test_fast_json_order_page_matches_response_model(db_session):
+    orjson = pytest.importorskip("orjson")
+    order_ids = _seed_guest_orders(db_session, 3)
+    controller.update(db_session, order_ids[1], order_schema.OrderBase(status="Paid"))
+    db_session.add(
+        payment_model.Payment(order_id=order_ids[1], payment_type="Card", transaction_status="Success", amount=2.0)
+    )
+    db_session.commit()
+
+    rows, row_cursor = controller.read_page_rows(db_session, limit=2)
+    orders, cursor = controller.read_page(db_session, limit=2)
+    expected = [
+        order_schema.OrderResponse.model_validate(o, from_attributes=True).model_dump(mode="json") for o in orders
+    ]
+    assert row_cursor == cursor
+    assert orjson.loads(fast_json.response(rows).body) == expected
+    assert any(row["payment"] for row in rows) and all(row["order_details"] for row in rows)
@@ -195,3 +195,42 @@ def test_delete_payment_resets_order_status(db_session):
     assert reverted_order.status == "Pending"
     with pytest.raises(HTTPException):
         payments_controller.read_one(db_session, payment.id)
+
+
+def test_payment_follows_the_status_state_machine(db_session):
+    order = create_order_with_items(db_session)
+    orders_controller.update(db_session, order.id, order_schema.OrderBase(status="Cancelled"))
+
+    with pytest.raises(HTTPException) as exc:
+        payments_controller.create(
+            db_session,
+            payment_schema.PaymentCreate(
+                order_id=order.id,
+                payment_type="Card",
+                transaction_status="Success",
+                amount=order.total_price,
+            ),
+        )
+    assert exc.value.status_code == 400
+    assert db_session.query(payment_model.Payment).count() == 0
+
+
+def test_payment_of_order_in_preparation_cannot_be_reversed(db_session):
+    order = create_order_with_items(db_session)
+    payment = payments_controller.create(
+        db_session,
+        payment_schema.PaymentCreate(
+            order_id=order.id,
+            payment_type="Card",
+            transaction_status="Success",
+            amount=order.total_price,
+        ),
+    )
+    orders_controller.update(db_session, order.id, order_schema.OrderBase(status="Preparing"))
+
+    with pytest.raises(HTTPException) as exc:
+        payments_controller.update(db_session, payment.id, payment_schema.PaymentUpdate(transaction_status="Refunded"))
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException):
+        payments_controller.delete(db_session, payment.id)
+    assert orders_controller.read_one(db_session, order.id).status == "Preparing"
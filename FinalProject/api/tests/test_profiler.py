@@ -0,0 +1,94 @@
+import time
+from collections import Counter
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from ..dependencies import profiler
+from ..dependencies.config import conf
+from ..routers import diagnostics as diagnostics_router
+
+
+def busy_wait(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _app(store, **options):
+    app = FastAPI()
+    app.add_middleware(profiler.SamplingProfiler, store=store, interval_ms=2, **options)
+
+    @app.get("/orders/slow")
+    def slow():
+        busy_wait(0.1)
+        return {}
+
+    @app.get("/orders/fast")
+    def fast():
+        return {}
+
+    @app.get("/menu/slow")
+    def menu_slow():
+        busy_wait(0.1)
+        return {}
+
+    return app
+
+
+def test_sampled_request_is_stored_as_folded_stacks(tmp_path):
+    store = profiler.ProfileStore(str(tmp_path), max_profiles=10)
+    client = TestClient(_app(store, sample_rate=1.0))
+
+    assert client.get("/orders/slow").status_code == 200
+
+    (meta,) = store.list()
+    assert meta["route"] == "/orders/slow"
+    assert meta["reason"] == "sampled"
+    assert meta["samples"] > 5
+    lines = store.folded(meta["id"]).splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("test_profiler.py:busy_wait" in line and "test_profiler.py:slow" in line for line in lines)
+
+
+def test_only_slow_requests_are_kept_without_sampling(tmp_path):
+    store = profiler.ProfileStore(str(tmp_path), max_profiles=10)
+    client = TestClient(_app(store, slow_ms=50, paths=("/orders",)))
+
+    client.get("/orders/fast")
+    client.get("/menu/slow")  # outside the profiled paths
+    client.get("/orders/slow")
+
+    assert [(meta["path"], meta["reason"]) for meta in store.list()] == [("/orders/slow", "slow")]
+
+
+def test_store_keeps_the_newest_profiles(tmp_path):
+    store = profiler.ProfileStore(str(tmp_path), max_profiles=3)
+    ids = [store.save({"path": f"/p{n}"}, Counter({"main;work": n + 1})) for n in range(5)]
+
+    assert [meta["id"] for meta in store.list()] == ids[:1:-1]
+    assert store.folded(ids[0]) is None
+    assert store.folded(ids[4]) == "main;work 5\n"
+    assert store.folded("../../etc/passwd") is None
+    assert len(list(tmp_path.iterdir())) == 6
+
+
+def test_profiles_are_admin_only(tmp_path, monkeypatch):
+    store = profiler.ProfileStore(str(tmp_path), max_profiles=3)
+    profile_id = store.save({"path": "/orders/"}, Counter({"main;work": 2}))
+    monkeypatch.setattr(profiler, "store", store)
+    app = FastAPI()
+    app.include_router(diagnostics_router.router)
+    client = TestClient(app)
+
+    monkeypatch.setattr(conf, "admin_token", "")
+    assert client.get("/diagnostics/profiles", headers={"X-Admin-Token": ""}).status_code == 403
+
+    monkeypatch.setattr(conf, "admin_token", "s3cret")
+    assert client.get("/diagnostics/profiles").status_code == 403
+    assert client.get("/diagnostics/profiles", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    headers = {"X-Admin-Token": "s3cret"}
+    assert [meta["id"] for meta in client.get("/diagnostics/profiles", headers=headers).json()] == [profile_id]
+    response = client.get(f"/diagnostics/profiles/{profile_id}", headers=headers)
+    assert response.text == "main;work 2\n"
+    assert client.get("/diagnostics/profiles/00000000000000000000-1", headers=headers).status_code == 404
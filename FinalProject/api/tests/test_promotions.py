@@ -95,3 +95,23 @@ def test_apply_promo_to_guest_order(db_session):
 
     assert order.total_price == pytest.approx(21.6)  # 24 * 0.9
     assert order.promotion_code == "TENOFF"
+
+
+def test_promotions_etag_changes_with_writes(db_session):
+    first = promotions_controller.list_etag(db_session)
+    assert promotions_controller.list_etag(db_session) == first
+
+    created = promotions_controller.create(
+        db_session, promotion_schema.PromotionCreate(promo_code="fall5", discount_percent=5)
+    )
+    second = promotions_controller.list_etag(db_session)
+    assert second != first
+
+    promotions_controller.update(
+        db_session, created.id, promotion_schema.PromotionUpdate(discount_percent=7)
+    )
+    third = promotions_controller.list_etag(db_session)
+    assert third != second
+
+    promotions_controller.delete(db_session, created.id)
+    assert promotions_controller.list_etag(db_session) != third
@@ -0,0 +1,117 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from ..dependencies.database import Base
+from ..controllers import analytics as analytics_controller
+from ..controllers import orders as orders_controller
+from ..controllers import tracking_cache
+from ..models import order as order_model
+from ..models import menu_item as menu_model  # register metadata
+from ..models import user as user_model  # register metadata
+from ..models import order_details as order_details_model  # register metadata
+from ..models import payment as payment_model  # register metadata
+from ..models import notification as notification_model  # register metadata
+from ..models import promotion as promotion_model  # register metadata
+from ..models import review as review_model  # register metadata
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def orders_query_plans(db_session, call):
+    """Run `call` and return SQLite's plan for each statement it issues on orders."""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM orders" in statement:
+            captured.append((statement, parameters))
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    plans = []
+    for statement, parameters in captured:
+        rows = db_session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+        plans.append(" | ".join(row[-1] for row in rows))
+    return plans
+
+
+def orders_query_plan(db_session, call):
+    """SQLite's plan for the first statement `call` issues on orders."""
+    return orders_query_plans(db_session, call)[0]
+
+
+def test_date_range_listing_uses_order_date_index(db_session):
+    plan = orders_query_plan(
+        db_session,
+        lambda: orders_controller.read_all(db_session, start_date="2024-01-01", end_date="2024-01-31"),
+    )
+    assert "USING INDEX ix_orders_order_date" in plan
+    assert "SCAN orders" not in plan
+
+
+def test_user_history_uses_user_date_index(db_session):
+    plan = orders_query_plan(
+        db_session,
+        lambda: orders_controller.read_page(db_session, user_id=1, start_date="2024-01-01", limit=10),
+    )
+    assert "USING INDEX ix_orders_user_id_order_date" in plan
+
+
+def test_tracking_lookup_uses_unique_index(db_session):
+    # Another test may have left "missing" in the negative cache
+    tracking_cache.clear()
+
+    def lookup():
+        with pytest.raises(HTTPException):
+            orders_controller.track_by_number(db_session, "missing")
+
+    plan = orders_query_plan(db_session, lookup)
+    assert "USING INDEX ix_orders_tracking_number" in plan
+
+
+def test_sales_range_reads_rollup_not_orders(db_session):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        analytics_controller.sales_by_date_range(db_session, "2024-01-01", "2024-01-31")
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert statements
+    assert all("FROM order_daily_rollup" in s for s in statements)
+
+
+def test_status_queue_uses_status_date_index(db_session):
+    plans = orders_query_plans(db_session, lambda: orders_controller.read_active(db_session))
+
+    assert plans
+    for plan in plans:
+        assert "USING INDEX ix_orders_status_order_date" in plan
+        assert "SCAN orders" not in plan
+        assert "TEMP B-TREE" not in plan
+
+
+def test_invalid_date_is_rejected(db_session):
+    with pytest.raises(HTTPException) as exc:
+        orders_controller.read_all(db_session, start_date="01/02/2024")
+    assert exc.value.status_code == 400
@@ -0,0 +1,136 @@
+import logging
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from ..controllers import orders as orders_controller
+from ..controllers import payments as payments_controller
+from ..dependencies import query_stats
+from ..dependencies.database import Base
+from ..models import model_loader  # noqa: F401  register every model
+from ..models import menu_item as menu_model
+from ..models import order as order_model
+from ..schemas import order as order_schema
+from ..schemas import payment as payment_schema
+
+# Statements each operation may issue; raise one only with a reason
+GUEST_ORDER_BUDGET = 10
+PAYMENT_BUDGET = 9
+ORDER_LIST_BUDGET = 2
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _guest_order(db_session):
+    request = order_schema.GuestOrderCreate(
+        guest_name="Budget Guest",
+        items=[order_schema.OrderItem(menu_item_id=1, quantity=1), order_schema.OrderItem(menu_item_id=2, quantity=2)],
+    )
+    return orders_controller.create_guest_order(db_session, request)
+
+
+def _seed_menu(db_session):
+    db_session.add_all(
+        [
+            menu_model.MenuItem(name="Sandwich", price=5.0, stock=100),
+            menu_model.MenuItem(name="Soup", price=3.0, stock=100),
+        ]
+    )
+    db_session.commit()
+
+
+def test_checkout_and_payment_stay_within_query_budgets(db_session):
+    _seed_menu(db_session)
+    with query_stats.budget(GUEST_ORDER_BUDGET):
+        order = _guest_order(db_session)
+
+    payment = payment_schema.PaymentCreate(
+        order_id=order.id, payment_type="Card", transaction_status="Success", amount=order.total_price
+    )
+    with query_stats.budget(PAYMENT_BUDGET) as stats:
+        payments_controller.create(db_session, payment)
+    assert stats.statements > 0
+    assert stats.seconds > 0
+
+
+def test_order_list_query_count_does_not_grow_with_orders(db_session):
+    _seed_menu(db_session)
+    for _ in range(15):
+        _guest_order(db_session)
+    db_session.expire_all()
+
+    with query_stats.budget(ORDER_LIST_BUDGET) as stats:
+        orders = orders_controller.read_all(db_session)
+    assert len(orders) == 15
+    assert stats.repeated(2) == []
+
+
+def test_budget_failure_lists_the_repeated_select(db_session):
+    _seed_menu(db_session)
+    for _ in range(6):
+        _guest_order(db_session)
+    db_session.expire_all()
+
+    with pytest.raises(query_stats.QueryBudgetExceeded) as exc:
+        with query_stats.budget(ORDER_LIST_BUDGET) as stats:
+            for order in db_session.query(order_model.Order).all():
+                order.order_details  # lazy load per order: an N+1
+
+    ((statement, times),) = stats.repeated(5)
+    assert times == 6
+    assert "FROM order_details" in statement
+    assert "6x SELECT" in str(exc.value)
+
+
+def test_nested_tracking_counts_toward_the_outer_block(db_session):
+    _seed_menu(db_session)
+    with query_stats.track() as outer:
+        db_session.query(menu_model.MenuItem).all()
+        with query_stats.track() as inner:
+            db_session.query(menu_model.MenuItem).all()
+    assert inner.statements == 1
+    assert outer.statements == 2
+    assert query_stats.current() is None
+
+
+def test_middleware_reports_queries_per_request(caplog):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.add_middleware(query_stats.QueryCounter, headers=True, n_plus_one_threshold=3)
+
+    @app.get("/items")
+    def items(db=Depends(get_db)):
+        # Runs in the threadpool, like the app's sync routes; one lookup per id
+        return [db.get(menu_model.MenuItem, n) is not None for n in range(1, 5)]
+
+    client = TestClient(app)
+    with caplog.at_level(logging.WARNING, logger=query_stats.__name__):
+        response = client.get("/items")
+
+    assert response.status_code == 200
+    assert response.headers["X-DB-Queries"] == "4"
+    assert float(response.headers["X-DB-Time"]) > 0
+    assert "X-DB-Rows" in response.headers
+    assert any("possible N+1 in GET /items: 4 x SELECT" in r.getMessage() for r in caplog.records)
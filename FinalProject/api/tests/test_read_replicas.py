@@ -0,0 +1,107 @@
+import shutil
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from ..controllers import analytics as analytics_controller
+from ..controllers import orders as orders_controller
+from ..dependencies import database
+from ..dependencies.config import conf
+from ..dependencies.database import Base, SessionLocal
+from ..dependencies.read_replicas import ReadRouter
+from ..models import model_loader  # noqa: F401  register every model
+from ..models import menu_item as menu_model
+from ..routers import diagnostics as diagnostics_router
+from ..schemas import order as order_schema
+
+
+@pytest.fixture
+def cluster(tmp_path):
+    """A primary and a replica SQLite file; replicate() copies the primary over."""
+    primary_path, replica_path = tmp_path / "primary.db", tmp_path / "replica.db"
+    primary = create_engine(f"sqlite:///{primary_path}")
+    replica = create_engine(f"sqlite:///{replica_path}")
+    Base.metadata.create_all(primary)
+    with SessionLocal(bind=primary) as db:
+        db.add(menu_model.MenuItem(name="Hoagie", price=9.0))
+        db.commit()
+
+    def replicate():
+        replica.dispose()
+        shutil.copyfile(primary_path, replica_path)
+
+    replicate()
+    yield primary, replica, replicate
+    primary.dispose()
+    replica.dispose()
+
+
+def _read_session(router, monkeypatch):
+    monkeypatch.setattr(database, "read_router", router)
+    return database.get_read_db()
+
+
+def test_round_robin_over_healthy_replicas(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path / 'p.db'}")
+    first = create_engine(f"sqlite:///{tmp_path / 'r1.db'}")
+    second = create_engine(f"sqlite:///{tmp_path / 'r2.db'}")
+    router = ReadRouter(primary, [first, second])
+
+    assert [router.pick() for _ in range(4)] == [first, second, first, second]
+
+
+def test_unhealthy_replicas_are_skipped_then_fall_back_to_primary(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path / 'p.db'}")
+    healthy = create_engine(f"sqlite:///{tmp_path / 'r1.db'}")
+    missing_dir = tmp_path / "down"
+    down = create_engine(f"sqlite:///{missing_dir / 'r2.db'}")
+
+    router = ReadRouter(primary, [down, healthy], check_interval=0)
+    assert {router.pick() for _ in range(4)} == {healthy}
+    assert router.status()[0]["healthy"] is False
+
+    assert ReadRouter(primary, [down], check_interval=0).pick() is primary
+
+    # Probed again on the next pick once the interval has passed
+    missing_dir.mkdir()
+    assert {router.pick() for _ in range(2)} == {down, healthy}
+    assert router.status()[0]["healthy"] is True
+
+
+def test_reads_hit_the_replica_and_writes_the_primary(cluster, monkeypatch):
+    primary, replica, replicate = cluster
+    reads = _read_session(ReadRouter(primary, [replica]), monkeypatch)
+    replica_db = next(reads)
+    assert replica_db.get_bind() is replica
+
+    with SessionLocal(bind=primary) as primary_db:
+        created = orders_controller.create_guest_order(
+            primary_db,
+            order_schema.GuestOrderCreate(
+                guest_name="Lagging", items=[order_schema.OrderItem(menu_item_id=1, quantity=2)]
+            ),
+        )
+        # Read-after-write stays on the primary
+        assert orders_controller.track_by_number(primary_db, created.tracking_number).id == created.id
+
+    # Not replicated yet: the replica still has no orders
+    assert orders_controller.read_page(replica_db)[0] == []
+    reads.close()
+
+    replicate()
+    reads = _read_session(ReadRouter(primary, [replica]), monkeypatch)
+    replica_db = next(reads)
+    rows, _ = orders_controller.read_page(replica_db)
+    assert [o.guest_name for o in rows] == ["Lagging"]
+    assert analytics_controller.sales_summary(replica_db)["total_orders"] == 1
+    reads.close()
+
+
+def test_replica_diagnostics_are_admin_only(monkeypatch):
+    monkeypatch.setattr(conf, "admin_token", "s3cret")
+    app = FastAPI()
+    app.include_router(diagnostics_router.router)
+    client = TestClient(app)
+
+    assert client.get("/diagnostics/db-replicas").status_code == 403
+    assert client.get("/diagnostics/db-replicas", headers={"X-Admin-Token": "s3cret"}).status_code == 200
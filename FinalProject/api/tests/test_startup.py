@@ -0,0 +1,18 @@
+import os
+from ..benchmarks import startup
+
+
+def test_cold_start_loads_routers_on_first_request():
+    path = startup.migrated_database()
+    try:
+        result = startup.run_child(
+            f"sqlite:///{path}", startup.DEFAULT_PATHS, env=dict(os.environ, LAZY_ROUTES="true")
+        )
+    finally:
+        os.remove(path)
+
+    # Routers are imported by the first request under their prefix, not at start-up.
+    # Timings are not asserted here; `python -m api.benchmarks.startup` enforces the budgets.
+    assert result["loaded_routers"] == []
+    for request_path in startup.DEFAULT_PATHS:
+        assert result["requests"][request_path]["status"] == 200
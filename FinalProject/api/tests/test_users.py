@@ -1,6 +1,7 @@
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from ..dependencies import fast_json
 from ..dependencies.database import Base
 from ..controllers import users as users_controller
 from ..models import user as user_model
@@ -11,6 +12,7 @@ from ..models import payment as payment_model  # register relationships
 from ..models import notification as notification_model  # register relationships
 from ..models import promotion as promotion_model  # register relationships
 from ..models import review as review_model  # register relationships
+from ..schemas import user as user_schema
 
 
 @pytest.fixture
@@ -51,3 +53,26 @@ def test_read_users(db_session):
 
     fetched = users_controller.read_one(db_session, user1.id)
     assert fetched.name == "Test User"
+
+
+def test_fast_json_rows_match_response_model(db_session):
+    orjson = pytest.importorskip("orjson")
+    db_session.add(
+        user_model.User(
+            name="Row User",
+            email="row@example.com",
+            phone=None,
+            address="Addr",
+            password="secret",
+            role="customer",
+        )
+    )
+    db_session.commit()
+
+    rows = users_controller.read_all_rows(db_session)
+    expected = [
+        user_schema.UserResponse.model_validate(u, from_attributes=True).model_dump(mode="json")
+        for u in users_controller.read_all(db_session)
+    ]
+    assert orjson.loads(fast_json.response(rows).body) == expected
+    assert "password" not in rows[0]